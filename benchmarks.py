@@ -0,0 +1,539 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# benchmarks.py - timings for the cat interpreter
+#
+# Usage (like catlang.py, run from the directory that contains 'Cat/'):
+#
+# python Cat/benchmarks.py - run all of the benchmarks
+# python Cat/benchmarks.py <name> ... - run only the named benchmarks
+#
+# Each benchmark prints one line per measurement: <label> <value> <unit>
+
+import os
+import subprocess
+import sys
+import time
+
+# name -> benchmark function, in registration order
+benchmarks = [ ]
+
+
+def bench( name ) :
+    '''Decorator that registers a benchmark function under a name'''
+    def _decorator( func ) :
+        benchmarks.append( (name, func) )
+        return func
+
+    return _decorator
+
+def report( label, value, unit ) :
+    print "  %-40s %12.3f %s" % (label, value, unit)
+
+def timeit( func, repeat=5 ) :
+    '''Returns the best wall time (seconds) of several calls to func'''
+    best = None
+
+    for _ in range( repeat ) :
+        start = time.time()
+        func()
+        elapsed = time.time() - start
+
+        if best is None or elapsed < best :
+            best = elapsed
+
+    return best
+
+def new_cat() :
+    '''An interpreter with an empty stack'''
+    from cat.eval import CatEval
+
+    return CatEval()
+
+def deep_size( obj, seen ) :
+    '''Returns the bytes held by obj and the objects it refers to, skipping those in seen'''
+    if id(obj) in seen :
+        return 0
+
+    seen.add( id(obj) )
+    size = sys.getsizeof( obj )
+
+    if isinstance(obj, dict) :
+        size += sum( deep_size(k, seen) + deep_size(v, seen) for k, v in obj.iteritems() )
+
+    elif isinstance(obj, (list, tuple)) :
+        size += sum( deep_size(item, seen) for item in obj )
+
+    elif hasattr(obj, '__slots__') :
+        size += sum( deep_size(getattr(obj, name), seen) for name in obj.__slots__ )
+
+    return size
+
+def run_catlang( *args ) :
+    '''Runs catlang.py in a fresh process, returning the wall time in seconds'''
+    cmd   = [ sys.executable, os.path.join('Cat', 'catlang.py') ] + list( args )
+    start = time.time()
+    subprocess.check_call( cmd, stdout=open(os.devnull, 'w') )
+    return time.time() - start
+
+
+def peak_memory( expr ) :
+    '''Evaluates expr in a fresh interpreter process, returning the wall time in seconds
+    and the growth of the peak resident memory (KB) during the evaluation
+    '''
+    script = ("import resource, sys, time; sys.path.insert( 0, %r ); "
+              "from cat.eval import CatEval; cat = CatEval(); "
+              "before = resource.getrusage( resource.RUSAGE_SELF ).ru_maxrss; start = time.time(); "
+              "cat.eval( %r ); "
+              "print time.time() - start, resource.getrusage( resource.RUSAGE_SELF ).ru_maxrss - before"
+              % (os.path.dirname(os.path.abspath(__file__)), expr))
+    elapsed, peak = subprocess.check_output( [sys.executable, '-c', script] ).split()
+    return float( elapsed ), int( peak )
+
+@bench( 'startup' )
+def startup() :
+    '''Cold start of a short command-line evaluation'''
+    from cat import manifest
+
+    have  = manifest.load() is not None
+    times = [ run_catlang('-e', '1 2 +') for _ in range(10) ]
+    report( "-e \"1 2 +\" (manifest: %s) best" % ('yes' if have else 'no'), min(times) * 1000, 'ms' )
+    report( "-e \"1 2 +\" (manifest: %s) mean" % ('yes' if have else 'no'), sum(times) / len(times) * 1000, 'ms' )
+
+@bench( 'fork' )
+def fork() :
+    '''Copying a namespace and forking an interpreter with 1000 user words'''
+    cat = new_cat()
+
+    for n in range( 1000 ) :
+        cat.eval( "define w%d {%d dup *}" % (n, n) )
+
+    names = iter( xrange(10 ** 6) )
+    report( "copy_ns", timeit(lambda: cat.eval("'user 'c%d copy_ns" % next(names))) * 10 ** 6, 'us' )
+    report( "CatEval.fork", timeit(cat.fork) * 10 ** 6, 'us' )
+
+@bench( 'lookup' )
+def lookup() :
+    '''Finding the namespace of a word with 100 user namespaces'''
+    cat = new_cat()
+
+    for n in range( 100 ) :
+        cat.ns.createNS( 'ns%d' % n )
+        cat.ns.addWord( 'w%d' % n, [n], '', 'ns%d' % n )
+
+    report( "getWordAnyNS (user word) x1000", timeit(lambda: [cat.ns.getWordAnyNS('w99') for _ in xrange(1000)]) * 1000, 'ms' )
+    report( "getWordAnyNS (missing) x1000", timeit(lambda: [cat.ns.getWordAnyNS('nope') for _ in xrange(1000)]) * 1000, 'ms' )
+
+@bench( 'memory' )
+def memory() :
+    '''Bytes per user word for 10000 words: (list, doc) pairs vs WordEntry records'''
+    cat    = new_cat()
+    source = [ "define word%d { dup * swap %d word%d + [ 1 + ] map }" % (n, n, n // 2) for n in range(10000) ]
+    pairs  = { }
+
+    for line in source :
+        defn               = cat.parser.parse_definition( line )
+        pairs[defn.name]   = (list(cat.parser.gobble(defn.definition)), 0)
+        cat.eval( line )
+
+    entries = dict( item for item in cat.ns._nsDict['user'].as_wordDict().iteritems() if item[0] in pairs )
+
+    report( "(list, doc) pair", deep_size(pairs, set()) / 10000.0, 'bytes' )
+    report( "WordEntry", deep_size(entries, set()) / 10000.0, 'bytes' )
+
+@bench( 'stack' )
+def stack() :
+    '''List literals and nested stacks'''
+    cat   = new_cat()
+    flat  = list( cat.parser.gobble('[1 2 3] list pop ' * 10000) )
+    inner = list( cat.parser.gobble('[[1] list [2] list] list pop ' * 10000) )
+    pairs = range( 1000 )
+
+    def bin_op() :
+        cat.eval( 'clear' )
+        cat.stack.push( pairs )
+        cat.stack.push( pairs )
+        cat.eval( '[add] bin_op' )
+
+    report( "[1 2 3] list x10000", timeit(lambda: cat.eval(flat)) * 1000, 'ms' )
+    report( "[[1] list [2] list] list x10000", timeit(lambda: cat.eval(inner)) * 1000, 'ms' )
+    report( "bin_op, 1000 pairs", timeit(bin_op) * 1000, 'ms' )
+
+    cat.eval( 'clear' )
+    cat.stack.push( range(100000) )
+    cat.stack.push( [range(100)] * 1000 )
+    limits = cat.display_limits()
+    report( "format, 10^5 + 1000x100 lists, unbounded", timeit(lambda: cat.stack.format()) * 1000, 'ms' )
+    report( "format, 10^5 + 1000x100 lists, configured", timeit(lambda: cat.stack.format(**limits)) * 1000, 'ms' )
+
+@bench( 'literals' )
+def literals() :
+    '''Stack.pop_list on list literal strings: eval() vs the cached literal parser'''
+    from cat.stack import Stack
+
+    stack = Stack()
+    texts = [ "[1, 2, 3]", "['a', 'b', ('c', 4.5)]", "(%s)" % ", ".join(map(str, range(100))) ]
+
+    def pop_list( text ) :
+        for _ in xrange( 1000 ) :
+            stack.push( text )
+            stack.pop_list()
+
+    for text in texts :
+        label = text if len(text) < 24 else text[:20] + "...)"
+        report( "eval %s x1000" % label, timeit(lambda: [eval(text) for _ in xrange(1000)]) * 1000, 'ms' )
+        report( "pop_list %s x1000" % label, timeit(lambda: pop_list(text)) * 1000, 'ms' )
+
+@bench( 'numeric' )
+def numeric() :
+    '''Tight numeric loops: recursive fact, vec_sum and poly on lists and vectors'''
+    cat = new_cat()
+    cat.eval( "define fact { dup eqz [pop 1] [dup dec fact mul] if }" )
+    cat.eval( "define fold_sum { 0 [+] fold }" )
+
+    report( "20 fact x100", timeit(lambda: [cat.eval('clear 20 fact') for _ in xrange(100)]) * 1000, 'ms' )
+    report( "0 [1 + dup 2 * pop] 10000 repeat", timeit(lambda: cat.eval('clear 0 [1 + dup 2 * pop] 10000 repeat')) * 1000, 'ms' )
+
+    values = range( 100000 )
+    cat.eval( "clear" )
+    cat.stack.push( values )
+    cat.eval( "dup to_vector" )
+    vector = cat.stack.pop()
+
+    def run( expr, arg ) :
+        cat.eval( "clear" )
+        cat.stack.push( arg )
+        cat.eval( expr )
+
+    report( "0 [+] fold, 10^5 list", timeit(lambda: run('fold_sum', values), repeat=3) * 1000, 'ms' )
+    report( "vec_sum, 10^5 list", timeit(lambda: run('vec_sum', values)) * 1000, 'ms' )
+    report( "vec_sum, 10^5 vector", timeit(lambda: run('vec_sum', vector)) * 1000, 'ms' )
+    report( "vector 2 * 1 +, 10^5", timeit(lambda: run('2 * 1 +', vector)) * 1000, 'ms' )
+
+    coeffs = [ 1.0 / (n + 1) for n in range(1000) ]
+    cat.stack.push( coeffs )
+    cat.eval( "to_vector" )
+    vcoeffs = cat.stack.pop()
+    report( "poly, 1000 coefficients (list) x100", timeit(lambda: [run('0.5 poly', coeffs) for _ in xrange(100)]) * 1000, 'ms' )
+    report( "poly, 1000 coefficients (vector) x100", timeit(lambda: [run('0.5 poly', vcoeffs) for _ in xrange(100)]) * 1000, 'ms' )
+
+@bench( 'shuffle' )
+def shuffle() :
+    '''Shuffle words: Cat compositions of swap, dip and dup vs native shuffles'''
+    cat = new_cat()
+
+    for name, body in (('bca', '[swap] dip swap'), ('dabc', 'swap [swap [swap] dip] dip'),
+                       ('abba', '[dup] dip dup [swap] dip swap')) :
+        cat.eval( "define cat_%s { %s }" % (name, body) )
+        cat.eval( "clear 'native_%s \"%s -- %s\" define_shuffle" % (name, ''.join(sorted(set(name))), name) )
+        args = "clear " + " ".join( str(n) for n in range(len(set(name))) ) + " "
+
+        for kind in ('cat', 'native') :
+            code = list( cat.parser.gobble(args + "%s_%s" % (kind, name)) )
+            run  = lambda: [cat.eval(code) for _ in xrange(10000)]
+            report( "%s %s x10000" % (kind, name), timeit(run) * 1000, 'ms' )
+
+@bench( 'vectors' )
+def vectors() :
+    '''vec_* words on 10^6 elements: lists, array.array and NumPy vectors (and Cat definitions on 10^5)'''
+    from cat import vector
+
+    cat = new_cat()
+    cat.eval( "define cat_vec_sum { 0 [+] fold }" )
+    cat.eval( "define cat_vec_scale { [*] papply map }" )
+    cat.eval( "define cat_vec_dot_prod { [mul] bin_op 0 [add] fold }" )
+
+    values = range( 1000000 )
+    coeffs = [ 1.0 / (n + 1) for n in values ]
+
+    def run( expr, *args ) :
+        cat.eval( "clear" )
+        cat.stack.push( args, multi=True )
+        cat.eval( expr )
+
+    # the Cat definitions take seconds per 10^5 elements
+    short = values[:100000]
+
+    for expr, args in (('cat_vec_sum', (short,)), ('cat_vec_scale', (short, 2)),
+                       ('cat_vec_dot_prod', (short, short))) :
+        report( "%s, 10^5 list" % expr, timeit(lambda: run(expr, *args), repeat=1) * 1000, 'ms' )
+
+    for expr, args in (('vec_sum', (values,)), ('vec_scale', (values, 2)), ('vec_add', (values, values)),
+                       ('vec_dot_prod', (values, values)), ('0.5 poly', (coeffs,))) :
+        report( "%s, 10^6 list" % expr, timeit(lambda: run(expr, *args), repeat=3) * 1000, 'ms' )
+
+    for backend in ('array', 'numpy') :
+        if not vector.use_numpy( backend == 'numpy' ) and backend == 'numpy' :
+            print "  (NumPy is not installed)"
+            break
+
+        vec  = vector.Vector( values )
+        vcof = vector.Vector( coeffs )
+
+        for expr, args in (('vec_sum', (vec,)), ('vec_scale', (vec, 2)), ('vec_add', (vec, vec)),
+                           ('2 * 1 +', (vec,)), ('vec_dot_prod', (vec, vec)), ('0.5 poly', (vcof,))) :
+            report( "%s, 10^6 %s vector" % (expr, backend), timeit(lambda: run(expr, *args), repeat=3) * 1000, 'ms' )
+
+    vector.use_numpy( True )
+
+@bench( 'lazy' )
+def lazy() :
+    '''A map/filter/fold pipeline over 10^6 integers: lists vs lazy sequences (time, peak memory)'''
+    pipelines = (('range, map, filter', "1000000 range [dup *] map [even] filter 0 [+] fold"),
+                 ('lazy_range, lmap, lfilter', "1000000 lazy_range [dup *] lmap [even] lfilter 0 [+] fold"))
+
+    for label, expr in pipelines :
+        elapsed, peak = peak_memory( expr )
+        report( "%s time" % label, elapsed * 1000, 'ms' )
+        report( "%s peak memory growth" % label, peak / 1024.0, 'MB' )
+
+@bench( 'fusion' )
+def fusion() :
+    '''A word with a map/filter/fold chain over 10^5 integers, unfused vs fused'''
+    cat    = new_cat()
+    values = range( 100000 )
+
+    for fuse in ('false', 'true') :
+        cat.ns.config.set( 'optimize', 'fuse', fuse )
+        cat.eval( "define pipeline_%s { [dup *] map [even] filter [2 /] map 0 [+] fold }" % fuse )
+
+        def run() :
+            cat.eval( "clear" )
+            cat.stack.push( values )
+            cat.eval( "pipeline_" + fuse )
+
+        report( "map filter map fold (fuse=%s)" % fuse, timeit(run, repeat=3) * 1000, 'ms' )
+
+@bench( 'native' )
+def native() :
+    '''map, filter, fold and foreach over 10^5 integers: built-in quotations (run natively) vs user words'''
+    cat    = new_cat()
+    values = range( 100000 )
+
+    for word in ('inc', 'even', 'add') :
+        cat.eval( "define my_%s { %s }" % (word, word) )
+
+    for expr in ("[%s] map", "[%s] filter", "0 [%s] fold", "0 swap [%s] foreach") :
+        for prefix in ('', 'my_') :
+            word = 'even' if 'filter' in expr else 'add' if '0' in expr else 'inc'
+            code = expr % (prefix + word)
+
+            def run() :
+                cat.eval( "clear" )
+                cat.stack.push( values )
+                cat.eval( code )
+
+            report( code, timeit(run, repeat=3) * 1000, 'ms' )
+
+@bench( 'plist' )
+def plist() :
+    '''Building a list with cons, then taking it apart with rest and with uncons, for 10^4 and 10^5 items'''
+    cat = new_cat()
+
+    for n in (10000, 100000) :
+        for label, setup, expr in (("cons", "nil", "[%d cons] %d repeat"),
+                                   ("rest", "%d range", "[rest] %d repeat"),
+                                   ("uncons", "%d range", "[uncons pop] %d repeat")) :
+            setup = setup % n if '%' in setup else setup
+            expr  = expr % ((n, n) if expr.count('%') == 2 else n)
+
+            def run() :
+                cat.eval( "clear " + setup )
+                cat.eval( expr )
+
+            report( "%s x %d" % (label, n), timeit(run, repeat=3) * 1000, 'ms' )
+
+@bench( 'hash_join' )
+def hash_join() :
+    '''hash_join of two 10^6-row pair lists, and the hash_add_chain definitions of standard-hash.cat on 10^5 rows'''
+    cat  = new_cat()
+    defs = os.path.join( os.path.dirname(os.path.abspath(__file__)), 'CatDefs' )
+
+    for name in ('standard-core', 'standard-combinators', 'standard-shuffle', 'standard-lists', 'standard-hash') :
+        cat.eval( '"%s" load' % os.path.join(defs, name + '.cat') )
+
+    # the join of standard-hash.cat, built from hash_add_chain ('list_to_hash' is now built in)
+    cat.eval( "define chain_join { concat hash_list swap [unpair hash_add_chain] foreach hash_to_list }" )
+
+    def rows( n, offset ) :
+        return [ [ix + offset, ix % 1000] for ix in xrange(n) ]
+
+    for n, expr in ((10 ** 5, "chain_join"), (10 ** 5, "hash_join"), (10 ** 6, "hash_join")) :
+        left, right = rows( n, 0 ), rows( n, n )
+
+        def run() :
+            cat.eval( "clear" )
+            cat.stack.push( left )
+            cat.stack.push( right )
+            cat.eval( expr )
+
+        report( "%s, 2 x %d rows" % (expr, n), timeit(run, repeat=1 if expr == "chain_join" else 3) * 1000, 'ms' )
+
+@bench( 'sets' )
+def sets() :
+    '''map_selection of 10^4 indices of a 10^5 list, and 10^3 in_list lookups in a 10^5 list vs set'''
+    cat     = new_cat()
+    values  = range( 100000 )
+    indices = range( 0, 100000, 10 )
+
+    def select() :
+        cat.eval( "clear" )
+        cat.stack.push( values )
+        cat.stack.push( ['inc'] )
+        cat.stack.push( indices )
+        cat.eval( "map_selection" )
+
+    report( "map_selection, 10^4 of 10^5", timeit(select, repeat=3) * 1000, 'ms' )
+
+    for label, haystack in (("list", values), ("set", frozenset(values))) :
+        def lookup() :
+            for needle in xrange( 0, 200000, 200 ) :
+                cat.stack.push( haystack )
+                cat.stack.push( needle )
+                cat.eval( "in_list" )
+                cat.stack.pop()
+
+        report( "10^3 in_list, 10^5 %s" % label, timeit(lookup, repeat=3) * 1000, 'ms' )
+
+@bench( 'sorting' )
+def sorting() :
+    '''sort_by with a native and a user-word key, top_k vs sort for k = 10, and merge_sorted, on 10^5 integers'''
+    import random
+
+    cat    = new_cat()
+    values = range( 100000 )
+    random.seed( 42 )
+    random.shuffle( values )
+    cat.eval( "define my_neg { neg }" )
+
+    for label, expr, arg in (("[neg] sort_by", "[neg] sort_by", values),
+                             ("[my_neg] sort_by", "[my_neg] sort_by", values),
+                             ("sort rev 10 take force", "sort rev 10 take force", values),
+                             ("10 top_k", "10 top_k", values),
+                             ("merge_sorted, 2 x 10^5", "dup merge_sorted", sorted(values))) :
+        def run() :
+            cat.eval( "clear" )
+            cat.stack.push( arg )
+            cat.eval( expr )
+
+        report( label, timeit(run, repeat=3) * 1000, 'ms' )
+
+@bench( 'parallel' )
+def parallel() :
+    '''[fib] map vs pmap over 64 x fib(16), and 10^5 range 0 [+] fold vs pfold, for 1 to N workers'''
+    from cat import parallel
+
+    cat = new_cat()
+    cat.eval( "define fib { dup 2 lt [] [dup dec fib swap 2 - fib +] if }" )
+    args = [ 16 ] * 64
+
+    def run( expr, arg ) :
+        cat.eval( "clear" )
+        cat.stack.push( arg )
+        cat.eval( expr )
+
+    report( "[fib] map", timeit(lambda: run('[fib] map', args), repeat=1) * 1000, 'ms' )
+    report( "0 [+] fold, 10^5", timeit(lambda: run('0 [+] fold', range(100000)), repeat=3) * 1000, 'ms' )
+
+    print "  (%d processors)" % parallel.cpuCount()
+
+    for workers in sorted( set([1, 2, 4, parallel.cpuCount()]) ) :
+        cat.eval( "%d parallel_workers" % workers )
+        run( '[fib] pmap', [1] * workers * 4 )    # start the workers
+        report( "[fib] pmap, %d workers" % workers, timeit(lambda: run('[fib] pmap', args), repeat=1) * 1000, 'ms' )
+        report( "0 [+] pfold, 10^5, %d workers" % workers,
+                timeit(lambda: run('0 [+] pfold', range(100000)), repeat=3) * 1000, 'ms' )
+
+    parallel.shutdown()
+
+@bench( 'tags' )
+def tags() :
+    '''tag_search and show_tags over the built-in words and 1000 tagged user words'''
+    cat = new_cat()
+    cat.output_fn = lambda text, colour : text
+
+    for n in range( 1000 ) :
+        cat.eval( "define w%d {{ tags: t%d,bench }} {%d}" % (n, n % 50, n) )
+
+    devnull, sys.stdout = sys.stdout, open( os.devnull, 'w' )
+
+    try :
+        first = timeit( lambda: cat.eval('"list and not display" tag_search'), repeat=1 )
+        query = timeit( lambda: cat.eval('"(list or t1*) and not (display or console)" tag_search') )
+        show  = timeit( lambda: cat.eval('show_tags') )
+
+    finally :
+        sys.stdout = devnull
+
+    report( "first tag_search (builds the index)", first * 1000, 'ms' )
+    report( "tag_search", query * 1000, 'ms' )
+    report( "show_tags", show * 1000, 'ms' )
+
+    # the tag expression alone, over a larger index
+    from cat.tags import TagIndex
+    from defs.cat_tagExpr import TagExpr
+
+    index = TagIndex()
+
+    for n in range( 5000 ) :
+        index.update( "w%d" % n, ["t%d" % (n % 100), "g%d" % (n % 7)] )
+
+    texpr = TagExpr( index )
+    calls = timeit( lambda: [texpr.parse('(t1* or g3) and not (g2 or t5)') for _ in xrange(1000)] )
+    report( "tag expression, 5000 words", calls * 1000, 'us' )
+
+@bench( 'search' )
+def search() :
+    '''search_docs and find_words with 20000 user words (indexes built before defining them)'''
+    cat = new_cat()
+    cat.output_fn = lambda text, colour : text
+    cat.ns.textIndex()
+
+    start = time.time()
+
+    for n in range( 20000 ) :
+        cat.eval( "define word%d {{ desc: computes item %d tags: t%d }} {%d}" % (n, n, n % 50, n) )
+
+    define = time.time() - start
+    devnull, sys.stdout = sys.stdout, open( os.devnull, 'w' )
+
+    try :
+        query  = timeit( lambda: cat.eval('"computes t7" search_docs') )
+        prefix = timeit( lambda: cat.eval('"word123*" search_docs') )
+        find   = timeit( lambda: cat.eval("'word1234.* find_words") )
+
+    finally :
+        sys.stdout = devnull
+
+    report( "define (per word, indexed)", define / 20000 * 10 ** 6, 'us' )
+    report( "search_docs two terms", query * 1000, 'ms' )
+    report( "search_docs prefix", prefix * 1000, 'ms' )
+    report( "find_words", find * 1000, 'ms' )
+
+@bench( 'complete' )
+def complete() :
+    '''REPL tab completion with 20000 user words'''
+    cat = new_cat()
+
+    for n in range( 20000 ) :
+        cat.eval( "define word%d {%d}" % (n, n) )
+
+    build     = timeit( lambda: (setattr(cat.ns, '_completer', None), cat.ns.completer()), repeat=1 )
+    completer = cat.ns.completer()
+    narrow    = timeit( lambda: [completer.complete('word1234', cat.ns) for _ in xrange(1000)] )
+    wide      = timeit( lambda: completer.complete('word1', cat.ns) )
+
+    report( "build completion tries", build * 1000, 'ms' )
+    report( "complete 'word1234'", narrow * 1000, 'us' )
+    report( "complete 'word1' (11111 names)", wide * 1000, 'ms' )
+
+
+if __name__ == '__main__' :
+    names = sys.argv[1:]
+
+    for name, func in benchmarks :
+        if names and name not in names :
+            continue
+
+        print "%s: %s" % (name, func.__doc__)
+        func()
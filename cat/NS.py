@@ -1,6 +1,8 @@
-from cat.namespace import NameSpace
+from cat.namespace import NameSpace, LazyNameSpace, WordEntry, freeze
+from cat import manifest
+from cat.startup import profiler
 from sets import Set
-import sys, os, ConfigParser
+import sys, os, copy, ConfigParser
 
 class NS:
     '''Creates and manipulates namespaces
@@ -10,7 +12,8 @@ class NS:
     # names the built-in words (functions) imported by defs/__init__.py
     defns = ['cat_arithmetic', 'cat_nsWords',  'cat_stack', 'cat_debug', 'cat_control',
              'cat_lists',  'cat_conditionals', 'cat_meta',  'cat_strings','cat_misc',
-             'cat_io', 'cat_time', 'cat_types','cat_basic_tests', 'cat_user']
+             'cat_io', 'cat_time', 'cat_types','cat_basic_tests', 'cat_user', 'cat_vectors',
+             'cat_lazy', 'cat_parallel']
     
     def __init__( self, catEval, userWords = None ) :
         '''creates all necessary structures for namespaces'''
@@ -19,8 +22,9 @@ class NS:
         self.config   = ConfigParser.ConfigParser()
         
         # read the configuration file
-        cfg_file = os.getcwd() + "/Cat/catlang.cfg"
-        self.config.readfp( open(cfg_file) )
+        with profiler.phase( 'config' ) :
+            cfg_file = os.getcwd() + "/Cat/catlang.cfg"
+            self.config.readfp( open(cfg_file) )
         
         if self.config.getboolean('display', 'use_colour' ) :
             self.info_colour = self.config.get( 'display', 'info' )
@@ -32,17 +36,45 @@ class NS:
         self._nsDict = { 'std' : NameSpace(),
                          'user' : NameSpace() }
         
+        # reverse index of word definitions: <word name> : frozenset(<namespace names>)
+        self._wordIndex = { }
+        
+        # the tag and text indexes are only built when first needed (see tagIndex())
+        self._tagIndex  = None
+        self._textIndex = None
+        self._completer = None
+        
+        # the fused combinator chains of user words: <namespace>:<word name> : [<chain source>]
+        self._fusions   = { }
+        
+        # the names of the tables above (_wordIndex, _fusions) that may be shared with
+        # a fork; a shared table is only copied when either interpreter first changes it
+        self._shared    = set()
+        
         # add any user defined words to the 'user' namespace
         if isinstance(userWords, dict) :
-            self._nsDict['user'].updateWords( userWords )
-        
-        # fill 'std' with words by importing definition files
-        levels = __import__( 'defs' )
+            for name, (definition, doc) in userWords.items() :
+                self._nsDict['user'].addWord( name, WordEntry(freeze(definition), doc, 'user') )
+            
+            self._indexWords( userWords, 'user' )
         
-        for defn in self.defns :
-            item               = sys.modules["defs." + defn]
-            self._nsDict[defn] = item._returnNS()
-            self._nsDict['std'].addLink(defn)
+        # fill 'std' with words from the definition files. With the manifest (built
+        # here if need be) a module is only imported once one of its words is resolved
+        with profiler.phase( 'namespaces' ) :
+            lazy = manifest.load( self.defns ) or { }
+            
+            for defn in self.defns :
+                if defn in lazy :
+                    self._nsDict[defn] = LazyNameSpace( defn, lazy[defn] )
+                
+                else :
+                    with profiler.phase( "defs." + defn ) :
+                        item = __import__( "defs." + defn, fromlist=['_returnNS'] )
+                    
+                    self._nsDict[defn] = item._returnNS()
+                
+                self._nsDict['std'].addLink(defn)
+                self._indexWords( self._nsDict[defn].allWordNames(), defn )
         
         # at this point, no more links will be added to the 'std' namespace
         # the current user namespace is always the last link in 'std'
@@ -51,7 +83,101 @@ class NS:
         # prime the 'global' directory with a few values
         self._nsDict['std'].addVar( 'prompt',  self.config.get('prompt', 'default') )
     
-    def _searchLinks(self, item, startNS='std', kind='words', viewed=[] ):
+    def fork( self, catEval ) :
+        '''Returns a copy of the namespaces for another interpreter. The built-in
+        namespaces are shared, the others are copied on write, so forking is cheap
+        however many words have been defined or loaded.
+        :param catEval: the interpreter that will own the copy
+        :type catEval: CatEval
+        :rtype: NS
+        '''
+        other            = copy.copy( self )
+        other.cat        = catEval
+        other.config     = ConfigParser.ConfigParser()
+        other._nsDict    = { }
+        other._tagIndex  = None     # rebuilt if the copy needs it
+        other._textIndex = None
+        other._completer = None
+        
+        # the word index and the fusions are shared copy-on-write (their values are immutable)
+        self._shared     = set( ('_wordIndex', '_fusions') )
+        other._shared    = set( self._shared )
+        
+        # the configuration may be changed with 'config_set', so each interpreter needs its own
+        for section in self.config.sections() :
+            other.config.add_section( section )
+            
+            for option, value in self.config.items( section, raw=True ) :
+                other.config.set( section, option, value )
+        
+        for name, nmsp in self._nsDict.items() :
+            if name in self.defns :
+                other._nsDict[name] = nmsp
+            
+            else :
+                other._nsDict[name] = nmsp.copy()
+        
+        return other
+    
+    def _own( self, table ) :
+        '''Returns the table (an attribute name) that this NS is free to change'''
+        if table in self._shared :
+            setattr( self, table, dict(getattr(self, table)) )
+            self._shared.discard( table )
+        
+        return getattr( self, table )
+    
+    def _indexWords( self, names, ns ) :
+        '''Records that the namespace ns defines the words in names'''
+        where = frozenset( (ns,) )
+        index = self._own( '_wordIndex' )
+        
+        for name in names :
+            index[name] = index.get( name, frozenset() ) | where
+            
+            if self._completer is not None :
+                self._completer.add( ns, name )
+            
+            if ns in self.defns or (self._tagIndex is None and self._textIndex is None) :
+                continue
+            
+            key    = ns + ":" + name
+            record = self._nsDict[ns].getDocRecord( name )
+            
+            if self._tagIndex is not None :
+                self._tagIndex.update( key, record.tags )
+            
+            if self._textIndex is not None :
+                self._textIndex.update( key, name, record )
+    
+    def _unindexWords( self, names, ns ) :
+        '''Records that the namespace ns no longer defines the words in names'''
+        where = frozenset( (ns,) )
+        
+        for name in names :
+            if ns + ":" + name in self._fusions :
+                del self._own( '_fusions' )[ns + ":" + name]
+            
+            if self._completer is not None :
+                self._completer.remove( ns, name )
+            
+            if self._tagIndex is not None :
+                self._tagIndex.remove( ns + ":" + name )
+            
+            if self._textIndex is not None :
+                self._textIndex.remove( ns + ":" + name )
+            
+            if name in self._wordIndex :
+                index = self._own( '_wordIndex' )
+                rest  = index[name] - where
+                
+                if rest :
+                    index[name] = rest
+                
+                else :
+                    del index[name]
+    
+    def _searchLinks(self, item, startNS='std', kind='words', viewed=[], fetch=True ):
         '''Recursive search of the links for a specified item. Search is depth-first.
         :param item: the item to be found (or not)
         :type item: string
@@ -61,12 +187,18 @@ class NS:
         :type kind: string (one of 'words', 'vars', 'instances')
         :param viewed: a list of links already viewed (to avoid circularity)
         :type viewed: a list
+        :param fetch: if False only the namespace is sought and the value returned is None
+                      (so that a built-in word's module need not be imported)
+        :type fetch: boolean
         :rtype: a tuple of the form (bool:<true or false>, any:<value>, string:<namespace>)
         '''
         if startNS not in self._nsDict :
             raise ValueError, "No namespace called '%s'" % startNS
         
         if self._nsDict[startNS].searchFor( item, kind ) :
+            if not fetch :
+                return (True, None, startNS)
+            
             return (True, self._nsDict[startNS].getValueOf(item, kind)[1], startNS)
         
         # item not in the 'kind' dictionary of this namespace
@@ -74,7 +206,7 @@ class NS:
         for nmsp in self._nsDict[startNS].getLinks() :
             if nmsp not in viewed :
                 viewed.append( nmsp )
-                val = self._searchLinks( item, nmsp, kind, viewed )
+                val = self._searchLinks( item, nmsp, kind, viewed, fetch )
                 
                 if val[0] :
                     return val
@@ -139,13 +271,24 @@ class NS:
         :rtype: none
         '''
         oldNS = self._checkNS( oldNS, ['std', 'user'] )
-        newNS = self._checkNS( newNS, ['std', 'user'] )
+        
+        if not isinstance(newNS, basestring) :
+            raise ValueError, "Namespace name must be a string"
         
         if self.isNS(newNS) :
             raise ValueError, "renameNS: namespace '%s' is already in existence" % newNS
         
+        names = self._nsDict[oldNS].allWordNames()
+        fused = self._fusedIn( oldNS )
+        self._unindexWords( names, oldNS )
         self._nsDict[newNS] = self._nsDict[oldNS]
         del self._nsDict[oldNS]
+        self._indexWords( names, newNS )
+        self._own( '_fusions' ).update( (newNS + ":" + name, chains) for name, chains in fused )
+        
+        if self._completer is not None :
+            self._completer.dropNS( oldNS )
+            self._completeNS( newNS )
     
     def changeUserNS( self, nsName=None ) :
         '''Change the current user namespace name
@@ -169,7 +312,11 @@ class NS:
         :type name: string
         '''
         ns = self._checkNS( ns, ['std', 'user'] )
+        self._unindexWords( self._nsDict[ns].allWordNames(), ns )
         del self._nsDict[ns]
+        
+        if self._completer is not None :
+            self._completer.dropNS( ns )
     
     def isNS( self, ns ) :
         '''Tests to see if the argument is already defined as a namespace
@@ -190,16 +337,23 @@ class NS:
         :type dest: string
         :rtype: none
         '''
-        src  = self._checkNS( src, ['std'] )
-        dest = self._checkNS( dest, ['std'] )
-        
         if not self.isNS(src) :
             raise ValueError, "No source namespace (%s) to copy" % src
         
+        src = self._checkNS( src, ['std'] )
+        
         if self.isNS(dest) :
             raise ValueError, "Destination namespace name '%s' already in use" % dest
         
-        self._nsDict[dest] = { }.update( self._nsDict[src] )
+        # createNS validates the new name; the copy then shares its tables with src
+        # until either of them is changed
+        self.createNS( dest )
+        self._nsDict[dest] = self._nsDict[src].copy()
+        self._indexWords( self._nsDict[dest].allWordNames(), dest )
+        self._own( '_fusions' ).update( (dest + ":" + name, chains) for name, chains in self._fusedIn(src) )
+        
+        if self._completer is not None :
+            self._completeNS( dest )
     
     def appendNS( self, src=None, dest=None ) :
         '''Appends the name of the source namespace (src) to the links of
@@ -262,7 +416,7 @@ class NS:
             self._nsDict[ns].delLink( nspc )
         
     # word methods
-    def addWord( self, name, definition, descrip='', ns=None ) :
+    def addWord( self, name, definition, descrip='', ns=None, effect='' ) :
         """Called to *define* new words
         :param name: the name of the new word
         :type name: string
@@ -272,10 +426,37 @@ class NS:
         :type descrip: string
         :param ns: the namespace to take the word (if None, the current user namespace is used)
         :type ns: string (if None, the current user namespace is used)
+        :param effect: the stack effect of the word
+        :type effect: string
         :rtype: none
         """
         ns = self._checkNS( ns, ['std'] )
-        self._nsDict[ns].addWord( name, (definition, descrip) )
+        
+        body = freeze( definition )
+        if ns + ":" + name in self._fusions :
+            del self._own( '_fusions' )[ns + ":" + name]
+        
+        if self.config.has_option( 'optimize', 'fuse' ) and self.config.getboolean( 'optimize', 'fuse' ) :
+            from cat import fusion
+            
+            body, fused = fusion.fuse( body )
+            
+            if fused :
+                self._own( '_fusions' )[ns + ":" + name] = fused
+        
+        self._nsDict[ns].addWord( name, WordEntry(body, descrip, ns, effect) )
+        self._indexWords( (name,), ns )
+    
+    def _fusedIn( self, ns ) :
+        '''Returns the fused chains of the words of namespace ns: a list of (<word name>, <chains>)'''
+        prefix = ns + ":"
+        return [ (key[len(prefix):], chains) for key, chains in self._fusions.items() if key.startswith(prefix) ]
+    
+    def fusions( self ) :
+        '''Returns the combinator chains fused in the bodies of user words (see cat/fusion.py)
+        :rtype: dictionary of the form <namespace>:<word name> : list of strings
+        '''
+        return self._fusions
     
     def getWord( self, name, ns='std' ) :
         '''Returns the word info associated with the name
@@ -304,7 +485,7 @@ class NS:
         # note that the 'std' namespace list ('__links__') has as its last element the
         # current user namespace and so it is searched automatically just like
         # the other links associated with 'std'
-        val = self._searchLinks( name, ns, 'words', [] )
+        val = self._searchLinks( name, ns, 'words', [], False )
         
         if val[0] :
             return val[0:3:2]
@@ -312,6 +493,38 @@ class NS:
         else :
             return (False, None)
     
+    def getDoc( self, name, ns='std' ) :
+        '''Returns the documentation of a word. Built-in documentation is read from the
+        manifest so that looking it up does not import the word's module.
+        :param name: the name of the word
+        :type name: string
+        :param ns: the namespace in which to start the search
+        :type ns: string
+        :rtype: a tuple of the form (bool:<found>, string:<documentation>)
+        '''
+        defined, where = self.isWord( name, ns )
+        
+        if not defined :
+            return (False, None)
+        
+        return (True, self._nsDict[where].getDoc( name ))
+    
+    def getDocRecord( self, name, ns='std' ) :
+        '''Returns the parsed documentation of a word (see cat/docs.py). The
+        documentation is parsed once, when first asked for.
+        :param name: the name of the word
+        :type name: string
+        :param ns: the namespace in which to start the search
+        :type ns: string
+        :rtype: a tuple of the form (bool:<found>, DocRecord:<documentation>)
+        '''
+        defined, where = self.isWord( name, ns )
+        
+        if not defined :
+            return (False, None)
+        
+        return (True, self._nsDict[where].getDocRecord( name ))
+    
     def delWord( self, name, ns=None  ) :
         '''Deletes a word from a namespace.
         Words in the 'std' namespace are protected from deletion
@@ -323,6 +536,7 @@ class NS:
         '''
         ns = self._checkNS( ns, ['std'] )
         self._nsDict[ns].delWord( name )
+        self._unindexWords( (name,), ns )
     
     def delAllWords( self, ns=None ) :
         '''Removes all words from the specified namespace
@@ -331,6 +545,7 @@ class NS:
         :rtype: none
         '''
         ns = self._checkNS( ns, ['std'] )
+        self._unindexWords( self._nsDict[ns].allWordNames(), ns )
         self._nsDict[ns].delAllWords()
             
     def allWordNames( self, ns=None ) :
@@ -359,6 +574,7 @@ class NS:
         
         word = self._nsDict[from_].getWord( name )
         self._nsDict[to].addWord( name, word[1] )
+        self._indexWords( (name,), to )
     
     def getWordAnyNS( self, word ) :
         '''Returns word definition if it exists in any namespace
@@ -366,11 +582,81 @@ class NS:
         :type word: string
         :rtype: a tuple of the form (bool:<found?>, tuple:<word def>, string:<namespace>)
         '''
-        for ns in self._nsDict :
-            if self.isWord( word, ns )[0] :
-                return self._searchLinks( word, ns, 'words', [] )
+        where = self._wordIndex.get( word )
         
-        return (False, None, None )
+        if not where :
+            return (False, None, None )
+        
+        # prefer the definition that 'std' resolves to (built-ins, then the current user
+        # namespace), then the other namespaces in name order
+        for ns in self.defns + [self.getUserNS()] + sorted( where ) :
+            if ns in where :
+                return (True, self._nsDict[ns].getWord( word )[1], ns)
+    
+    def _wordRecords( self ) :
+        '''Yields (<index key>, <word name>, <DocRecord>) for every word. The key of a
+        built-in word is its name, that of any other word is <namespace>:<word name>.
+        '''
+        for word in self.builtinWords() :
+            yield word, word, self.getDocRecord( word )[1]
+        
+        for words in self.allDefinedWords() :
+            for word in words[1:] :
+                yield words[0] + ":" + word, word, self._nsDict[words[0]].getDocRecord( word )
+    
+    def tagIndex( self ) :
+        '''Returns the index of word tags (see cat/tags.py). It is built from the
+        documentation of every word when first needed and kept up to date afterwards.
+        :rtype: TagIndex
+        '''
+        if self._tagIndex is None :
+            from cat.tags import TagIndex
+            
+            index = TagIndex()
+            
+            for key, _, record in self._wordRecords() :
+                index.update( key, record.tags )
+            
+            self._tagIndex = index
+        
+        return self._tagIndex
+    
+    def textIndex( self ) :
+        '''Returns the full-text index of word names and documentation (see cat/search.py).
+        Like the tag index it is built when first needed and kept up to date afterwards.
+        :rtype: TextIndex
+        '''
+        if self._textIndex is None :
+            from cat.search import TextIndex
+            
+            index = TextIndex()
+            
+            for key, name, record in self._wordRecords() :
+                index.update( key, name, record )
+            
+            self._textIndex = index
+        
+        return self._textIndex
+    
+    def completer( self ) :
+        '''Returns the completion engine for word, variable and namespace names
+        (see cat/complete.py). It is built when first needed and kept up to date afterwards.
+        :rtype: Completer
+        '''
+        if self._completer is None :
+            from cat.complete import Completer
+            
+            self._completer = Completer()
+            
+            for ns in self._nsDict :
+                self._completeNS( ns )
+        
+        return self._completer
+    
+    def _completeNS( self, ns ) :
+        '''Adds the word and variable names of a namespace to the completion engine'''
+        for name in self._nsDict[ns].allWordNames() + self._nsDict[ns].allVarNames() :
+            self._completer.add( ns, name )
     
     def allDefinedWords( self ) :
         '''Returns a list of all words currently defined in the entire system, other than built-ins
@@ -435,6 +721,10 @@ class NS:
             
             if ns.lower() == 'global' :
                 self._nsDict['std'].addVar( var, val )
+                
+                if self._completer is not None :
+                    self._completer.add( 'std', var )
+                
                 return
             
             else :
@@ -442,6 +732,9 @@ class NS:
         
         ns = self._checkNS( ns )
         self._nsDict[ns].addVar( varName, val )
+        
+        if self._completer is not None :
+            self._completer.add( ns, varName )
     
     def getVar( self, varName, ns=None, triplet=False ) :
         '''
@@ -516,10 +809,17 @@ class NS:
             
             if ns.lower() == 'global' :
                 self._nsDict['std'].delVar( name )
+                
+                if self._completer is not None :
+                    self._completer.remove( 'std', name )
+                
                 return
         
         ns = self._checkNS( ns, ['std'] )
         self._nsDict[ns].delVar( name )
+        
+        if self._completer is not None :
+            self._completer.remove( ns, name )
     
     def allVarNamesAnyNS( self ) :
         '''Returns a list of all variable names in the namespace, ns
@@ -771,7 +1071,7 @@ class NS:
         wrd = self.getWord( word )
         
         if wrd[0] :
-            func = wrd[1][0]
+            func = wrd[1].body
             
             if callable(func) :
                 func( self.cat )
@@ -0,0 +1,177 @@
+"""
+    Name completion for the REPL.
+
+    Word and variable names are kept in prefix tries: one for every name
+    and one per namespace (for <namespace>:<name> completion). The tries
+    are updated as words and variables are defined and deleted (see the
+    hooks in cat/NS.py), so a completion only walks the names that start
+    with the text being completed. Instance and module attributes
+    (<name>.<attribute>) are completed with dir().
+"""
+
+import sys
+
+
+class Trie:
+    '''Prefix tree of strings. A string may be added more than once; it stays
+    in the tree until it has been removed as many times.
+
+    >>> t = Trie()
+    >>> for w in ('swap', 'swapd', 'sum', 'swap') : t.add( w )
+    >>> t.complete( 'sw' )
+    ['swap', 'swapd']
+    >>> t.remove( 'swap' ); t.remove( 'swap' ); t.complete( 's' )
+    ['sum', 'swapd']
+    '''
+    def __init__( self ) :
+        self._root = { }    # char -> node; the key '' holds the count of a string ending here
+
+    def add( self, word ) :
+        node = self._root
+
+        for char in word :
+            node = node.setdefault( char, { } )
+
+        node[''] = node.get( '', 0 ) + 1
+
+    def remove( self, word ) :
+        path = [ self._root ]
+
+        for char in word :
+            if char not in path[-1] :
+                return
+
+            path.append( path[-1][char] )
+
+        if '' not in path[-1] :
+            return
+
+        path[-1][''] -= 1
+
+        if path[-1][''] :
+            return
+
+        del path[-1]['']
+
+        # prune the nodes that no longer lead anywhere
+        for ix in range( len(word), 0, -1 ) :
+            if path[ix] :
+                break
+
+            del path[ix - 1][word[ix - 1]]
+
+    def __contains__( self, word ) :
+        node = self._root
+
+        for char in word :
+            if char not in node :
+                return False
+
+            node = node[char]
+
+        return '' in node
+
+    def complete( self, prefix ) :
+        '''Returns the strings starting with prefix, sorted'''
+        node = self._root
+
+        for char in prefix :
+            if char not in node :
+                return [ ]
+
+            node = node[char]
+
+        words = [ ]
+        stack = [ (prefix, node) ]
+
+        while stack :
+            text, node = stack.pop()
+
+            for char, child in node.iteritems() :
+                if char == '' :
+                    words.append( text )
+
+                else :
+                    stack.append( (text + char, child) )
+
+        words.sort()
+        return words
+
+
+class Completer:
+    '''Completes word, variable, namespace and attribute names'''
+
+    def __init__( self ) :
+        self._names = Trie()    # every word and variable name
+        self._inNS  = { }       # namespace name -> Trie of its word and variable names
+
+    def add( self, ns, name ) :
+        '''Adds a word or variable name defined in namespace ns (adding it again does nothing)'''
+        names = self._inNS.setdefault( ns, Trie() )
+
+        if name not in names :
+            names.add( name )
+            self._names.add( name )
+
+    def remove( self, ns, name ) :
+        '''Removes a word or variable name from namespace ns'''
+        names = self._inNS.get( ns )
+
+        if names is not None and name in names :
+            names.remove( name )
+            self._names.remove( name )
+
+    def dropNS( self, ns ) :
+        '''Removes all of the names of a namespace'''
+        for name in self._inNS.pop( ns, Trie() ).complete( '' ) :
+            self._names.remove( name )
+
+    def complete( self, text, nspc ) :
+        '''Returns the completions of text
+        :param text: the text to complete (it may start with a quote)
+        :type text: string
+        :param nspc: the namespaces
+        :type nspc: NS
+        :rtype: sorted list of strings
+        '''
+        quote = ''
+
+        while text[:1] in ("'", '"') :
+            quote += text[0]
+            text   = text[1:]
+
+        if ':' in text :
+            ns, prefix = text.split( ':', 1 )
+            names      = self._inNS.get( 'std' if ns == 'global' else ns, Trie() ).complete( prefix )
+            found      = [ ns + ":" + name for name in names ]
+
+        elif '.' in text :
+            found = self._attributes( text, nspc )
+
+        else :
+            found  = self._names.complete( text )
+            found += [ ns + ":" for ns in nspc.listAllNS() + ['global'] if ns.startswith(text) ]
+            found.sort()
+
+        return [ quote + name for name in found ]
+
+    def _attributes( self, text, nspc ) :
+        '''Completes <instance or module>.<attribute>'''
+        path, prefix = text.rsplit( '.', 1 )
+        parts        = path.split( '.' )
+        defined, obj, _ = nspc.getInst( parts[0] )
+
+        if not defined :
+            obj = sys.modules.get( parts[0] )
+
+            if obj is None :
+                return [ ]
+
+        try :
+            for part in parts[1:] :
+                obj = getattr( obj, part )
+
+        except AttributeError :
+            return [ ]
+
+        return [ path + "." + name for name in sorted(dir(obj)) if name.startswith(prefix) ]
@@ -0,0 +1,142 @@
+"""
+    Word documentation store.
+
+    The documentation of a built-in word is kept here rather than in the
+    word's entry, addressed by an integer handle: its docstring, or when
+    its module has not been imported its region of the manifest
+    documentation file (see cat/manifest.py), which is memory-mapped on
+    first use. A user-defined word's entry holds its own documentation and
+    parsed record (see WordEntry in cat/namespace.py), so that it goes away
+    with the word when the word is redefined or deleted. Either kind is
+    parsed at most once into a DocRecord:
+
+        text    the documentation as written
+        effect  the stack effect (e.g. '(list:src -> list:src_sorted)')
+        desc    the 'desc:' section
+        tests   the text of each 'test:' section
+        tags    the (lower case) names in the 'tags:' section
+        deps    the word names in the 'deps:' section(s)
+"""
+
+from collections import namedtuple
+import os
+import re
+
+from cat.tags import parseTags
+
+DocRecord = namedtuple( 'DocRecord', 'text effect desc tests tags deps' )
+
+_section = re.compile( r'^\s*(desc|tests?|tags|deps)\s*:(.*)$' )
+_deps    = re.compile( r'deps:\s*(\S+)' )
+
+
+def parseDoc( text ) :
+    '''Parses the documentation of a word
+    :param text: the documentation
+    :type text: string (or None)
+    :rtype: DocRecord
+
+    >>> r = parseDoc( "  abba : (a b -> a b b a)\\n  desc:\\n    mirror\\n  tags:\\n    shuffle\\n  deps:\\n    aba" )
+    >>> r.effect, r.desc, r.tags, r.deps
+    ('(a b -> a b b a)', 'mirror', ['shuffle'], ['aba'])
+    '''
+    text     = text or ''
+    lines    = text.strip().splitlines()
+    effect   = ''
+    sections = [ ]    # (section name, [lines])
+
+    if lines and not _section.match( lines[0] ) :
+        header = lines.pop( 0 )
+        effect = header.split( ':', 1 )[1].strip() if ':' in header else ''
+
+    for line in lines :
+        mo = _section.match( line )
+
+        if mo :
+            sections.append( (mo.group(1), [mo.group(2)]) )
+
+        elif sections :
+            sections[-1][1].append( line )
+
+    def body( lines ) :
+        return "\n".join( line.strip() for line in lines if line.strip() )
+
+    deps = [ ]
+
+    for mo in _deps.finditer( text ) :
+        deps.extend( w for w in mo.group(1).split(",") if w )
+
+    return DocRecord( text,
+                      effect,
+                      "\n".join( body(lines) for name, lines in sections if name == 'desc' ),
+                      [ body(lines) for name, lines in sections if name.startswith('test') ],
+                      parseTags( text ),
+                      deps )
+
+
+class DocStore:
+    '''Holds the documentation of built-in words out of line, addressed by integer handles'''
+
+    def __init__( self ) :
+        self._docs     = [ ]    # handle -> text, or (offset, length) in the manifest docs
+        self._records  = { }    # handle -> DocRecord (parsed when first asked for)
+        self._builtins = { }    # built-in word name -> handle
+        self._map      = None   # the memory-mapped manifest documentation
+
+    def add( self, text ) :
+        '''Stores documentation, returning its handle'''
+        self._docs.append( text )
+        return len( self._docs ) - 1
+
+    def text( self, handle ) :
+        '''Returns the documentation for a handle'''
+        doc = self._docs[handle]
+
+        if isinstance(doc, tuple) :
+            return self._mapped()[doc[0]:doc[0] + doc[1]]
+
+        return doc
+
+    def record( self, handle ) :
+        '''Returns the parsed documentation for a handle
+        :rtype: DocRecord
+        '''
+        if handle not in self._records :
+            self._records[handle] = parseDoc( self.text(handle) )
+
+        return self._records[handle]
+
+    def builtin( self, name, text=None ) :
+        '''Returns the handle of a built-in word's documentation: its docstring (text),
+        or when that is not given (the word's module has not been imported) the
+        word's region of the manifest documentation.
+        '''
+        if name not in self._builtins :
+            if text is None :
+                from cat import manifest
+
+                entry = manifest.wordEntry( name )
+                text  = (entry[2], entry[3]) if entry else None
+
+            self._builtins[name] = self.add( text )
+
+        return self._builtins[name]
+
+    def _mapped( self ) :
+        if self._map is None :
+            from cat import manifest
+            import mmap
+
+            fd = open( os.path.join(manifest._defsPath(), manifest.DOCS_FILE), 'rb' )
+
+            try :
+                self._map = mmap.mmap( fd.fileno(), 0, access=mmap.ACCESS_READ )
+
+            finally :
+                fd.close()
+
+        return self._map
+
+
+# the interpreter-wide documentation store
+store = DocStore()
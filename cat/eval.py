@@ -1,11 +1,13 @@
 
 from contextlib import contextmanager
+import copy
 import pdb
 import sys
 
-from cat.parser import Parser
+from cat.parser import Parser, parse_literal
 from cat.stack import Stack
 from cat.NS import NS
+from cat import vector
 
 class CatEval:
     '''
@@ -33,6 +35,63 @@ class CatEval:
         self.parser    = Parser()
         self.stack     = Stack(initial=initial_stack)
         self.output_fn = output_fn
+        self.configure_stack()
+        self.configure_vectors()
+
+    def fork(self, initial_stack=None, output_fn=None):
+        '''
+        Returns a new interpreter with its own stack that starts with all of the words,
+        variables and namespaces of this one. The namespaces are copied on write and
+        the built-in ones are shared, so forking a fully loaded interpreter is cheap.
+
+        :param initial_stack: the stack of the new interpreter (default: [])
+        :type initial_stack: list
+        :param output_fn: the output function (default: this interpreter's)
+        :type output_fn: function
+        :rtype: CatEval
+
+            >>> e = CatEval()
+            >>> _ = e.eval('define sq {dup *}')
+            >>> f = e.fork([3])
+            >>> _ = f.eval('define cube {dup sq *}')
+            >>> print f.eval('sq')
+            ===> 9
+            >>> e.ns.isWord('cube')
+            (False, None)
+        '''
+        other           = copy.copy(self)
+        other._flags    = dict(self._flags)
+        other.ns        = self.ns.fork(other)
+        other.stack     = Stack(initial=initial_stack)
+        other.output_fn = output_fn if output_fn else self.output_fn
+        other.configure_stack()
+        return other
+
+    def configure_stack(self):
+        '''Applies the 'stack' section of the configuration: the depth limit
+        ('depth_limit', 0 for none) and the tracking of usage statistics ('track_stats')
+        '''
+        config = self.ns.config
+        limit  = config.getint('stack', 'depth_limit') if config.has_option('stack', 'depth_limit') else 0
+        track  = config.getboolean('stack', 'track_stats') if config.has_option('stack', 'track_stats') else False
+        self.stack.configure(limit, track)
+
+    def configure_vectors(self):
+        '''Applies the 'vectors' section of the configuration: whether vectors are
+        backed by NumPy ('use_numpy'; it has no effect if NumPy cannot be imported).
+        The backend is chosen once for the process, by the first interpreter created
+        (forks and later interpreters do not switch the vectors of running ones).
+        '''
+        config = self.ns.config
+
+        if config.has_option('vectors', 'use_numpy'):
+            vector.configure(config.getboolean('vectors', 'use_numpy'))
+
+    def stack_stats(self):
+        '''Returns the usage statistics of the stack (see Stack.stats)
+        :rtype: dictionary
+        '''
+        return self.stack.stats()
 
     def toggle_trace( self ) :
         self._flags['trace'] = not self._flags['trace']
@@ -61,7 +120,7 @@ class CatEval:
                 )
 
         self.ns.addWord(definition.name,
-                list(self.parser.gobble(definition.definition)), doc, ns)
+                self.parser.gobble(definition.definition), doc, ns, definition.effect)
 
     def eval(self, expression):
         """Evaluate the given expression. This is the workhorse."""
@@ -94,7 +153,7 @@ class CatEval:
                     state = '_empty_'
 
                 else:
-                    state = ' '.join(map(repr, self.stack))
+                    state = self.stack.format(use_repr=True, **self.display_limits())[len('===> '):]
 
                 print 'stack: %s' % state
                 print "\natom:", atom
@@ -112,8 +171,8 @@ class CatEval:
                     self.stack.push( val )
                     continue
             
-            # check for already converted number
-            if isinstance(atom, (int, float)) :
+            # check for already converted number (or other value, e.g. a fused pipeline)
+            if not isinstance(atom, (basestring, list)) :
                 self.stack.push( atom )
                 continue
             
@@ -136,7 +195,7 @@ class CatEval:
                 # change execution context if ns has been defined
                 default = self.ns.getUserNS()   # save current execution context
                 
-                func = func[0]  # get the "function" ([1] is the doc)
+                func = func.body  # get the "function" (a WordEntry, see cat/namespace.py)
                 
                 # if a different execution context is specified change to it
                 if ns :
@@ -181,7 +240,7 @@ class CatEval:
                                 args = self.stack.pop()
 
                             if isinstance(args, basestring) and args.startswith("["):  # pylint: disable=E1103
-                                args = eval(args)
+                                arg = parse_literal(args)
 
                             elif isinstance(args, (list, tuple)):
                                 # arguments are taken left-to-right (do arg.reverse() otherwise)
@@ -232,6 +291,18 @@ class CatEval:
         self.eval(f1)
         return self.eval(f2)
 
+    def display_limits(self):
+        '''Returns the configured limits on stack display ('stack' section) as
+        keyword arguments for Stack.format
+        '''
+        limits = { }
+
+        for option, arg in (('max_items', 'max_items'), ('max_item_chars', 'max_chars'), ('max_depth', 'max_depth')):
+            if self.ns.config.has_option('stack', option):
+                limits[arg] = self.ns.config.getint('stack', option) or None
+
+        return limits
+
     def output(self, msg, color=None, comma=False):
         if comma :
             print self.output_fn(msg, color),
@@ -245,6 +316,10 @@ class CatEval:
                 the old stack methods on it.
 
         """
+        if what == 'stack':
+            # not set yet (e.g. an instance being copied)
+            raise AttributeError(what)
+
         return getattr(self.stack, what)
 
     def __str__(self):
@@ -262,10 +337,9 @@ class CatEval:
             >>> print e
             ===> 1 2 3
         """
-        old_stack = self.stack
-        self.stack = Stack(initial=content)
+        mark = self.stack.mark(content)
         try:
             yield
         finally:
-            self.stack = old_stack
+            self.stack.release(mark)
     
@@ -0,0 +1,193 @@
+"""
+    Fusion of list combinator chains in word bodies.
+
+    A body such as '[f] map [p] filter 0 [g] fold' walks the list three
+    times and builds two intermediate lists. fuse() finds such chains,
+    adjacent 'map' and 'filter' stages with literal quotations, optionally
+    ending in a 'fold' (or 'reduce') with a literal initial value, and
+    replaces each with a Pipeline followed by the 'run_fused' word. The
+    pipeline takes one element at a time through every stage: it applies
+    f, tests p and accumulates g in a single loop. The functions are
+    assumed to be free of side effects that depend on the order of
+    evaluation, since the fused loop applies them element by element
+    rather than stage by stage.
+"""
+
+from cat import native
+
+# the word that runs a Pipeline pushed just before it
+RUN = 'run_fused'
+
+_stages = ('map', 'filter')
+_folds  = ('fold', 'reduce')
+
+
+def _quoted( token ) :
+    if isinstance(token, list) :
+        return "[%s]" % " ".join( _quoted(item) for item in token )
+
+    return str( token )
+
+
+class Pipeline( object ) :
+    '''A fused chain of 'map' and 'filter' stages, with an optional 'fold'
+
+    >>> p = Pipeline( [('map', ['dup', '*']), ('filter', ['even'])], (0, ['+']) )
+    >>> p
+    <fused: [dup *] map [even] filter 0 [+] fold>
+    '''
+    __slots__ = ('stages', 'fold')
+
+    def __init__( self, stages, fold=None ) :
+        '''
+        :param stages: the stages in order
+        :type stages: list of tuples of the form (string:'map'|'filter', list:<quotation>)
+        :param fold: the initial value and the quotation of a final fold
+        :type fold: tuple of the form (any:<init>, list:<quotation>), or None
+        '''
+        self.stages = stages
+        self.fold   = fold
+
+    def run( self, cat ) :
+        '''Replaces the list (or sequence) on top of the stack with the result of the chain'''
+        stack    = cat.stack
+        push     = stack.push
+        pop      = stack.pop
+        ev       = cat.eval
+        elements = pop()
+        results  = [ ]
+
+        # built-in quotations such as [inc] and [even] run as Python functions
+        done, result = native.chain( cat, self.stages, self.fold, elements )
+
+        if done :
+            push( result )
+            return
+
+        if self.fold is not None :
+            acc, g = self.fold
+
+        for x in elements :
+            for kind, q in self.stages :
+                push( x )
+                ev( q )
+
+                if kind == 'map' :
+                    x = pop()
+
+                elif not pop() :
+                    break
+
+            else :
+                if self.fold is None :
+                    results.append( x )
+
+                else :
+                    push( acc )
+                    push( x )
+                    ev( g )
+                    acc = pop()
+
+        push( results if self.fold is None else acc )
+
+    def tokens( self ) :
+        '''Returns the body tokens of the chain before it was fused'''
+        tokens = [ ]
+
+        for kind, q in self.stages :
+            tokens.extend( (q, kind) )
+
+        if self.fold is not None :
+            init, g = self.fold
+            tokens.extend( ('"%s"' % init if isinstance(init, basestring) else init, g, 'fold') )
+
+        return tokens
+
+    def source( self ) :
+        '''Returns the Cat source of the chain'''
+        return " ".join( _quoted(token) for token in self.tokens() )
+
+    def __repr__( self ) :
+        return "<fused: %s>" % self.source()
+
+
+def _isWord( token, names ) :
+    return isinstance(token, basestring) and token in names
+
+def _literal( token ) :
+    '''Returns (True, value) if a body token is a literal number or string, else (False, None)'''
+    if isinstance(token, bool) :
+        return False, None
+
+    if isinstance(token, (int, long, float)) :
+        return True, token
+
+    if isinstance(token, basestring) and token.startswith( '"' ) :
+        return True, token.strip( '"' )
+
+    return False, None
+
+def fuse( body ) :
+    '''Replaces the chains of list combinators with literal quotations in a word
+    body by pipelines. A chain is at least two of: '[q] map', '[q] filter' and,
+    last, '<literal> [q] fold'.
+    :param body: the word body (see freeze() in cat/namespace.py)
+    :type body: tuple
+    :rtype: tuple of the form (tuple:<new body>, list:<source of each fused chain>)
+
+    >>> body, fused = fuse( (['dup', '*'], 'map', ['even'], 'filter', 0, ['+'], 'fold', 'dup') )
+    >>> body[1:], fused
+    (('run_fused', 'dup'), ['[dup *] map [even] filter 0 [+] fold'])
+    >>> fuse( (['dup', '*'], 'map', 'dup') )[1]
+    []
+    '''
+    out   = [ ]
+    fused = [ ]
+    ix    = 0
+    n     = len( body )
+
+    while ix < n :
+        stages = [ ]
+        jx     = ix
+
+        while jx + 1 < n and isinstance(body[jx], list) and _isWord( body[jx + 1], _stages ) :
+            stages.append( (body[jx + 1], body[jx]) )
+            jx += 2
+
+        fold = None
+
+        if stages and jx + 2 < n and isinstance(body[jx + 1], list) and _isWord( body[jx + 2], _folds ) :
+            literal, init = _literal( body[jx] )
+
+            if literal :
+                fold = (init, body[jx + 1])
+                jx  += 3
+
+        if len(stages) + (fold is not None) < 2 :
+            out.append( body[ix] )
+            ix += 1
+            continue
+
+        pipeline = Pipeline( stages, fold )
+        out.extend( (pipeline, RUN) )
+        fused.append( pipeline.source() )
+        ix = jx
+
+    return tuple( out ), fused
+
+def unfuse( body ) :
+    '''Returns a word body with its pipelines replaced by the chains they were made from
+
+    >>> unfuse( fuse((['dup', '*'], 'map', ['even'], 'filter', 'dup'))[0] )
+    [['dup', '*'], 'map', ['even'], 'filter', 'dup']
+    '''
+    tokens = [ ]
+    after  = False    # True just after a pipeline (its 'run_fused' is dropped)
+
+    for token in body :
+        if not (after and token == RUN) :
+            tokens.extend( token.tokens() if isinstance(token, Pipeline) else [token] )
+
+        after = isinstance(token, Pipeline)
+
+    return tokens
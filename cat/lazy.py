@@ -0,0 +1,104 @@
+"""
+    Lazy sequences.
+
+    A LazySeq stands for a sequence whose elements are only computed as it
+    is iterated: a range, or the map, filter, take or drop of another
+    sequence. Words that just iterate over their argument (fold, foreach,
+    len, ...) therefore stream a pipeline such as
+    '1000000 lazy_range [dup *] lmap [even] lfilter 0 [+] fold' one element
+    at a time instead of building a list at each step. Every iteration runs
+    the pipeline afresh, so a sequence can be consumed more than once
+    (e.g. after 'dup'); its functions are then evaluated again.
+"""
+
+from itertools import ifilter, imap, islice
+
+
+class LazySeq( object ) :
+    '''A sequence computed as it is iterated
+
+    >>> s = lazyRange( 10 )
+    >>> t = take( lazyMap(s, lambda x: x * x, '[sqr]'), 3 )
+    >>> t, len( t ), list( t ), list( lazyFilter(drop(s, 7), lambda x: x % 2, '[odd]') )
+    (lazy(range(10) [sqr] lmap 3 ltake), 3, [0, 1, 4], [7, 9])
+    '''
+    __slots__ = ('_make', '_desc', '_length')
+
+    def __init__( self, make, desc, length=None ) :
+        '''
+        :param make: returns a new iterator over the elements
+        :type make: function
+        :param desc: how the sequence is made, for display (e.g. 'range(10) [even] lfilter')
+        :type desc: string
+        :param length: the number of elements, if it is known without iterating
+        :type length: int (or None)
+        '''
+        self._make   = make
+        self._desc   = desc
+        self._length = length
+
+    def __iter__( self ) :
+        return self._make()
+
+    def __len__( self ) :
+        '''Returns the number of elements (counting them if need be, without keeping them)'''
+        if self._length is None :
+            count = 0
+
+            for _ in self._make() :
+                count += 1
+
+            return count
+
+        return self._length
+
+    def force( self ) :
+        '''Returns the elements in a list'''
+        return list( self._make() )
+
+    def __repr__( self ) :
+        return "lazy(%s)" % self._desc
+
+    __str__ = __repr__
+
+
+def _describe( seq ) :
+    if isinstance(seq, LazySeq) :
+        return seq._desc
+
+    return "%s(%d)" % (type(seq).__name__, len(seq)) if hasattr( seq, '__len__' ) else type(seq).__name__
+
+def _length( seq ) :
+    '''Returns the length of a sequence if it is known without iterating, else None'''
+    if isinstance(seq, LazySeq) :
+        return seq._length
+
+    return len( seq ) if hasattr( seq, '__len__' ) else None
+
+def lazyRange( *args ) :
+    '''Returns a lazy xrange(*args)'''
+    return LazySeq( lambda: iter(xrange(*args)), "range(%s)" % ", ".join(map(str, args)), len(xrange(*args)) )
+
+def lazyMap( seq, func, desc ) :
+    '''Returns a lazy sequence of func applied to the elements of seq
+    :param desc: the function, for display
+    '''
+    return LazySeq( lambda: imap(func, seq), "%s %s lmap" % (_describe(seq), desc), _length(seq) )
+
+def lazyFilter( seq, func, desc ) :
+    '''Returns a lazy sequence of the elements of seq for which func is true
+    :param desc: the function, for display
+    '''
+    return LazySeq( lambda: ifilter(func, seq), "%s %s lfilter" % (_describe(seq), desc) )
+
+def take( seq, n ) :
+    '''Returns a lazy sequence of the first n elements of seq'''
+    length = _length( seq )
+    return LazySeq( lambda: islice(seq, n), "%s %d ltake" % (_describe(seq), n),
+                    None if length is None else min(length, n) )
+
+def drop( seq, n ) :
+    '''Returns a lazy sequence of the elements of seq after the first n'''
+    length = _length( seq )
+    return LazySeq( lambda: islice(seq, n, None), "%s %d ldrop" % (_describe(seq), n),
+                    None if length is None else max(length - n, 0) )
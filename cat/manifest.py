@@ -0,0 +1,158 @@
+"""
+    Builtin word manifest.
+
+    The manifest maps every built-in word name to the 'defs' module and
+    function that implement it, together with the offset and length of its
+    documentation in a companion text file. With a manifest in place the
+    'defs' modules are only imported when one of their words is first
+    resolved (see LazyNameSpace in cat/namespace.py).
+
+    The manifest is generated at startup when it is missing, and regenerated
+    when a 'defs' module has been added or edited since it was built. Where
+    the 'defs' directory cannot be written the modules are simply imported.
+    It can also be generated (from the directory containing 'Cat/') with:
+
+        python Cat/catlang.py --build-manifest
+"""
+
+import os
+import sys
+
+# generated files, both kept in the 'defs' package directory
+MANIFEST_FILE = 'manifest.py'
+DOCS_FILE     = 'manifest.docs'
+
+
+def _defsPath() :
+    '''Returns the directory of the 'defs' package (without importing its modules)'''
+    return os.path.dirname( __import__('defs').__file__ )
+
+def _sourceTime( path, module ) :
+    '''Returns the modification time of a defs module's source file'''
+    return os.path.getmtime( os.path.join(path, module + ".py") )
+
+def build( modules ) :
+    '''Imports each of the 'defs' modules and writes the manifest and documentation files
+    :param modules: the names of the defs modules (e.g. NS.defns)
+    :type modules: list of strings
+    :rtype: integer (number of words written to the manifest)
+    '''
+    path    = _defsPath()
+    docs    = open( os.path.join(path, DOCS_FILE), 'wb' )
+    offset  = 0
+    entries = { }
+    times   = { }
+
+    for module in modules :
+        item  = __import__( "defs." + module, fromlist=['_returnNS'] )
+        words = item._returnNS().as_wordDict()
+        times[module] = _sourceTime( path, module )
+
+        for name in sorted(words) :
+            func = words[name].body
+            doc  = words[name].doc or ''
+
+            if isinstance(doc, unicode) :
+                doc = doc.encode( 'utf-8' )
+
+            docs.write( doc )
+            entries[name] = (module, func.__name__, offset, len(doc))
+            offset       += len( doc )
+
+    docs.close()
+
+    fd = open( os.path.join(path, MANIFEST_FILE), 'w' )
+    fd.write( "# -*- coding: utf-8 -*-\n" )
+    fd.write( "# Generated by cat/manifest.py -- do not edit\n\n" )
+    fd.write( "# <module name> : <modification time of the module source>\n" )
+    fd.write( "modules = %r\n\n" % times )
+    fd.write( "# <word name> : (<module name>, <function name>, <doc offset>, <doc length>)\n" )
+    fd.write( "words = {\n" )
+
+    for name in sorted(entries) :
+        fd.write( "    %r : %r,\n" % (name, entries[name]) )
+
+    fd.write( "}\n" )
+    fd.close()
+
+    # a compiled manifest written in the same second would hide the new one
+    try :
+        os.remove( os.path.join(path, MANIFEST_FILE + "c") )
+
+    except OSError :
+        pass
+
+    return len( entries )
+
+def _stale( manifest, path, modules ) :
+    '''Returns True if one of the modules is missing from the manifest or was edited after it was built'''
+    for module in modules :
+        if module not in manifest.modules :
+            return True
+
+        try :
+            if _sourceTime(path, module) > manifest.modules[module] :
+                return True
+
+        except OSError :
+            continue
+
+    return False
+
+def load( modules ) :
+    '''Loads the manifest, generating it first if it is missing or out of date
+    :param modules: the names of the defs modules (e.g. NS.defns)
+    :type modules: list of strings
+    :rtype: a dict of the form {<module name> : [<word name>, ...]} or None if there is no manifest
+    '''
+    path = _defsPath()
+
+    try :
+        from defs import manifest
+
+    except ImportError :
+        manifest = None
+
+    if manifest is None or _stale( manifest, path, modules ) :
+        try :
+            build( modules )
+
+        except (IOError, OSError) :
+            pass
+
+        else :
+            if manifest is None :
+                from defs import manifest
+
+            else :
+                manifest = reload( manifest )
+
+    if manifest is None :
+        return None
+
+    modules = { }
+
+    # a module edited since the manifest was built is imported in the usual way
+    for module, mtime in manifest.modules.items() :
+        try :
+            if _sourceTime(path, module) <= mtime :
+                modules[module] = [ ]
+
+        except OSError :
+            continue
+
+    for name, entry in manifest.words.items() :
+        if entry[0] in modules :
+            modules[entry[0]].append( name )
+
+    return modules
+
+def wordEntry( name ) :
+    '''Returns the manifest entry for a word
+    :param name: the word name
+    :type name: string
+    :rtype: a tuple of the form (<module>, <function>, <doc offset>, <doc length>) or None
+    '''
+    from defs import manifest
+
+    return manifest.words.get( name )
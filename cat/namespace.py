@@ -1,6 +1,95 @@
 # NameSpace class wraps low-level functionality
+import copy
 from termcolor import colored
 
+
+def _intern( name ) :
+    '''Interns a (byte) string so that equal names share one object'''
+    return intern( name ) if type(name) is str else name
+
+def freeze( definition ) :
+    '''Returns the body of a user-defined word as a tuple with its word names
+    interned. Quotations stay lists: executing the word pushes them onto the stack.
+
+    >>> freeze( [1, 'dup', [2, 'swap']] )
+    (1, 'dup', [2, 'swap'])
+    '''
+    def _frozen( token ) :
+        if isinstance(token, list) :
+            return [ _frozen(item) for item in token ]
+        
+        return _intern( token )
+    
+    return tuple( _frozen(token) for token in definition )
+
+
+class WordEntry( object ) :
+    '''The entry of a word in a namespace's '__words__' table
+        body    the function of a built-in word, or the tuple of a user word's definition
+        home    the namespace (or 'defs' module) in which the word was defined
+        effect  the stack effect (e.g. '(a b -> b a)'), '' if not known
+        flags   BUILTIN for words defined in Python
+        doc     the documentation (a built-in word's docstring)
+        record  a user word's parsed documentation, once asked for (see docRecord)
+    An entry indexes like the (definition, documentation) pair it replaces:
+    entry[0] is the body and entry[1] the documentation.
+
+    >>> e = WordEntry( ('dup', '*'), 'sq : (n -> n)', 'user', '(n -> n)' )
+    >>> e[0], e[1], e.home, e.docRecord().effect
+    (('dup', '*'), 'sq : (n -> n)', 'user', '(n -> n)')
+    '''
+    __slots__ = ('body', 'home', 'effect', 'flags', 'doc', 'record')
+    
+    BUILTIN = 1
+    
+    def __init__( self, body, doc, home='', effect='', flags=0 ) :
+        self.body   = body
+        self.doc    = doc
+        self.home   = _intern( home )
+        self.effect = _intern( effect or '' )
+        self.flags  = flags
+        self.record = None
+    
+    def __getitem__( self, ix ) :
+        if ix in (0, -2) :
+            return self.body
+        
+        if ix in (1, -1) :
+            return self.doc
+        
+        raise IndexError, "word entry index out of range"
+    
+    def __len__( self ) :
+        return 2
+    
+    def __iter__( self ) :
+        yield self.body
+        yield self.doc
+    
+    def isBuiltin( self ) :
+        return bool( self.flags & WordEntry.BUILTIN )
+    
+    def docRecord( self ) :
+        '''Returns the parsed documentation of a user word (see cat/docs.py), parsing
+        it the first time. Built-in words are parsed in the doc store instead.'''
+        if self.record is None :
+            from cat.docs import parseDoc
+            
+            self.record = parseDoc( self.doc )
+        
+        return self.record
+    
+    def definition( self ) :
+        '''Returns the body for display: a user word's definition as a list (with its
+        fused chains as they were written, see cat/fusion.py)'''
+        if self.flags & WordEntry.BUILTIN :
+            return self.body
+        
+        from cat.fusion import unfuse
+        
+        return unfuse( self.body )
+
+
 class NameSpace:
     def __init__(self):
         self._ns = { '__words__' : { },
@@ -8,6 +97,33 @@ class NameSpace:
                      '__inst__'  : { },
                      '__links__' : [ ],
                      '__loadList__' : [ ] }
+        
+        # names of the tables in _ns that may be shared with a copy of this namespace
+        self._shared = set()
+    
+    # copy-on-write: a copy shares all of the tables of the original and a table is
+    # only duplicated when either namespace first changes it
+    def copy( self ) :
+        '''Returns a copy of the namespace in constant time. Like dict.copy(), the
+        values held in the tables (definitions, variables, instances) are not copied.
+        '''
+        other         = NameSpace()
+        other._ns     = dict( self._ns )
+        other._shared = set( self._ns )
+        self._shared  = set( self._ns )
+        return other
+    
+    def _own( self, table ) :
+        '''Returns a table of _ns that this namespace is free to change'''
+        if table in self._shared :
+            self._ns[table] = copy.copy( self._ns[table] )
+            self._shared.discard( table )
+        
+        return self._ns[table]
+    
+    def _replace( self, table, value ) :
+        self._ns[table] = value
+        self._shared.discard( table )
     
     # general searching facility for internal dictionaries
     def _fetchFromDict( self, item, dict ) :
@@ -22,39 +138,66 @@ class NameSpace:
     
     # manipulate WORDS
     # note: a directory entry for words looks like this:
-    #   <name of word> : (<function>, <documentation>)
+    #   <name of word> : WordEntry
+    # a (<function>, <documentation>) pair is converted to a WordEntry
     def addWord( self, word, value ) :
-        self._ns['__words__'][word] = value
+        if not isinstance(value, WordEntry) :
+            value = WordEntry( *value )
+        
+        self._own('__words__')[_intern(word)] = value
     
     def getWord( self, word ) :
         return self._fetchFromDict(word, '__words__')
     
     def delWord( self, word ) :
         if word in self._ns['__words__'] :
-            del self._ns['__words__'][word]
+            del self._own('__words__')[word]
     
     def hasWord( self, name ) :
         return self._fetchFromDict(name, '__words__')[0]
+
+    def getDoc( self, word ) :
+        found, value = self.getWord( word )
+        
+        if not found :
+            return None
+        
+        return value.doc
     
+    def getDocRecord( self, word ) :
+        found, value = self.getWord( word )
+        
+        if not found :
+            return None
+        
+        if not value.isBuiltin() :
+            return value.docRecord()
+        
+        from cat.docs import store
+        
+        # a built-in word: the documentation is its docstring
+        return store.record( store.builtin(word, value.doc) )
+
     def allWordNames( self ) :
         return self._ns['__words__'].keys()
     
     def updateWords( self, dict ) :
-        self._ns['__words__'].update( dict )
+        for word, value in dict.items() :
+            self.addWord( word, value )
     
     def delAllWords( self ) :
-        self._ns['__words__'] = { }
+        self._replace( '__words__', { } )
     
     # manipulate VARIABLES
     def addVar(self, var, value ) :
-        self._ns['__vars__'][var] = value
+        self._own('__vars__')[var] = value
     
     def getVar( self, var ) :
         return self._fetchFromDict(var, '__vars__')
     
     def delVar( self, var ) :
         if var in self._ns['__vars__'] :
-            del self._ns['__vars__'][var]
+            del self._own('__vars__')[var]
     
     def hasVar( self, name ) :
         return self._fetchFromDict( name, '__vars__' )[0]
@@ -64,7 +207,7 @@ class NameSpace:
     
     # manipulate INSTANCES
     def addInst( self, inst, value ) :
-        self._ns['__inst__'][inst] = value
+        self._own('__inst__')[inst] = value
     
     def getInst( self, inst ) :
         return self._fetchFromDict(inst, '__inst__')
@@ -74,7 +217,7 @@ class NameSpace:
     
     def delInst( self, inst ) :
         if inst in self._ns['__inst__'] :
-            del self._ns['__inst__'][inst]
+            del self._own('__inst__')[inst]
     
     def allInstNames( self ) :
         return self._ns['__inst__'].keys()
@@ -85,7 +228,7 @@ class NameSpace:
     # manipulate LINKS
     def addLink( self, link ) :
         if link not in self._ns['__links__'] :
-            self._ns['__links__'].append( link )
+            self._own('__links__').append( link )
     
     def hasLink( self, linkName ) :
         return linkName in self._ns['__links__']
@@ -101,24 +244,24 @@ class NameSpace:
             raise IndexError, "Index '%d' to links is out of range"
    
     def popLink( self ) :
-        return self._ns['__links__'].pop()
+        return self._own('__links__').pop()
     
     def peekLink( self ) :
         return self._ns['__links__'][-1]
     
     def delLink( self, link ) :
         if link in self._ns['__links__'] :
-            self._ns['__links__'].remove( link )
+            self._own('__links__').remove( link )
     
     def replaceLinks( self, newList ) :
         if isinstance(newList, (list, tuple)) :
-            self._ns['__links__'] = list( newList )
+            self._replace( '__links__', list(newList) )
         
         else :
-            self._ns['__links__'] = [newList]
+            self._replace( '__links__', [newList] )
     
     def appendLinks( self, links ) :
-        self._ns['__links__'].extend( links )
+        self._own('__links__').extend( links )
     
     def dedupLinks( self ) :
         lst = reduce( lambda y,x: y + [x] if x not in y else y, self.getLinks(), [] )
@@ -127,21 +270,21 @@ class NameSpace:
     # manipulate FILES in the loadList
     def addFile( self, name ) :
         if name not in self._ns['__loadList__'] :
-            self._ns['__loadList__'].append( name )
+            self._own('__loadList__').append( name )
     
     def getLoadList( self ) :
         return self._ns['__loadList__']
     
     def replaceLoadList( self, newList ) :
         if isinstance(newList, (list, tuple)) :
-            self._ns['__loadList__'] = list( newList )
+            self._replace( '__loadList__', list(newList) )
         
         else :
-            self._ns['__loadList__'] = [newList]
+            self._replace( '__loadList__', [newList] )
     
     def delFile( self, fileName ) :
         if fileName in self._ns['__loadList__'] :
-            self._ns['__loadList__'].remove( fileName )
+            self._own('__loadList__').remove( fileName )
     
     def hasFile( self, fileName ) :
         return fileName in self._ns['__loadList__']
@@ -204,7 +347,7 @@ class NameSpace:
             else :            
                 for key in keys :
                     if what == '__words__' :
-                        print colored("  %s: %s" % (key, self._ns[what][key][0]), color )
+                        print colored("  %s: %s" % (key, self._ns[what][key].definition()), color )
                     
                     else :
                         print colored( "  %s: %s" % (key, self._ns[what][key]), color )
@@ -220,6 +363,78 @@ class NameSpace:
             raise ValueError, "'%s' cannot be dumped" % what
 
 
+class LazyNameSpace( NameSpace ) :
+    '''A built-in ('defs') namespace whose module is imported only when one of its
+    words is first resolved. Until then the word names come from the manifest
+    (see cat/manifest.py).
+    '''
+    def __init__( self, module, names ) :
+        NameSpace.__init__( self )
+        self._module = module
+        self._names  = set( names )
+        self._loaded = False
+
+    def _load( self ) :
+        if not self._loaded :
+            from cat.startup import profiler
+            
+            with profiler.phase( "defs." + self._module ) :
+                item     = __import__( "defs." + self._module, fromlist=['_returnNS'] )
+            
+            self._ns     = item._returnNS()._ns
+            self._shared = set( self._ns )    # the tables belong to the module's namespace
+            self._loaded = True
+
+    def isLoaded( self ) :
+        return self._loaded
+
+    def getDoc( self, word ) :
+        '''Returns the documentation of a word without importing the module'''
+        if self._loaded :
+            return NameSpace.getDoc( self, word )
+
+        from cat.docs import store
+
+        return store.text( store.builtin(word) ) if word in self._names else None
+
+    def getDocRecord( self, word ) :
+        if self._loaded :
+            return NameSpace.getDocRecord( self, word )
+
+        from cat.docs import store
+
+        return store.record( store.builtin(word) ) if word in self._names else None
+
+    # words: names are answered from the manifest, anything else loads the module
+    def hasWord( self, name ) :
+        if self._loaded :
+            return NameSpace.hasWord( self, name )
+
+        return isinstance(name, basestring) and name in self._names
+
+    def allWordNames( self ) :
+        if self._loaded :
+            return NameSpace.allWordNames( self )
+
+        return list( self._names )
+
+    def getWord( self, word ) :
+        self._load()
+        return NameSpace.getWord( self, word )
+
+    def copy( self ) :
+        self._load()
+        return NameSpace.copy( self )
+
+    def as_wordDict( self ) :
+        self._load()
+        return NameSpace.as_wordDict( self )
+
+    def dump( self, what, color ) :
+        self._load()
+        NameSpace.dump( self, what, color )
+
+
 def define(ns, words):
     """Decorator that inserts the wrapped function into a NameSpace (ns) as <word>"""
     def _decorator(func):
@@ -230,7 +445,8 @@ def define(ns, words):
             wordList = words
         
         for word in wordList :
-            ns.addWord(word.strip(), (func, func.__doc__))
+            ns.addWord(word.strip(), WordEntry(func, func.__doc__, func.__module__.split('.')[-1],
+                                               flags=WordEntry.BUILTIN))
         
         return func
 
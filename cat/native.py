@@ -0,0 +1,253 @@
+"""
+    Native fast paths for the list combinators.
+
+    map, filter, fold and foreach evaluate their quotation once per element:
+    a push, a full eval (with its name lookups) and a pop. When the quotation
+    is a single built-in word such as [+], [inc] or [even], or one of a few
+    short sequences of built-ins such as [dup *], the functions here run the
+    Python equivalent instead: a comprehension, sum, or reduce over an
+    operator.
+
+    The words in the tables have no side effects, so if a fast path raises,
+    it reports that it did not apply. The combinator then runs the quotation
+    the ordinary way, which produces the usual result or error, and leaves the
+    stack as the word would.
+"""
+
+import operator
+
+from cat.plist import PList
+
+_sequences = (list, tuple, PList, basestring)
+
+class _Fallback( Exception ) :
+    '''Raised by a native function when the word would do something else'''
+
+def _min( acc, x ) :
+    # 'min' with a list, tuple or string on top takes the min of that argument alone
+    if isinstance(x, _sequences) :
+        raise _Fallback
+
+    return min( x, acc )
+
+def _max( acc, x ) :
+    if isinstance(x, _sequences) :
+        raise _Fallback
+
+    return max( x, acc )
+
+def _neg( x ) :
+    # 'neg' only negates numbers
+    if isinstance(x, (int, long, float)) :
+        return -x
+
+    raise _Fallback
+
+def _table( entries ) :
+    '''Returns a table of (tuple:<words>) -> (tuple:<home of each word>, function:<native>)
+    from entries of the form (string:<aliases>, string:<homes>, function:<native>),
+    where an alias is a space-separated sequence of words'''
+    table = { }
+
+    for aliases, homes, fn in entries :
+        for words in aliases.split( ',' ) :
+            table[tuple(words.split())] = (tuple(homes.split()), fn)
+
+    return table
+
+# quotations of one argument: (x -> fn(x))
+_unary = _table( [
+    ('inc,++',                'cat_arithmetic',              lambda x: operator.iadd(x, 1)),
+    ('dec,--',                'cat_arithmetic',              lambda x: operator.isub(x, 1)),
+    ('even',                  'cat_arithmetic',              lambda x: x % 2 == 0),
+    ('not',                   'cat_arithmetic',              operator.not_),
+    ('neg',                   'cat_arithmetic',              _neg),
+    ('to_bool,as_bool,bool',  'cat_arithmetic',              bool),
+    ('eqz',                   'cat_conditionals',            lambda x: x == 0),
+    ('nez',                   'cat_conditionals',            lambda x: x != 0),
+    ('gtz',                   'cat_conditionals',            lambda x: x > 0),
+    ('gez',                   'cat_conditionals',            lambda x: x >= 0),
+    ('ltz',                   'cat_conditionals',            lambda x: x < 0),
+    ('dup *,dup mul',         'cat_stack cat_arithmetic',    lambda x: x * x),
+    ('dup +,dup add',         'cat_stack cat_arithmetic',    lambda x: x + x),
+] )
+
+# quotations of two arguments: (acc x -> fn(acc, x)), x being on top of the stack
+_binary = _table( [
+    ('+,add',                 'cat_arithmetic',              operator.add),
+    ('-,sub',                 'cat_arithmetic',              operator.sub),
+    ('*,mul',                 'cat_arithmetic',              operator.mul),
+    ('/,div',                 'cat_arithmetic',              operator.div),
+    ('%,mod',                 'cat_arithmetic',              operator.mod),
+    ('and,&&',                'cat_arithmetic',              lambda acc, x: x and acc),
+    ('or,||',                 'cat_arithmetic',              lambda acc, x: x or acc),
+    ('min',                   'cat_arithmetic',              _min),
+    ('max',                   'cat_arithmetic',              _max),
+] )
+
+
+def _lookup( cat, func, table ) :
+    '''Returns the native function of a quotation from a table, or None if it has none
+    (or if a word in it does not resolve to the built-in of the table)'''
+    if not isinstance(func, (list, tuple)) or cat._flags['trace'] :
+        return None
+
+    for word in func :
+        if not isinstance(word, basestring) :
+            return None
+
+    entry = table.get( tuple(func) )
+
+    if entry is None :
+        return None
+
+    homes, fn = entry
+
+    for word, home in zip( func, homes ) :
+        # a variable of the same name would be pushed instead of the word being run
+        if cat.ns.getVar( word )[0] :
+            return None
+
+        defined, word_entry, _ = cat.ns.getWord( word )
+
+        if not defined or not word_entry.isBuiltin() or word_entry.home != home :
+            return None
+
+    return fn
+
+def _reiterable( elements ) :
+    # an iterator can only be consumed once, so it could not be gone through again
+    try :
+        return iter( elements ) is not elements
+
+    except TypeError :
+        return False
+
+def _reduce( fn, elements, init ) :
+    if fn is operator.add and isinstance(init, (int, long, float)) :
+        return sum( elements, init )
+
+    return reduce( fn, elements, init )
+
+def unary( cat, func ) :
+    '''Returns the Python function of one argument that a quotation computes, or None
+    :param cat: the interpreter (to resolve the words of the quotation)
+    :type cat: CatEval
+    :param func: the quotation
+    :type func: list
+    :rtype: function (or None)
+    '''
+    return _lookup( cat, func, _unary )
+
+def binary( cat, func ) :
+    '''Returns the Python function of two arguments (the value below and the value
+    on top of the stack) that a quotation computes, or None
+    :param cat: the interpreter (to resolve the words of the quotation)
+    :type cat: CatEval
+    :param func: the quotation
+    :type func: list
+    :rtype: function (or None)
+    '''
+    return _lookup( cat, func, _binary )
+
+def applier( cat, func ) :
+    '''Returns a Python function of one argument evaluating a quotation, natively if
+    it can (for an argument the native function fails on, the quotation is evaluated)
+    :param cat: the interpreter
+    :type cat: CatEval
+    :param func: the quotation
+    :type func: list
+    :rtype: function
+    '''
+    def evaluate( x ) :
+        cat.stack.push( x )
+        cat.eval( func )
+        return cat.stack.pop()
+
+    fn = unary( cat, func )
+
+    if fn is None :
+        return evaluate
+
+    def apply( x ) :
+        try :
+            return fn( x )
+
+        except Exception :
+            return evaluate( x )
+
+    return apply
+
+def map( cat, func, elements ) :
+    '''Maps a quotation over elements natively
+    :rtype: tuple of the form (bool:<done natively>, list:<results>)
+    '''
+    fn = unary( cat, func )
+
+    if fn is None or not _reiterable( elements ) :
+        return False, None
+
+    try :
+        return True, [ fn(x) for x in elements ]
+
+    except Exception :
+        return False, None
+
+def filter( cat, func, elements ) :
+    '''Filters elements with a quotation natively
+    :rtype: tuple of the form (bool:<done natively>, list:<elements passing the test>)
+    '''
+    fn = unary( cat, func )
+
+    if fn is None or not _reiterable( elements ) :
+        return False, None
+
+    try :
+        return True, [ x for x in elements if fn(x) ]
+
+    except Exception :
+        return False, None
+
+def fold( cat, func, init, elements ) :
+    '''Folds elements with a quotation natively
+    :rtype: tuple of the form (bool:<done natively>, any:<result>)
+    '''
+    fn = binary( cat, func )
+
+    if fn is None or not _reiterable( elements ) :
+        return False, None
+
+    try :
+        return True, _reduce( fn, elements, init )
+
+    except Exception :
+        return False, None
+
+def chain( cat, stages, final, elements ) :
+    '''Runs a fused chain of map and filter stages, with an optional fold (see
+    cat/fusion.py), natively if each of its quotations has a native function
+    :rtype: tuple of the form (bool:<done natively>, any:<result>)
+    '''
+    fns = [ (kind == 'map', unary(cat, q)) for kind, q in stages ]
+    g   = binary( cat, final[1] ) if final is not None else None
+
+    if None in [ fn for _, fn in fns ] or (final is not None and g is None) or not _reiterable( elements ) :
+        return False, None
+
+    def run() :
+        for x in elements :
+            for isMap, fn in fns :
+                if isMap :
+                    x = fn( x )
+
+                elif not fn( x ) :
+                    break
+
+            else :
+                yield x
+
+    try :
+        return True, list( run() ) if final is None else _reduce( g, run(), final[0] )
+
+    except Exception :
+        return False, None
@@ -0,0 +1,160 @@
+"""
+    Parallel map, filter and fold over a pool of worker interpreters.
+
+    A list is split into chunks that worker processes (each with its own
+    CatEval) map, filter or fold; the parent puts the results back in
+    order. The pool is created on first use and reused by later calls
+    until the number of workers changes.
+
+    Workers are started from a fresh interpreter, so the user words and
+    variables a quotation refers to (directly or through other user words)
+    are sent along with each chunk and installed in the worker before it
+    runs the chunk. A worker keeps what it has installed, and only
+    reinstalls a word whose definition has changed.
+"""
+
+import multiprocessing
+
+_pool     = None    # the pool of workers
+_poolSize = 0       # the number of workers in _pool
+
+_worker    = None   # in a worker process: its interpreter
+_installed = { }    # in a worker process: (namespace, name) -> the definition installed
+
+
+def cpuCount() :
+    try :
+        return multiprocessing.cpu_count()
+
+    except NotImplementedError :
+        return 1
+
+def pool( workers ) :
+    '''Returns the pool of worker interpreters, (re)creating it if it does not have
+    the given number of workers
+    :param workers: the number of worker processes
+    :type workers: int
+    :rtype: multiprocessing.Pool
+    '''
+    global _pool, _poolSize
+
+    if _pool is None or _poolSize != workers :
+        shutdown()
+        _pool     = multiprocessing.Pool( workers, initializer=_initWorker )
+        _poolSize = workers
+
+    return _pool
+
+def shutdown() :
+    '''Stops the worker processes (if any)'''
+    global _pool, _poolSize
+
+    if _pool is not None :
+        _pool.terminate()
+        _pool.join()
+
+    _pool     = None
+    _poolSize = 0
+
+def dependencies( cat, func ) :
+    '''Returns the user words and variables that a quotation needs, directly or
+    through the user words it uses
+    :param cat: the interpreter
+    :type cat: CatEval
+    :param func: the quotation
+    :type func: list
+    :rtype: tuple of the form (list:<(namespace, name, definition) of each word>,
+                               list:<(namespace, name, value) of each variable>)
+    '''
+    words, variables, seen = [ ], [ ], set()
+    pending = [ func ]
+
+    while pending :
+        token = pending.pop()
+
+        if isinstance(token, (list, tuple)) :
+            pending.extend( token )
+            continue
+
+        if not isinstance(token, basestring) or token.startswith( '"' ) or token in seen :
+            continue
+
+        seen.add( token )
+        ns, name = token.split( ":", 1 ) if token.count( ":" ) == 1 else (None, token)
+
+        if ns is not None and not cat.ns.isNS( ns ) :
+            continue
+
+        defined, value = cat.ns.getVar( token )
+
+        if defined :
+            variables.append( (ns or 'user', name, value) )
+            continue
+
+        defined, entry, _ = cat.ns.getWord( name, ns ) if ns else cat.ns.getWord( name )
+
+        if defined and not entry.isBuiltin() :
+            body = entry.definition()
+            words.append( (ns or 'user', name, body) )
+            pending.append( body )
+
+    return words, variables
+
+def chunks( items, size ) :
+    '''Splits a list into chunks of (at most) size items'''
+    return [ items[ix:ix + size] for ix in xrange(0, len(items), size) ]
+
+def run( cat, kind, func, items, workers, size ) :
+    '''Runs 'map', 'filter' or 'fold' (without an initial value) with func over the
+    chunks of items in the pool. Returns the result for each chunk, in order.
+    '''
+    words, variables = dependencies( cat, func )
+    tasks            = [ (kind, func, chunk, words, variables) for chunk in chunks(items, size) ]
+
+    if len(tasks) == 1 :
+        return [ _runChunk(tasks[0], cat.fork()) ]
+
+    return pool( workers ).map( _runChunk, tasks, 1 )
+
+def _initWorker() :
+    global _worker, _installed
+    from cat.eval import CatEval
+
+    _worker    = CatEval( output_fn=lambda msg, colour=None: msg )
+    _installed = { }
+
+def _install( cat, words, variables ) :
+    for ns, name, body in words :
+        if _installed.get( (ns, name) ) != body :
+            if not cat.ns.isNS( ns ) :
+                cat.ns.createNS( ns )
+
+            cat.ns.addWord( name, body, '', ns )
+            _installed[(ns, name)] = body
+
+    for ns, name, value in variables :
+        if not cat.ns.isNS( ns ) :
+            cat.ns.createNS( ns )
+
+        cat.ns.addVar( name, value, ns )
+
+def _runChunk( task, cat=None ) :
+    '''Runs one chunk (in a worker, or in cat if given)'''
+    kind, func, chunk, words, variables = task
+
+    if cat is None :
+        cat = _worker
+        _install( cat, words, variables )
+
+    cat.stack.clear()
+
+    if kind == 'fold' :
+        cat.stack.push( chunk[1:] )
+        cat.stack.push( chunk[0] )
+
+    else :
+        cat.stack.push( chunk )
+
+    cat.stack.push( func )
+    cat.eval( kind )
+    return cat.stack.pop()
@@ -6,10 +6,85 @@
 
 
 from collections import namedtuple
+from itertools import count
 import re
 
 Definition = namedtuple('Definition', ['name', 'effect', 'description', 'definition', 'dependencies'])
 
+# parse_literal() cache: <source string> : [<value>, <copy function>, <last use>]
+_literals     = {}
+_LITERAL_SIZE = 256
+_tick         = count().next
+
+_CONTAINERS = (list, tuple, dict)
+
+
+def _fresh(value):
+    """Returns a copy of a parsed literal sharing only its immutable parts"""
+    if type(value) is list:
+        return [_fresh(item) for item in value]
+
+    if type(value) is dict:
+        return dict((key, _fresh(item)) for key, item in value.iteritems())
+
+    if type(value) is tuple:
+        return tuple(_fresh(item) for item in value)
+
+    return value
+
+def _copier(value):
+    """Returns the cheapest function that copies a parsed literal for a caller"""
+    if not isinstance(value, _CONTAINERS):
+        return None
+
+    flat = not any(isinstance(item, _CONTAINERS) for item in value)
+
+    if flat and type(value) is tuple:
+        return None     # immutable throughout
+
+    if flat and type(value) is list:
+        return list
+
+    return _fresh
+
+def _evict():
+    """Drops the least recently used half of the literal cache"""
+    recent = sorted(_literals.iteritems(), key=lambda item: item[1][2])[len(_literals) // 2:]
+    _literals.clear()
+    _literals.update(recent)
+
+def parse_literal(text):
+    """Returns the value of a Python literal: a list, tuple, dict, number, string,
+    True, False or None (or a nesting of them). Unlike eval() nothing else is
+    evaluated. Values are cached by source text (least recently used values are
+    dropped first); each call returns a new copy of any list or dict.
+
+    >>> parse_literal("[1, 'a', (2.5, None)]")
+    [1, 'a', (2.5, None)]
+    >>> parse_literal("__import__('os')")
+    Traceback (most recent call last):
+    ...
+    ValueError: '__import__('os')' is not a literal
+    """
+    entry = _literals.get(text)
+
+    if entry is None:
+        from ast import literal_eval
+
+        try:
+            value = literal_eval(text.strip())
+
+        except (ValueError, SyntaxError):
+            raise ValueError("'%s' is not a literal" % text)
+
+        if len(_literals) >= _LITERAL_SIZE:
+            _evict()
+
+        entry = _literals[text] = [value, _copier(value), 0]
+
+    entry[2] = _tick()
+    return entry[1](entry[0]) if entry[1] else entry[0]
+
 
 class Parser:
 
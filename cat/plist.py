@@ -0,0 +1,209 @@
+"""
+    Persistent lists.
+
+    A PList is an immutable view, from start to end, of a list of items
+    that it shares with other PLists. Taking the rest of a PList, splitting
+    it or removing its last item (uncons) makes a new view of the same
+    items in O(1). Adding an item at the end (cons) is O(1) amortized: the
+    item is appended to the shared list when the view ends where that list
+    ends (or when the same item is already there), and the view is copied
+    first otherwise. Appended items never change what other views hold, so
+    a PList can be used in several places (e.g. a literal list in a word
+    body) without being copied defensively.
+
+    The list words (cons, uncons, rest, split_at, concat, ...) return
+    PLists. A PList iterates, indexes, compares, repeats (*) and prints like
+    a Python list, and the type words (typeof, typename) report it as one;
+    tolist() (or the as_list word) converts it to one where a word
+    needs a Python list.
+"""
+
+from itertools import imap
+
+
+class PList( object ) :
+    '''An immutable list sharing its items with the PLists made from it
+
+    >>> a = PList( [1, 2, 3] )
+    >>> b = a.cons( 4 )
+    >>> c = a.cons( 5 )
+    >>> a, b, c, b[1:], b.uncons(), b[1:] == [2, 3, 4]
+    ([1, 2, 3], [1, 2, 3, 4], [1, 2, 3, 5], [2, 3, 4], ([1, 2, 3], 4), True)
+    >>> b[2:] * 2, 2 * b[2:]
+    ([3, 4, 3, 4], [3, 4, 3, 4])
+    '''
+    __slots__ = ('_items', '_start', '_end')
+
+    def __init__( self, items=() ) :
+        '''
+        :param items: the items (copied)
+        :type items: iterable
+        '''
+        self._items = list( items )
+        self._start = 0
+        self._end   = len( self._items )
+
+    @classmethod
+    def _view( cls, items, start, end ) :
+        view        = object.__new__( cls )
+        view._items = items
+        view._start = start
+        view._end   = end
+        return view
+
+    def tolist( self ) :
+        '''Returns the items in a (new) Python list'''
+        return self._items[self._start:self._end]
+
+    def cons( self, item ) :
+        '''Returns a PList of these items followed by item'''
+        items, end = self._items, self._end
+
+        if end == len(items) :
+            items.append( item )
+
+        elif items[end] is not item :
+            items = items[self._start:end]
+            items.append( item )
+            return PList._view( items, 0, len(items) )
+
+        return PList._view( items, self._start, end + 1 )
+
+    def uncons( self ) :
+        '''Returns a PList of all but the last item, and the last item'''
+        if self._end == self._start :
+            raise IndexError, "pop from empty list"
+
+        return PList._view( self._items, self._start, self._end - 1 ), self._items[self._end - 1]
+
+    def extend( self, other ) :
+        '''Returns a PList of these items followed by those of other (the + operator)'''
+        items, end = self._items, self._end
+
+        if end != len(items) :
+            items = items[self._start:end]
+            return PList._view( items, 0, len(items) ).extend( other )
+
+        items.extend( other.tolist() if isinstance(other, PList) else other )
+        return PList._view( items, self._start, len(items) )
+
+    def reversed( self ) :
+        '''Returns a PList of the items in reverse order'''
+        items = self.tolist()
+        items.reverse()
+        return PList._view( items, 0, len(items) )
+
+    def index( self, item ) :
+        try :
+            return self._items.index( item, self._start, self._end ) - self._start
+
+        except ValueError :
+            raise ValueError, "%r is not in list" % (item,)
+
+    def count( self, item ) :
+        return self.tolist().count( item )
+
+    def __len__( self ) :
+        return self._end - self._start
+
+    def __iter__( self ) :
+        if self._start == 0 and self._end == len(self._items) :
+            return iter( self._items )
+
+        return imap( self._items.__getitem__, xrange(self._start, self._end) )
+
+    def __getitem__( self, ix ) :
+        if isinstance(ix, slice) :
+            start, stop, step = ix.indices( len(self) )
+
+            if step != 1 :
+                return PList( self.tolist()[ix] )
+
+            return PList._view( self._items, self._start + start, self._start + max(start, stop) )
+
+        if ix < 0 :
+            ix += len( self )
+
+        if not 0 <= ix < len(self) :
+            raise IndexError, "list index out of range"
+
+        return self._items[self._start + ix]
+
+    def __contains__( self, item ) :
+        try :
+            self._items.index( item, self._start, self._end )
+            return True
+
+        except ValueError :
+            return False
+
+    def __add__( self, other ) :
+        if not isinstance(other, (list, PList)) :
+            return NotImplemented
+
+        return self.extend( other )
+
+    def __radd__( self, other ) :
+        if not isinstance(other, list) :
+            return NotImplemented
+
+        return PList( other ).extend( self )
+
+    def __mul__( self, n ) :
+        if not isinstance(n, (int, long)) :
+            return NotImplemented
+
+        items = self.tolist() * n
+        return PList._view( items, 0, len(items) )
+
+    __rmul__ = __mul__
+
+    def _compare( self, other ) :
+        # the Python lists to compare, or None if other is not a list
+        if isinstance(other, PList) :
+            return self.tolist(), other.tolist()
+
+        if isinstance(other, list) :
+            return self.tolist(), other
+
+        return None
+
+    def __eq__( self, other ) :
+        lists = self._compare( other )
+        return NotImplemented if lists is None else lists[0] == lists[1]
+
+    def __ne__( self, other ) :
+        lists = self._compare( other )
+        return NotImplemented if lists is None else lists[0] != lists[1]
+
+    def __lt__( self, other ) :
+        lists = self._compare( other )
+        return NotImplemented if lists is None else lists[0] < lists[1]
+
+    def __le__( self, other ) :
+        lists = self._compare( other )
+        return NotImplemented if lists is None else lists[0] <= lists[1]
+
+    def __gt__( self, other ) :
+        lists = self._compare( other )
+        return NotImplemented if lists is None else lists[0] > lists[1]
+
+    def __ge__( self, other ) :
+        lists = self._compare( other )
+        return NotImplemented if lists is None else lists[0] >= lists[1]
+
+    __hash__ = None
+
+    def __reduce__( self ) :
+        # pickled (e.g. for pmap) and copied as its items only
+        return (PList, (self.tolist(),))
+
+    def __repr__( self ) :
+        return repr( self.tolist() )
+
+    __str__ = __repr__
+
+
+def plist( obj ) :
+    '''Returns a list or tuple as a PList (a PList as it is)'''
+    return obj if isinstance(obj, PList) else PList( obj )
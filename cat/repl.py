@@ -8,11 +8,13 @@ import sys
 import traceback
 import readline
 from termcolor import colored
+from cat.startup import profiler
 
 class REPL:
 
     def __init__(self, cat):
-        self.cat = cat
+        self.cat          = cat
+        self._completions = [ ]
 
     def print_motd(self):
         if self.cat.ns.config.getboolean( 'motd', 'show_MOTD' ) :
@@ -22,8 +24,26 @@ class REPL:
             for line in MOTD:
                 self.cat.output( line.strip(), i_c )
     
-    def run(self):
-        self.print_motd()
+    def complete(self, text, state):
+        '''readline completer: word, variable, namespace and attribute names'''
+        if state == 0 :
+            self._completions = self.cat.ns.completer().complete( text, self.cat.ns )
+        
+        return self._completions[state] if state < len(self._completions) else None
+    
+    def setup_completion(self):
+        readline.set_completer( self.complete )
+        readline.set_completer_delims( ' \t\n' )
+        
+        if 'libedit' in (readline.__doc__ or '') :
+            readline.parse_and_bind( 'bind ^I rl_complete' )
+        
+        else :
+            readline.parse_and_bind( 'tab: complete' )
+    
+    def run(self, profile=''):
+        with profiler.phase( 'motd' ) :
+            self.print_motd()
 
         # set up display colours
         if self.cat.ns.config.getboolean( 'display', 'use_colour' ) :
@@ -42,7 +62,13 @@ class REPL:
             
             if fileName :
                 self.cat.output( "\nLoading file '%s'\n" % fileName, self.cat.ns.config.get('display', 'info') )
-                self.cat.eval( "'" + fileName + " load" )
+                
+                with profiler.phase( 'load_file' ) :
+                    self.cat.eval( "'" + fileName + " load" )
+        
+        self.setup_completion()
+        
+        profiler.report( profile )
         
         # main interactive loop
         while True:
@@ -80,7 +106,7 @@ class REPL:
                     self.cat.eval(line.strip())
     
                     if self.cat.ns.config.getboolean( 'stack', 'show_stack' ) :  # 'config_set' can alter
-                        self.cat.output( self.cat.stack.format(alt), s_c )
+                        self.cat.output( self.cat.stack.format(alt, **self.cat.display_limits()), s_c )
     
                 except Exception, msg:
                     # Three response levels:
@@ -88,7 +114,7 @@ class REPL:
                     # on    -- print error message with abbreviated backtrace and continue
                     # off   -- print error message and continue
                     self.cat.output(str(msg), e_c)
-                    self.cat.output( self.cat.stack.format(alt), s_c )
+                    self.cat.output( self.cat.stack.format(alt, **self.cat.display_limits()), s_c )
                     fei = self.cat.ns.config.get( 'errors', 'full_error_info' )  # 'config_set' can alter
                     
                     if fei == 'super' :
@@ -0,0 +1,175 @@
+"""
+    Full-text index over word documentation.
+
+    Each word is indexed by the tokens of its name, its tags and the 'desc:'
+    section of its documentation. A match in the name scores more than one
+    in the tags, which scores more than one in the description. Words are
+    keyed like the tag index: built-in words by their name, other words by
+    <namespace>:<word name>.
+"""
+
+from bisect import bisect_left, insort
+import re
+
+# score of a token according to where it appears in a word's documentation
+WEIGHTS = { 'name' : 3, 'tags' : 2, 'desc' : 1 }
+
+_words = re.compile( r'\w+' )
+
+
+def tokenize( text ) :
+    '''Splits text into lower case search tokens. Words joined by '_' are also
+    split into their parts.
+
+    >>> tokenize( "Sorts the list_of items" )
+    ['sorts', 'the', 'list_of', 'list', 'of', 'items']
+    '''
+    tokens = [ ]
+
+    for word in _words.findall( text.lower() ) :
+        tokens.append( word )
+
+        if '_' in word :
+            tokens.extend( part for part in word.split('_') if part )
+
+    return tokens
+
+def literalPrefix( regex ) :
+    '''Returns the text that every string matched (with re.match) by a regular
+    expression must start with
+
+    >>> literalPrefix( 'hash_.*' ), literalPrefix( 'ab?c' ), literalPrefix( 'a|b' )
+    ('hash_', 'a', '')
+    '''
+    if '|' in regex :
+        return ''
+
+    prefix = ''
+
+    for ix, char in enumerate( regex ) :
+        if char in '.^$*+?{}[]\\|()' :
+            break
+
+        # a character followed by a quantifier is optional
+        if regex[ix + 1:ix + 2] in ('*', '?', '{') :
+            break
+
+        prefix += char
+
+    return prefix
+
+
+class TextIndex:
+    '''Inverted index: <token> : {<word key> : <score>}'''
+
+    def __init__( self ) :
+        self._postings = { }    # token -> {word key : score}
+        self._docs     = { }    # word key -> (word name, {token : score})
+        self._tokens   = [ ]    # all tokens, sorted (for prefix queries)
+        self._names    = [ ]    # (word name, word key), sorted
+
+    def update( self, key, name, record ) :
+        '''Indexes (or re-indexes) a word
+        :param key: the word name (built-in) or <namespace>:<word name>
+        :type key: string
+        :param name: the word name
+        :type name: string
+        :param record: the word's parsed documentation (see cat/docs.py)
+        :type record: DocRecord
+        :rtype: none
+        '''
+        self.remove( key )
+        scores = { name.lower() : WEIGHTS['name'] }
+
+        for source, tokens in (('name', tokenize(name)),
+                               ('tags', record.tags if record else [ ]),
+                               ('desc', tokenize(record.desc) if record else [ ])) :
+            for token in tokens :
+                scores[token] = scores.get( token, 0 ) + WEIGHTS[source]
+
+        for token, score in scores.items() :
+            if token not in self._postings :
+                self._postings[token] = { }
+                insort( self._tokens, token )
+
+            self._postings[token][key] = score
+
+        self._docs[key] = (name, scores)
+        insort( self._names, (name, key) )
+
+    def remove( self, key ) :
+        '''Removes a word from the index (if it is there)'''
+        if key not in self._docs :
+            return
+
+        name, scores = self._docs.pop( key )
+
+        for token in scores :
+            del self._postings[token][key]
+
+            if not self._postings[token] :
+                del self._postings[token]
+                del self._tokens[bisect_left(self._tokens, token)]
+
+        del self._names[bisect_left(self._names, (name, key))]
+
+    def _withPrefix( self, sortedList, prefix, probe ) :
+        '''Yields the items of a sorted list (of strings or tuples) that start with prefix.
+        probe is where the search starts: the prefix itself, or (prefix,) for tuples.
+        '''
+        ix = bisect_left( sortedList, probe )
+
+        while ix < len(sortedList) :
+            item = sortedList[ix]
+            text = item[0] if isinstance(item, tuple) else item
+
+            if not text.startswith( prefix ) :
+                break
+
+            yield item
+            ix += 1
+
+    def _term( self, term ) :
+        '''Returns {word key : score} for one query term'''
+        if not term.endswith( '*' ) :
+            return self._postings.get( term, { } )
+
+        scores = { }
+
+        for token in self._withPrefix( self._tokens, term[:-1], term[:-1] ) :
+            for key, score in self._postings[token].iteritems() :
+                if score > scores.get( key, 0 ) :
+                    scores[key] = score
+
+        return scores
+
+    def search( self, query ) :
+        '''Returns the words matching every term of the query, best matches first.
+        A term ending in '*' matches every token starting with the rest of the term.
+        :param query: the search terms
+        :type query: string
+        :rtype: list of tuples of the form (string:<word key>, int:<score>)
+        '''
+        terms  = query.lower().split()
+        scores = None
+
+        for term in terms :
+            found = self._term( term )
+
+            if scores is None :
+                scores = dict( found )
+
+            else :
+                scores = dict( (key, scores[key] + score) for key, score in found.iteritems()
+                               if key in scores )
+
+            if not scores :
+                return [ ]
+
+        return sorted( (scores or { }).items(), key=lambda x: (-x[1], x[0]) )
+
+    def namesStartingWith( self, prefix ) :
+        '''Returns the words whose names start with prefix
+        :rtype: list of tuples of the form (string:<word name>, string:<word key>)
+        '''
+        return list( self._withPrefix(self._names, prefix, (prefix,)) )
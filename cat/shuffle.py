@@ -0,0 +1,165 @@
+"""
+    Native stack shuffles.
+
+    A shuffle is described by a permutation spec: the names of the items it
+    takes and of the items it leaves, top of the stack last, e.g.
+    'abc -- cab' or, as in a stack effect, "'a 'b 'c -> 'c 'a 'b". compile()
+    turns a spec into the number of items taken and, for each item left,
+    the position of the item it is a copy of; Stack.shuffle() then rewrites
+    the top of the stack with one slice assignment instead of the chain of
+    swap, dip, dup and pop evals a Cat definition expands to.
+
+    Shuffle words are declared from a spec (see definition()), and
+    regenerate() rewrites the shuffle words of a Cat source file (e.g.
+    CatDefs/extended-shuffling.cat) as such declarations.
+"""
+
+import re
+
+# compiled specs: spec -> (number of items taken, positions of the items left)
+_compiled  = { }
+MAX_CACHED = 256
+
+_name   = re.compile( r"^'?([A-Za-z_]\w*)$" )
+_define = re.compile( r"define\s+(?P<name>\S+)\s*:\s*\((?P<effect>[^()]*)\)(?P<gap>\s*)"
+                      r"(?P<doc>\{\{.*?\}\}\s*)?\{(?P<body>[^{}]*)\}", re.DOTALL )
+
+
+def _names( side ) :
+    '''Returns the item names on one side of a spec: the characters of a single
+    word (e.g. 'cab') or the whitespace separated names (e.g. "'c 'a 'b")
+    '''
+    words = side.split()
+
+    if len(words) == 1 and not words[0].startswith( "'" ) :
+        words = list( words[0] )
+
+    names = [ ]
+
+    for word in words :
+        mo = _name.match( word )
+
+        if not mo :
+            raise ValueError, "shuffle: '%s' is not an item name" % word
+
+        names.append( mo.group(1) )
+
+    return names
+
+def parse( spec ) :
+    '''Returns the names of the items a shuffle takes and leaves
+    :param spec: the permutation spec (e.g. 'abc -- cab' or 'a b c -> c a b')
+    :type spec: string
+    :rtype: tuple of the form (list:<names taken>, list:<names left>)
+
+    >>> parse( 'abc -- cab' ), parse( "('a 'b -> )" )
+    ((['a', 'b', 'c'], ['c', 'a', 'b']), (['a', 'b'], []))
+    '''
+    text = spec.strip()
+
+    if text.startswith( "(" ) and text.endswith( ")" ) :
+        text = text[1:-1]
+
+    for arrow in ('--', '->') :
+        if arrow in text :
+            before, after = text.split( arrow, 1 )
+            break
+
+    else :
+        raise ValueError, "shuffle: '%s' has no '--' (e.g. 'abc -- cab')" % spec
+
+    taken, left = _names( before ), _names( after )
+
+    if len(set(taken)) != len(taken) :
+        raise ValueError, "shuffle: '%s' names an item twice before the '--'" % spec
+
+    for name in left :
+        if name not in taken :
+            raise ValueError, "shuffle: '%s' leaves '%s', which it does not take" % (spec, name)
+
+    return taken, left
+
+def compile( spec ) :
+    '''Returns the number of items a shuffle takes and the positions (among those
+    items, bottom first) of the items it leaves
+    :param spec: the permutation spec (see parse())
+    :type spec: string
+    :rtype: tuple of the form (int:<n>, tuple:<positions>)
+
+    >>> compile( 'abc -- cab' ), compile( 'ab -- abba' )
+    ((3, (2, 0, 1)), (2, (0, 1, 1, 0)))
+    '''
+    try :
+        return _compiled[spec]
+
+    except KeyError :
+        pass
+
+    taken, left = parse( spec )
+    result      = (len(taken), tuple(taken.index(name) for name in left))
+
+    if len(_compiled) >= MAX_CACHED :
+        _compiled.clear()
+
+    _compiled[spec] = result
+    return result
+
+def canonical( spec ) :
+    '''Returns a spec in the form used by declarations
+
+    >>> canonical( "('a 'b 'c -> 'b 'a 'c)" ), canonical( 'x y -> y' )
+    ('abc -- bac', 'xy -- y')
+    '''
+    taken, left = parse( spec )
+    sep         = '' if all( len(name) == 1 for name in taken ) else ' '
+    return ("%s -- %s" % (sep.join(taken), sep.join(left))).strip()
+
+def definition( name, spec, doc='' ) :
+    '''Returns the Cat definition of a native shuffle word
+    :param name: the name of the word
+    :type name: string
+    :param spec: the permutation spec (see parse())
+    :type spec: string
+    :param doc: the word's documentation block (with its '{{' and '}}'), if any
+    :type doc: string
+    :rtype: string
+
+    >>> definition( 'cab', "('a 'b 'c -> 'c 'a 'b)" )
+    'define cab : (a b c -> c a b) { "abc -- cab" shuffle }'
+    '''
+    taken, left = parse( spec )
+    effect      = "(%s -> %s)" % (' '.join(taken), ' '.join(left))
+    return _declaration( name, effect, spec, " %s " % doc.strip() if doc.strip() else " " )
+
+def _declaration( name, effect, spec, doc ) :
+    return 'define %s : %s%s{ "%s" shuffle }' % (name, effect, doc, canonical(spec))
+
+def regenerate( text ) :
+    '''Rewrites the definitions of shuffle words (the words whose stack effect is
+    a permutation spec) in Cat source as native shuffle declarations. Their
+    stack effects and documentation are kept, except for 'deps:' blocks, which
+    no longer apply.
+    :param text: the Cat source
+    :type text: string
+    :rtype: string
+    '''
+    def rewrite( mo ) :
+        effect = mo.group('effect')
+
+        try :
+            parse( effect )
+
+        except ValueError :
+            return mo.group(0)
+
+        doc = mo.group('doc') or ''
+
+        if not doc or re.match( r"\{\{\s*deps:[^}]*\}\}\s*$", doc ) :
+            doc = " "
+
+        else :
+            doc = mo.group('gap') + doc
+
+        return _declaration( mo.group('name'), "(%s)" % effect, effect, doc )
+
+    return _define.sub( rewrite, text )
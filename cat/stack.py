@@ -1,8 +1,18 @@
 """
     Basic stack functionality.
+
+    Nested stacks (e.g. for the 'list' word) are marks on the one stack
+    rather than new Stack objects: mark() records the current depth as the
+    base of a new, empty stack and release() removes everything above it
+    and restores the previous base. Below the base the stack is invisible.
 """
 
 from collections import deque
+import sys
+
+from cat.parser import parse_literal
+from cat.vector import Vector
+from cat.plist import PList
 
 
 class Stack:
@@ -19,8 +29,118 @@ class Stack:
         if initial is None:
             initial = []
         
-        self._stack = deque(initial)
-        self._aux   = deque()
+        self._stack   = list(initial)
+        self._aux     = deque()
+        self._base    = 0       # the depth of the innermost mark (see mark())
+        self._limit   = sys.maxint  # the maximum depth of either stack (see configure())
+        self._stats   = None        # usage statistics, when tracked
+
+    # a pushed item's size is sampled (with sys.getsizeof) once every SAMPLE pushes
+    SAMPLE = 8
+
+    def configure(self, limit=None, track=False):
+        """Sets the depth limit of the stack and of the aux stack (None or 0: no limit)
+        and turns the tracking of usage statistics (see stats()) on or off
+
+            >>> s = Stack([1, 2])
+            >>> s.configure(limit=3)
+            >>> s.push(3); s.push(4)
+            Traceback (most recent call last):
+            ...
+            IndexError: stack: depth limit (3) exceeded
+        """
+        self._limit = limit or sys.maxint
+
+        if not track:
+            self._stats = None
+
+        elif self._stats is None:
+            self.reset_stats()
+
+    def reset_stats(self):
+        """Starts the usage statistics afresh (tracking them if they were not)"""
+        self._stats = {'pushes': 0, 'max_depth': len(self._stack), 'max_aux_depth': len(self._aux),
+                       'samples': 0, 'sampled_bytes': 0, 'peak_bytes': 0}
+
+    def stats(self):
+        """Returns the usage statistics:
+            depth, aux_depth            the current depths
+            limit                       the depth limit (0: none)
+            tracking                    True if the statistics below are being kept
+            max_depth, max_aux_depth    the greatest depths reached
+            pushes                      the number of items pushed onto either stack
+            bytes, peak_bytes           the approximate (sampled) size of the items on
+                                        the stacks now and at their largest
+        """
+        info = {'depth': len(self._stack), 'aux_depth': len(self._aux),
+                'limit': self._limit if self._limit < sys.maxint else 0, 'tracking': self._stats is not None}
+
+        if self._stats is not None:
+            for key in ('pushes', 'max_depth', 'max_aux_depth', 'peak_bytes'):
+                info[key] = self._stats[key]
+
+            info['bytes'] = self._footprint()
+
+        return info
+
+    def _footprint(self):
+        """The approximate size of the items on both stacks: the mean sampled item size times their number"""
+        samples = self._stats['samples']
+        mean    = self._stats['sampled_bytes'] / samples if samples else 0
+        return mean * (len(self._stack) + len(self._aux))
+
+    def _check(self, stack, what, multi):
+        """Applies the depth limit and updates the statistics before what (the items
+        in what, if multi) is pushed onto stack
+        """
+        n     = len(what) if multi else 1
+        depth = len(stack) + n
+
+        if depth > self._limit:
+            raise IndexError("stack: depth limit (%d) exceeded" % self._limit)
+
+        stats = self._stats
+
+        if stats is None:
+            return
+
+        key = 'max_depth' if stack is self._stack else 'max_aux_depth'
+
+        if depth > stats[key]:
+            stats[key] = depth
+
+        if n and stats['pushes'] % self.SAMPLE < n:
+            stats['samples']       += 1
+            stats['sampled_bytes'] += sys.getsizeof(what[0] if multi else what)
+            stats['peak_bytes']     = max(stats['peak_bytes'], self._footprint())
+
+        stats['pushes'] += n
+
+    def mark(self, content=None):
+        """Starts a nested stack above the current contents, returning a mark
+        for release()
+
+            >>> s = Stack([1, 2])
+            >>> m = s.mark([3])
+            >>> s.push(4); s.length(), s.to_list()
+            (2, [3, 4])
+            >>> s.release(m), s.to_list()
+            ([3, 4], [1, 2])
+        """
+        mark       = self._base
+        self._base = len(self._stack)
+
+        if content:
+            self.push(content, multi=True)
+
+        return mark
+
+    def release(self, mark):
+        """Ends the nested stack started by mark(), returning its contents"""
+        items = self._stack[self._base:]
+        del self._stack[self._base:]
+        self._base = mark
+        return items
 
     def push(self, what, multi=False):
         """
@@ -36,8 +156,12 @@ class Stack:
             ===> 1 2 3 [4, 5]
         """
         if multi:
+            self._check(self._stack, what, True)
             self._stack.extend(what)
         else:
+            if len(self._stack) >= self._limit or self._stats is not None:
+                self._check(self._stack, what, False)
+
             self._stack.append(what)
 
     def pop(self):
@@ -48,11 +172,16 @@ class Stack:
             >>> s
             _empty_
         """
-        return self._stack.pop()
+        if len(self._stack) > self._base:
+            return self._stack.pop()
+
+        raise IndexError("pop from an empty stack")
 
     def push_aux( self, what, multi=False ) :
         '''
         '''
+        self._check( self._aux, what, multi )
+        
         if multi :
             self._aux.extend( what )
         
@@ -79,22 +208,22 @@ class Stack:
             item = item.strip()
             
             if item[0] in "[(" :
-                return eval( item )
+                return parse_literal( item )
             
             else :
                 return [x for x in item.split(',') if x]
 
-        elif isinstance(item, (list, tuple)):
+        elif isinstance(item, (list, tuple, PList)):
             return item
 
         else:
             return [item]
 
     def __repr__(self):
-        if not self._stack:
+        if len(self._stack) == self._base:
             return '===> _empty_'
 
-        return '===> %s' % ' '.join(repr(x) for x in self._stack)
+        return '===> %s' % ' '.join(repr(x) for x in self._stack[self._base:])
 
     def peek(self):
         """
@@ -104,7 +233,7 @@ class Stack:
             >>> s
             ===> 1 2
         """
-        return self._stack[-1]
+        return self[-1]
 
     def peek_n(self, n):
         """
@@ -112,7 +241,7 @@ class Stack:
             >>> s.peek_n(3)
             2
         """
-        return self._stack[-1 - n]
+        return self[-1 - n]
 
     def pop_2(self):
         """
@@ -120,8 +249,35 @@ class Stack:
             >>> s.pop_2()
             (6, 4)
         """
+        if len(self._stack) - self._base < 2:
+            raise IndexError("pop from an empty stack")
+
         return self._stack.pop(), self._stack.pop()
 
+    def apply_2(self, fn):
+        """
+        Replaces the top two items (lhs below rhs) with fn(lhs, rhs). The underflow
+        error is that of pop_2 and if fn raises the stack is left as it was.
+
+            >>> s = Stack([2, 4, 6])
+            >>> s.apply_2(lambda lhs, rhs: lhs - rhs)
+            >>> s
+            ===> 2 -2
+            >>> s.apply_2(lambda lhs, rhs: lhs / 0)
+            Traceback (most recent call last):
+            ...
+            ZeroDivisionError: integer division or modulo by zero
+            >>> s
+            ===> 2 -2
+        """
+        stack = self._stack
+
+        if len(stack) - self._base < 2:
+            raise IndexError("pop from an empty stack")
+
+        stack[-2] = fn(stack[-2], stack[-1])
+        stack.pop()
+
     def pop_n(self, n):
         """
             >>> s = Stack([3, 4, 5, 6])
@@ -130,7 +286,31 @@ class Stack:
             >>> s
             ===> 3
         """
-        return list([self._stack.pop() for _ in range(n)])
+        if len(self._stack) - self._base < n:
+            raise IndexError("pop from an empty stack")
+
+        return [self._stack.pop() for _ in range(n)]
+
+    def shuffle(self, n, order):
+        """Replaces the top n items with the items at the given positions among
+        them (bottom first): a compiled shuffle (see cat/shuffle.py)
+
+            >>> s = Stack([1, 2, 3])
+            >>> s.shuffle(3, (2, 0, 1)); s
+            ===> 3 1 2
+            >>> s.shuffle(2, (0, 1, 1, 0)); s
+            ===> 3 1 2 2 1
+        """
+        start = len(self._stack) - n
+
+        if start < self._base:
+            raise IndexError("shuffle: needs %d items on the stack" % n)
+
+        if start + len(order) > self._limit:
+            raise IndexError("stack: depth limit (%d) exceeded" % self._limit)
+
+        items = self._stack[start:]
+        self._stack[start:] = [items[i] for i in order]
 
     def pop_all(self):
         """
@@ -148,7 +328,10 @@ class Stack:
             >>> s.length()
             3
         """
-        return len(self._stack)
+        return len(self._stack) - self._base
+
+    def __len__(self):
+        return len(self._stack) - self._base
 
     def clear(self):
         """
@@ -157,7 +340,7 @@ class Stack:
             >>> s
             _empty_
         """
-        self._stack.clear()
+        del self._stack[self._base:]
     
     def clear_to(self, n):
         """
@@ -167,54 +350,160 @@ class Stack:
             ===> 90
         """
         for _ in range(n):
-            self._stack.pop()
+            self.pop()
     
     def reverse( self ) :
         '''Reverses the order of elements in the stack'''
-        self._stack.reverse()
+        self._stack[self._base:] = self._stack[self._base:][::-1]
     
     def remove( self, item ) :
         '''Removes first occurrence of 'item' from the stack'''
-        self._stack.remove( item )
+        del self._stack[self._stack.index( item, self._base )]
     
     def raw( self ) :
-        return self._stack
+        return self._stack[self._base:] if self._base else self._stack
     
     def to_list(self):
-        return list(self._stack)
+        return self._stack[self._base:]
+
+    def _index(self, index):
+        """Returns the position in _stack of an index into the (innermost) stack"""
+        depth = len(self._stack) - self._base
+
+        if index < 0:
+            index += depth
+
+        if not 0 <= index < depth:
+            raise IndexError("stack index out of range")
+
+        return self._base + index
 
     def __getitem__(self, index):
-        return self._stack[index]
+        return self._stack[self._index(index)]
 
     def __setitem__(self, index, value):
-        self._stack[index] = value
+        self._stack[self._index(index)] = value
 
-    def format( self, alt_format=False ) :
-        '''Format the stack contents for printing
-        :param format: choose one line output (default); or multi-line output
-        :type format: boolean
+    def format( self, alt_format=False, max_items=None, max_chars=None, max_depth=None, use_repr=False ) :
+        '''Format the stack contents for printing. Only the items that are shown
+        are formatted, so the cost is bounded by the limits rather than the stack size.
+        :param alt_format: choose one line output (default); or multi-line output
+        :type alt_format: boolean
+        :param max_items: the number of items (from the top) to show (None: all)
+        :type max_items: int
+        :param max_chars: the characters to show of each item (see render)
+        :type max_chars: int
+        :param max_depth: the nesting depth to show of each item (see render)
+        :type max_depth: int
+        :param use_repr: format items with repr() rather than str()
+        :type use_repr: boolean
         :rtype: string
+
+            >>> Stack(range(100)).format(max_items=3)
+            '===> ... 97 more 97 98 99'
         '''
-        n  = len( self._stack )
-        ix = 0
+        n = len( self._stack ) - self._base
         
         if not n :
             return "===> _empty_"
         
-        elif alt_format :
+        shown = n if max_items is None else min( n, max_items )
+        items = [ render(x, max_chars, max_depth, use_repr) for x in self._stack[len(self._stack) - shown:] ]
+        more  = "... %s more" % format( n - shown, ',' ) if shown < n else ''
+        
+        if alt_format :
             txt = "stack"
             
-            for i in range( 1, n + 1 ) :
+            for ix, item in enumerate( reversed(items) ) :
                 if n > 9 :
-                    txt += "[% 3d]: %s\n     " % (ix, str(self._stack[n-i]))
+                    txt += "[% 3d]: %s\n     " % (-ix, item)
                 
                 else :
-                    txt += "[% 2d]: %s\n     " % (ix, str(self._stack[n-i]))
-                
-                ix  -= 1
+                    txt += "[% 2d]: %s\n     " % (-ix, item)
             
-            return txt.strip()
+            return (txt + more).strip()
         
         else :
-            items = [str(x) for x in self._stack]
-            return "===> " + " ".join(items)
+            return "===> " + " ".join( ([more] if more else [ ]) + items )
+
+
+def render( obj, max_chars=None, max_depth=None, use_repr=False ) :
+    '''Returns str(obj) (or repr) for display with lists, tuples, vectors, dictionaries
+    and sets cut short: at most max_chars characters of each item and max_depth levels
+    of nesting are formatted, the rest is elided. None means no limit.
+
+        >>> render( range(100000), max_chars=20 )
+        '[0, 1, 2, 3, 4, 5, 6, ... 99,993 more]'
+        >>> render( [1, [2, [3, [4]]]], max_depth=2 ), render( 'abcdef', max_chars=3 )
+        ('[1, [2, [...]]]', 'abc...')
+        >>> render( {'a': [1, [2]]}, max_depth=2 ), render( set(range(100000)), max_chars=12 )
+        ("{'a': [1, [...]]}", 'set([0, 1, 2, 3, ... 99,996 more])')
+    '''
+    if max_chars is None and max_depth is None :
+        return repr( obj ) if use_repr else str( obj )
+    
+    if isinstance(obj, (list, tuple, PList, Vector, set, frozenset)) :
+        return _renderSequence( obj, max_chars, max_depth )
+    
+    if isinstance(obj, dict) :
+        return _renderDict( obj, max_chars, max_depth )
+    
+    if isinstance(obj, basestring) and max_chars is not None :
+        obj = obj[:max_chars + 1]   # no need to format more than will be shown
+    
+    text = repr( obj ) if use_repr else str( obj )
+    
+    if max_chars is not None and len(text) > max_chars :
+        text = text[:max_chars] + "..."
+    
+    return text
+
+def _renderSequence( seq, max_chars, max_depth ) :
+    if isinstance(seq, Vector) :
+        start, end = "vector([", "])"
+    
+    elif isinstance(seq, (set, frozenset)) :
+        start, end = type(seq).__name__ + "([", "])"
+    
+    elif isinstance(seq, tuple) :
+        start, end = "(", ",)" if len(seq) == 1 else ")"
+    
+    else :
+        start, end = "[", "]"
+    
+    def renderItem( item, chars, depth ) :
+        return render( item, chars, depth, True )
+    
+    return _renderItems( seq, len(seq), start, end, renderItem, max_chars, max_depth )
+
+def _renderDict( d, max_chars, max_depth ) :
+    # a subclass (e.g. an OrderedDict) is shown with its type name
+    start, end = ("{", "}") if type(d) is dict else (type(d).__name__ + "({", "})")
+    
+    def renderItem( pair, chars, depth ) :
+        key, value = pair
+        text       = render( key, chars, depth, True ) + ": "
+        return text + render( value, None if chars is None else max(chars - len(text), 0), depth, True )
+    
+    return _renderItems( d.iteritems(), len(d), start, end, renderItem, max_chars, max_depth )
+
+def _renderItems( items, count, start, end, renderItem, max_chars, max_depth ) :
+    '''Returns the items (count of them) rendered by renderItem between start and end,
+    up to max_chars characters and (the items) to max_depth - 1 levels of nesting'''
+    if max_depth is not None and max_depth <= 0 :
+        return start + "..." + end
+    
+    depth = None if max_depth is None else max_depth - 1
+    parts = [ ]
+    used  = 0
+    
+    for ix, item in enumerate( items ) :
+        if max_chars is not None and used >= max_chars :
+            parts.append( "... %s more" % format(count - ix, ',') )
+            break
+        
+        text  = renderItem( item, None if max_chars is None else max_chars - used, depth )
+        used += len( text ) + 2
+        parts.append( text )
+    
+    return start + ", ".join( parts ) + end
@@ -0,0 +1,110 @@
+"""
+    Startup profiling.
+
+    Records the wall time and memory taken by each phase of interpreter
+    startup (imports, configuration, namespaces, definition modules, files
+    loaded, ...). Enabled with 'catlang.py --profile-startup'.
+"""
+
+from contextlib import contextmanager
+import os
+import time
+
+
+def _memory() :
+    '''Returns the resident memory of the process in kilobytes'''
+    try :
+        fd = open( '/proc/self/statm' )
+
+        try :
+            pages = int( fd.read().split()[1] )
+
+        finally :
+            fd.close()
+
+        return pages * os.sysconf( 'SC_PAGE_SIZE' ) // 1024
+
+    except (IOError, OSError, ValueError) :
+        # no /proc: fall back on the peak resident size
+        import resource
+
+        return resource.getrusage( resource.RUSAGE_SELF ).ru_maxrss
+
+
+class StartupProfile:
+
+    def __init__( self ) :
+        self.enabled = False
+        self.phases  = [ ]    # (phase name, seconds, kilobytes)
+        self._active = [ ]    # names of the phases currently being timed
+
+    @contextmanager
+    def phase( self, name ) :
+        '''
+            Times the enclosed block as a phase. Phases may be nested, a nested
+            phase is recorded as <outer phase>/<inner phase>
+
+            >>> p = StartupProfile()
+            >>> p.enabled = True
+            >>> with p.phase('outer'):
+            ...    with p.phase('inner'):
+            ...        pass
+            >>> [x[0] for x in p.phases]
+            ['outer/inner', 'outer']
+        '''
+        if not self.enabled :
+            yield
+            return
+
+        self._active.append( name )
+        label = "/".join( self._active )
+        mem   = _memory()
+        start = time.time()
+
+        try :
+            yield
+
+        finally :
+            self.phases.append( (label, time.time() - start, _memory() - mem) )
+            self._active.pop()
+
+    def format( self ) :
+        '''Formats the phases as a table sorted by decreasing wall time
+        :rtype: string
+        '''
+        lines = [ "%-50s %10s %10s" % ('phase', 'msec', 'KB'),
+                  "-" * 72 ]
+
+        for name, secs, kbytes in sorted( self.phases, key=lambda x: -x[1] ) :
+            lines.append( "%-50s %10.2f %10d" % (name, secs * 1000.0, kbytes) )
+
+        return "\n".join( lines )
+
+    def as_json( self ) :
+        '''Returns the phases (in the order they finished) as a JSON string'''
+        import json
+
+        return json.dumps( [ {'phase' : name, 'msec' : secs * 1000.0, 'kbytes' : kbytes}
+                             for name, secs, kbytes in self.phases ], indent=2 )
+
+    def report( self, dest='' ) :
+        '''Prints the table, or writes JSON when dest is 'json' (stdout) or a file name'''
+        if not self.enabled :
+            return
+
+        if not dest :
+            print self.format()
+
+        elif dest == 'json' :
+            print self.as_json()
+
+        else :
+            fd = open( dest, 'w' )
+            fd.write( self.as_json() )
+            fd.close()
+
+        self.enabled = False
+
+
+# the interpreter-wide profile (disabled unless catlang.py enables it)
+profiler = StartupProfile()
@@ -0,0 +1,141 @@
+"""
+    Tag index.
+
+    Word documentation carries a 'tags:' line (e.g. 'tags: list,sort').
+    The TagIndex maps each tag to a bitset of the words carrying it so that
+    'tag_search' and 'show_tags' need not look at every word's documentation.
+    Built-in words are keyed by their name, other words by
+    <namespace>:<word name>.
+"""
+
+import fnmatch
+import re
+
+findTags = re.compile( r'tags:\s*(\S+)' )
+
+
+def parseTags( doc ) :
+    '''Returns the (lower case) tags named in a word's documentation
+    :param doc: the documentation of a word
+    :type doc: string (or None)
+    :rtype: list of strings
+
+    >>> parseTags( "desc:\\n    blah\\ntags:\\n    List,sort" )
+    ['list', 'sort']
+    '''
+    mo = findTags.search( doc or '' )
+
+    if not mo :
+        return [ ]
+
+    return [ tag.lower() for tag in mo.group(1).split(",") ]
+
+
+class TagIndex:
+    '''Inverted index: <tag name> : <bitset of word ids>
+    Each word with at least one tag gets a small integer id and a tag is an int
+    with bit <id> set for each of its words. The pseudo tag 'universe' holds
+    every word that has at least one tag.
+    '''
+    def __init__( self ) :
+        self._ids        = { }    # word key -> word id
+        self._keys       = [ ]    # word id -> word key (None for a free id)
+        self._free       = [ ]    # ids of removed words, for reuse
+        self._tags       = { 'universe' : 0 }
+        self._counts     = { 'universe' : 0 }    # tag -> number of words
+        self._wordTags   = { }    # word id -> the tags of the word
+        self._globs      = { }    # glob -> the tags matching it
+        self._globGen    = 0      # the generation the glob expansions belong to
+        self.generation  = 0      # changes whenever a tag is created or removed
+
+    def update( self, key, tags ) :
+        '''Indexes (or re-indexes) a word
+        :param key: the word name (built-in) or <namespace>:<word name>
+        :type key: string
+        :param tags: the tags of the word (see parseTags)
+        :type tags: list of strings
+        :rtype: none
+        '''
+        self.remove( key )
+
+        if not tags :
+            return
+
+        if self._free :
+            wid             = self._free.pop()
+            self._keys[wid] = key
+
+        else :
+            wid = len( self._keys )
+            self._keys.append( key )
+
+        bit                 = 1 << wid
+        self._ids[key]      = wid
+        self._wordTags[wid] = list( set(tags) | set(['universe']) )
+
+        for tag in self._wordTags[wid] :
+            if tag not in self._tags :
+                self._tags[tag]   = 0
+                self._counts[tag] = 0
+                self.generation  += 1
+
+            self._tags[tag]   |= bit
+            self._counts[tag] += 1
+
+    def remove( self, key ) :
+        '''Removes a word from the index (if it is there)'''
+        wid = self._ids.pop( key, None )
+
+        if wid is None :
+            return
+
+        mask = ~(1 << wid)
+
+        for tag in self._wordTags.pop( wid ) :
+            self._tags[tag]   &= mask
+            self._counts[tag] -= 1
+
+            if not self._tags[tag] and tag != 'universe' :
+                del self._tags[tag]
+                del self._counts[tag]
+                self.generation += 1
+
+        self._keys[wid] = None
+        self._free.append( wid )
+
+    def tags( self ) :
+        '''Returns the names of all of the tags (including 'universe')'''
+        return self._tags.keys()
+
+    def count( self, tag ) :
+        '''Returns the number of words having the tag'''
+        return self._counts.get( tag, 0 )
+
+    def bits( self, tag ) :
+        '''Returns the bitset of the words having the tag (0 for an unknown tag)'''
+        return self._tags.get( tag, 0 )
+
+    def expand( self, glob ) :
+        '''Returns the tags matching a glob (e.g. 'cond*'). Expansions are cached
+        until a tag is created or removed.
+        :rtype: list of strings
+        '''
+        if self._globGen != self.generation :
+            self._globs   = { }
+            self._globGen = self.generation
+
+        if glob not in self._globs :
+            self._globs[glob] = fnmatch.filter( self._tags, glob )
+
+        return self._globs[glob]
+
+    def words( self, bits ) :
+        '''Returns the keys of the words in a bitset'''
+        keys = [ ]
+
+        while bits :
+            low   = bits & -bits
+            bits ^= low
+            keys.append( self._keys[low.bit_length() - 1] )
+
+        return keys
@@ -0,0 +1,353 @@
+"""
+    Typed numeric vectors.
+
+    A Vector keeps its numbers unboxed: in a NumPy array (int64 or float64)
+    when NumPy can be imported, otherwise in an array.array ('l', machine
+    integers, or 'd', doubles). Either way the elements are integers when
+    every one is an integer and doubles otherwise. Arithmetic with a number,
+    another vector or a list of the same length is elementwise and runs as
+    one loop over the array rather than one Cat eval per element, so the
+    arithmetic words ('+', '*', ...) work on vectors unchanged. Comparisons
+    are those of lists (lexicographic).
+
+    NumPy is only imported when the first vector is made (so that starting
+    an interpreter does not pay for it). Integer results that do not fit in
+    64 bits make doubles with either backend: NumPy int64 arithmetic that
+    could overflow is done with Python integers instead. Sums and dot
+    products of integers are exact with either backend.
+"""
+
+from array import array
+from itertools import repeat
+import operator
+
+numpy = None       # the NumPy module, once imported (see _numpy())
+_tried = False     # True once the import of NumPy has been attempted
+_use   = None      # whether new vectors use NumPy (None: not configured, NumPy if available)
+
+_numbers  = (int, long, float)
+_integers = (int, long)
+
+
+def _numpy() :
+    '''Returns the NumPy module if new vectors use it (importing it the first time), else None'''
+    global numpy, _tried
+
+    if _use is False :
+        return None
+
+    if not _tried :
+        _tried = True
+
+        try :
+            import numpy
+
+        except ImportError :
+            numpy = None
+
+    return numpy
+
+def configure( on ) :
+    '''Applies the configuration of the process: the first call selects the backend
+    and later ones (e.g. from forked interpreters) are ignored
+    :rtype: bool: True if the setting was applied
+    '''
+    global _use
+
+    if _use is not None :
+        return False
+
+    _use = bool( on )
+    return True
+
+def use_numpy( on=True ) :
+    '''Selects the backend of new vectors: NumPy (if it can be imported) or array.array
+    :rtype: bool: True if NumPy is used
+
+    >>> def big() : return Vector( [2 ** 62, 1] ) * 2
+    >>> _ = use_numpy( False ); a = big(); _ = use_numpy( True ); b = big()
+    >>> a == b, a
+    (True, vector([9.223372036854776e+18, 2.0]))
+    '''
+    global _use
+    _use = bool( on )
+    return _numpy() is not None
+
+def backend() :
+    '''Returns the name of the backend of new vectors: 'numpy' or 'array' '''
+    return 'array' if _numpy() is None else 'numpy'
+
+def _typed( values ) :
+    '''Returns an array of the numbers in values: integers if possible, else doubles'''
+    if _numpy() is not None :
+        return _ndarray( values )
+
+    try :
+        return array( 'l', values )
+
+    except (TypeError, OverflowError) :
+        pass
+
+    try :
+        return array( 'd', values )
+
+    except TypeError :
+        raise ValueError, "vector: elements must be numbers"
+
+def _ndarray( values ) :
+    '''Returns a one dimensional int64 or float64 NumPy array of the numbers in values'''
+    data = numpy.asarray( values.tolist() if isinstance(values, array) else values )
+
+    if not data.size :
+        return numpy.zeros( 0, numpy.int64 )
+
+    if data.ndim == 1 :
+        # (unsigned: integers from 2**63 to 2**64, which are doubles in an int64 vector)
+        if data.dtype.kind in 'bi' or (data.dtype.kind == 'u' and data.max().item() <= _int64Max) :
+            return data.astype( numpy.int64, copy=False )
+
+        if data.dtype.kind == 'u' :
+            return data.astype( numpy.float64 )
+
+        # doubles, or integers that do not fit in 64 bits
+        try :
+            if data.dtype.kind in 'fO' :
+                return data.astype( numpy.float64, copy=False )
+
+        except (TypeError, ValueError) :
+            pass
+
+    raise ValueError, "vector: elements must be numbers"
+
+_int64Max = 2 ** 63 - 1
+
+# int64 operations that can overflow, and the magnitude of a result (estimated in
+# doubles) below which they certainly do not
+_overflowing = (operator.add, operator.sub, operator.mul, operator.pow)
+_safe        = 2.0 ** 62
+
+def _overflows( op, a, b, reflected ) :
+    '''Returns True if an operation on an int64 array and an integer (or int64 array)
+    might not fit in int64 (or, for pow, has a negative exponent)'''
+    bf = b.astype( numpy.float64 ) if isinstance(b, numpy.ndarray) else float( b )
+
+    if op is operator.pow and numpy.any( numpy.asarray(a if reflected else bf) < 0 ) :
+        return True
+
+    with numpy.errstate( all='ignore' ) :
+        af       = a.astype( numpy.float64 )
+        estimate = op( bf, af ) if reflected else op( af, bf )
+
+    return not numpy.all( numpy.abs(estimate) < _safe )
+
+def _exact( op, a, b, reflected ) :
+    '''Returns the elementwise operation computed with Python numbers, as an array'''
+    x = a.tolist()
+    y = b.tolist() if isinstance(b, numpy.ndarray) else repeat( b, len(x) )
+    return _ndarray( map(op, y, x) if reflected else map(op, x, y) )
+
+def _small( estimate ) :
+    '''Returns True if an int64 reduction whose terms' magnitudes sum to estimate
+    (computed in doubles) certainly does not overflow'''
+    return estimate < _safe
+
+def _scalar( value ) :
+    '''Returns a NumPy scalar as the Python number'''
+    return value.item() if hasattr( value, 'item' ) else value
+
+
+class Vector( object ) :
+    '''A sequence of numbers held in an array
+
+    >>> v = Vector( [1, 2, 3] )
+    >>> v + 1, v * v, 2.5 * v
+    (vector([2, 3, 4]), vector([1, 4, 9]), vector([2.5, 5.0, 7.5]))
+    >>> v == [1, 2, 3], v.sum(), v.poly( 2 ), v.dot( [1, 0, 1] )
+    (True, 6, 17, 4)
+    '''
+    __slots__ = ('_data',)
+
+    def __init__( self, values=() ) :
+        np = _numpy()
+
+        if np is None :
+            self._data = values if isinstance(values, array) else _typed( values )
+
+        else :
+            self._data = values if isinstance(values, np.ndarray) and values.dtype.kind in 'if' else _typed( values )
+
+    def typecode( self ) :
+        '''Returns 'l' for integer elements and 'd' for doubles (whatever the backend)'''
+        if isinstance(self._data, array) :
+            return self._data.typecode
+
+        return 'l' if self._data.dtype.kind == 'i' else 'd'
+
+    def tolist( self ) :
+        return self._data.tolist()
+
+    def sum( self ) :
+        data = self._data
+
+        if isinstance(data, array) :
+            return sum( data )
+
+        if data.dtype.kind == 'i' and not _small( numpy.abs(data.astype(numpy.float64)).sum() ) :
+            return sum( data.tolist() )
+
+        return _scalar( data.sum() )
+
+    def dot( self, other ) :
+        '''Returns the dot product with another vector or list (up to the shorter length)'''
+        a = self._data
+        b = other._data if isinstance(other, Vector) else other
+        n = min( len(a), len(b) )
+
+        if isinstance(a, array) :
+            return sum( map(operator.mul, a[:n], b[:n]) )
+
+        a = a[:n]
+        b = numpy.asarray( b[:n] )
+
+        # integers: exact with Python integers unless the int64 dot product cannot overflow
+        if a.dtype.kind == 'i' and b.dtype.kind in 'biuO' :
+            if b.dtype.kind not in 'bi' or not _small( numpy.dot(numpy.abs(a.astype(numpy.float64)),
+                                                                 numpy.abs(b.astype(numpy.float64))) ) :
+                return sum( map(operator.mul, a.tolist(), b.tolist()) )
+
+        return _scalar( numpy.dot(a, b) )
+
+    def poly( self, x ) :
+        '''Evaluates the polynomial with these coefficients (low to high degree) at x'''
+        p = 0
+
+        # Horner's rule over Python numbers (numpy.polyval loops over NumPy scalars, which is slower)
+        for coeff in reversed( self._data.tolist() ) :
+            p = p * x + coeff
+
+        return p
+
+    # elementwise arithmetic
+    def _apply( self, op, other, reflected=False ) :
+        a = self._data
+
+        if isinstance(other, _numbers) :
+            b = other if not isinstance(a, array) else repeat( other, len(a) )
+
+        elif isinstance(other, (Vector, list, tuple, array)) :
+            b = other._data if isinstance(other, Vector) else other
+
+            if len(b) != len(a) :
+                raise ValueError, "vector: lengths differ (%d and %d)" % (len(a), len(b))
+
+        else :
+            return NotImplemented
+
+        if isinstance(a, array) :
+            return Vector( _typed(map(op, b, a) if reflected else map(op, a, b)) )
+
+        b = b if isinstance(b, _numbers) else _ndarray( b )
+
+        if (op in _overflowing and a.dtype.kind == 'i' and
+                (isinstance(b, _integers) or (isinstance(b, numpy.ndarray) and b.dtype.kind == 'i')) and
+                _overflows( op, a, b, reflected )) :
+            return Vector( _exact(op, a, b, reflected) )
+
+        with numpy.errstate( divide='raise', invalid='raise' ) :
+            try :
+                return Vector( _ndarray(op(b, a) if reflected else op(a, b)) )
+
+            except FloatingPointError, e :
+                raise ZeroDivisionError, "vector: %s" % e
+
+    def __add__( self, other ) :
+        return self._apply( operator.add, other )
+
+    def __radd__( self, other ) :
+        return self._apply( operator.add, other, True )
+
+    def __sub__( self, other ) :
+        return self._apply( operator.sub, other )
+
+    def __rsub__( self, other ) :
+        return self._apply( operator.sub, other, True )
+
+    def __mul__( self, other ) :
+        return self._apply( operator.mul, other )
+
+    def __rmul__( self, other ) :
+        return self._apply( operator.mul, other, True )
+
+    def __div__( self, other ) :
+        return self._apply( operator.div, other )
+
+    def __rdiv__( self, other ) :
+        return self._apply( operator.div, other, True )
+
+    def __truediv__( self, other ) :
+        return self._apply( operator.truediv, other )
+
+    def __rtruediv__( self, other ) :
+        return self._apply( operator.truediv, other, True )
+
+    def __mod__( self, other ) :
+        return self._apply( operator.mod, other )
+
+    def __pow__( self, other ) :
+        return self._apply( operator.pow, other )
+
+    def __neg__( self ) :
+        if isinstance(self._data, array) :
+            return Vector( _typed(map(operator.neg, self._data)) )
+
+        if self._data.dtype.kind == 'i' and len(self._data) and self._data.min() == -_int64Max - 1 :
+            return Vector( _ndarray([-x for x in self._data.tolist()]) )
+
+        return Vector( -self._data )
+
+    # sequence protocol
+    def __len__( self ) :
+        return len( self._data )
+
+    def __iter__( self ) :
+        return iter( self._data if isinstance(self._data, array) else self._data.tolist() )
+
+    def __getitem__( self, ix ) :
+        if isinstance(ix, slice) :
+            return Vector( self._data[ix] )
+
+        return _scalar( self._data[ix] )
+
+    def _cmp( self, other ) :
+        return self._data.tolist(), (other.tolist() if isinstance(other, (Vector, array)) else other)
+
+    def __eq__( self, other ) :
+        if not isinstance(other, (Vector, list, tuple, array)) :
+            return False
+
+        a, b = self._cmp( other )
+        return a == list( b )
+
+    def __ne__( self, other ) :
+        return not self == other
+
+    def __lt__( self, other ) :
+        a, b = self._cmp( other )
+        return a < b
+
+    def __le__( self, other ) :
+        a, b = self._cmp( other )
+        return a <= b
+
+    def __gt__( self, other ) :
+        a, b = self._cmp( other )
+        return a > b
+
+    def __ge__( self, other ) :
+        a, b = self._cmp( other )
+        return a >= b
+
+    __hash__ = None
+
+    def __repr__( self ) :
+        return "vector(%r)" % self._data.tolist()
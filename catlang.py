@@ -10,6 +10,11 @@
 #
 # ./catlang.py --eval "code" - Evaluate the given source
 # ./catlang.py - (no arguments) Start an interactive session.
+# ./catlang.py --build-manifest - Write the built-in word manifest (defs/manifest.py)
+#
+# Any of the above may be preceded by --profile-startup to print the time and memory
+# taken by each phase of startup; --profile-startup=json prints the phases as JSON and
+# --profile-startup=<file> writes the JSON to a file.
 #
 # If you add a new function, be sure to add a test (or two) to the runtest
 # function.
@@ -41,10 +46,18 @@
 __version__ = '0.7'
 
 import sys, platform
-import readline
 
-from cat.repl import REPL
-from cat.eval import CatEval
+from cat.startup import profiler
+
+# '--profile-startup[=json|=<file>]' must be seen before anything else is imported
+profile = ''
+
+if len(sys.argv) > 1 and sys.argv[1].startswith('--profile-startup') :
+    profile          = sys.argv.pop(1).partition('=')[2]
+    profiler.enabled = True
+
+with profiler.phase( 'imports' ) :
+    from cat.eval import CatEval
 
 # set up to handle colored text to console
 if platform.system().lower() == 'windows' :
@@ -83,13 +96,28 @@ else :
             return text
 
 if __name__ == '__main__':
-    cat = CatEval(output_fn=colored)
+    if len(sys.argv) > 1 and sys.argv[1] == '--build-manifest':
+        from cat import manifest
+        from cat.NS import NS
+
+        print "Wrote %d words to the manifest" % manifest.build( NS.defns )
+        sys.exit( 0 )
+
+    with profiler.phase( 'interpreter' ) :
+        cat = CatEval(output_fn=colored)
 
     if len(sys.argv) > 1:
         if sys.argv[1] in ('-e', '--eval'):
-            cat.eval(' '.join(sys.argv[2:]))
+            with profiler.phase( 'eval' ) :
+                cat.eval(' '.join(sys.argv[2:]))
+            
             print cat
+            profiler.report( profile )
 
     else:
+        # the REPL (and readline) are only needed for interactive sessions
+        with profiler.phase( 'repl' ) :
+            from cat.repl import REPL
+
         r = REPL(cat)
-        r.run()
+        r.run( profile )
@@ -1,16 +1,4 @@
 # Word definitions (not order dependent)
-import cat_arithmetic
-import cat_stack
-import cat_nsWords   # namespace words
-import cat_conditionals
-import cat_control
-import cat_lists
-import cat_meta # meta-commands
-import cat_strings
-import cat_misc
-import cat_debug
-import cat_io
-import cat_time
-import cat_types
-import cat_basic_tests  # runtests
-import cat_user # user's language extensions
+#
+# The modules are no longer imported here: cat.NS imports each one when it is
+# first needed (see NS.defns and cat/manifest.py for the list of modules)
@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
 from cat.namespace import *
+from cat.parser import parse_literal
+from cat.plist import PList
+import operator
 ns = NameSpace()
 
 @define(ns, '+,add')
@@ -22,8 +25,7 @@ def add(cat):
     tags:
         mathematics,addition,sum,add
     """
-    r, l = cat.stack.pop_2()
-    return cat.stack.push(l + r)
+    cat.stack.apply_2( operator.add )
 
 @define(ns, '-,sub')
 def sub(cat):
@@ -43,8 +45,7 @@ def sub(cat):
     tags:
         mathematics,difference,subtraction,sub
     """
-    a, b = cat.stack.pop_2()
-    cat.stack.push(b - a)
+    cat.stack.apply_2( operator.sub )
 
 @define(ns, '*,mul')
 def mul(cat):
@@ -65,8 +66,7 @@ def mul(cat):
     tags:
         mathematics,product,multiply,mul
     """
-    a, b = cat.stack.pop_2()
-    cat.stack.push(a * b)
+    cat.stack.apply_2( operator.mul )
 
 @define(ns, '/,div')
 def div(cat):
@@ -86,8 +86,7 @@ def div(cat):
     tags:
         mathematics,quotient,division,div
     """
-    a, b = cat.stack.pop_2()
-    cat.stack.push(b / a)
+    cat.stack.apply_2( operator.div )
 
 @define(ns, '++,inc' )
 def inc( cat) :
@@ -172,13 +171,13 @@ def pwr( cat ) :
     expt, base = cat.stack.pop_2()
     
     if isinstance(base, basestring) :
-        base = eval( base )
+        base = parse_literal( base )
     
     if not isinstance(base, (int, long, float)) :
         raise ValueError, "pwr: The base must be a number"
     
     if isinstance(expt, basestring) :
-        expt = eval( expt )
+        expt = parse_literal( expt )
     
     if not isinstance(expt, (int, long, float)) :
         raise ValueError, "pwr: The exponent must be a number"
@@ -232,12 +231,12 @@ def _abs( cat ) :
     nbr = cat.stack.pop()
     
     if isinstance(nbr, basestring) :
-        nbr = eval( nbr )
+        nbr = parse_literal( nbr )
     
     if isinstance(nbr, (int, long, float)) :
         cat.stack.push( abs(nbr) )
     
-    elif isinstance(nbr, (list,tuple) ) :
+    elif isinstance(nbr, (list, tuple, PList) ) :
         cat.stack.push( [abs(x) for x in nbr] )
     
     else :
@@ -288,7 +287,7 @@ def _ord( cat ) :
     '''
     obj = cat.stack.pop()
     
-    if isinstance(obj, (list, tuple)) :
+    if isinstance(obj, (list, tuple, PList)) :
         obj = obj[0]
     
     if not isinstance(obj, basestring) :
@@ -499,7 +498,7 @@ def _min( cat ) :
     '''
     t = cat.stack.pop()
     
-    if isinstance(t, (list, tuple, basestring)) :
+    if isinstance(t, (list, tuple, PList, basestring)) :
         cat.stack.push( min(t) )
 
     else :
@@ -530,7 +529,7 @@ def _max( cat ) :
     '''
     t = cat.stack.pop()
     
-    if isinstance(t, (list, tuple, basestring)) :
+    if isinstance(t, (list, tuple, PList, basestring)) :
         cat.stack.push( max(t) )
     
     else :
@@ -559,7 +558,7 @@ def as_int( cat ) :
     '''
     obj = cat.stack.pop()
     
-    if isinstance(obj, (list, tuple)) :
+    if isinstance(obj, (list, tuple, PList)) :
         cat.stack.push( len(obj) )
     
     else :
@@ -175,6 +175,29 @@ tests = (
     ('<-aux', [1, 2, 3]),
     ('3 n->aux', []),
     ('3 n<-aux', [1, 2, 3]),
+    ('clear 7 "cv" ! \'user \'ucopy copy_ns 8 "ucopy:cv" ! cv ucopy:cv', [7, 8]),
+    ('clear [1 2 3] list to_vector 2 * 1 + from_vector [1 -2 1] list to_vector 3 poly', [[3, 5, 7], 4]),
+    ('clear 7 ->aux [1 <-aux 2] list [3 4] list [5 6] list [add] bin_op', [[1, 7, 2], [8, 10]]),
+    ('clear "[1, [2]]" as_list "(0, 0, 3)" any [1 2 3 4 5] list "[1:4:2]" slice', [[1, [2]], True, [2, 4]]),
+    ('clear 1 2 3 "abc -- cab" shuffle \'abba "ab -- abba" define_shuffle abba', [3, 1, 2, 2, 1]),
+    ('clear \'abaa fetch 1 2 abaa', [1, 2, 1, 1]),
+    ('clear [1 2 3] list 2 vec_scale dup to_vector [4 5 6] list vec_dot_prod [3 4] list vec_norm', [[2, 4, 6], 64, 5.0]),
+    ('clear [4611686018427387904 1] list to_vector dup + from_vector [-9223372036854775808] list to_vector -1 * from_vector', [[9.223372036854776e+18, 2.0], [9.223372036854776e+18]]),
+    ('clear 10 lazy_range [dup *] lmap [even] lfilter 2 ldrop 2 take len swap 0 [+] fold', [2, 52]),
+    ('clear "define fused_test { [dup *] map [even] filter 0 [+] fold }" eval [1 2 3 4] list fused_test', [20]),
+    ('clear [1 2 3] list [inc] map 10 range 0 [+] fold [3 [1 2] 2] list 0 [max] fold 0 [1 2] list [add] foreach', [[2, 3, 4], 45, 3, 2, 3]),
+    ('clear "define cons_test { [] 1 cons }" eval cons_test cons_test uncons [1 2 3] list rest 4 cons rest', [[1], [], 1, [3, 4]]),
+    ('clear \'stack:depth_limit config_get ->aux 5 \'stack:depth_limit config_set 1 2 [3 4 5 6] [pop pop pop \'full] try_catch <-aux \'stack:depth_limit config_set', [1, 2, 'full']),
+    ('clear true track_stack 1 2 3 stack_stats \'depth dict_get swap \'max_depth dict_get swap \'bytes dict_get gtz swap pop false track_stack', [1, 2, 3, 3, 3, True]),
+    ('clear 1 "a" [+] [\'caught] try_catch [2 [<] [\'underflow] try_catch] list', [1, 'a', 'caught', [2, 'underflow']]),
+    ('clear [3037000500 3037000500] list dup dup vec_dot_prod swap to_vector dup vec_dot_prod', [18446744074000500000, 18446744074000500000]),
+    ('clear [4611686018427387904 4611686018427387904] list dup vec_norm swap to_vector dup vec_sum swap vec_norm', [6.521908912666392e+18, 9223372036854775808, 6.521908912666392e+18]),
+    ('clear [1 2] list to_vector 3 cons [4 5] list to_vector uncons', [[1, 2, 3], [4], 5]),
+    ('clear [1] list 2 cons typeof list_type eq swap 2 * 2 [3] list rest 4 cons *', [True, [1, 2, 1, 2], [4, 4]]),
+    ('clear [1 \'a pair 2 \'b pair] list [3 \'a pair] list hash_join 6 range [3 mod] group_by [1 2 3] list [even] count_by', [[[[1, 3], 'a'], [[2], 'b']], [[[0, 3], 0], [[1, 4], 1], [[2, 5], 2]], [[2, False], [1, True]]]),
+    ('clear [3 1 3 2] list [2 5] list set_diff [3 4] list set_union [1 4] list set_intersect 4 set_contains swap as_list [5] list to_set 5 in_list', [True, [1, 4], True]),
+    ('clear [3 -1 -2] list [abs] sort_by [5 1 4 2 3] list 2 top_k [5 1 4 2 3] list 2 bottom_k [1 3 5] list [2 3 4] list merge_sorted', [[-1, -2, 3], [5, 4], [1, 2], [1, 2, 3, 3, 4, 5]]),
+    ('clear [1 2 3] list [dup *] pmap 10 range [even] pfilter 10 range 0 [+] pfold', [[1, 4, 9], [0, 2, 4, 6, 8], 45]),
     ('clear "test text" 20 "." center', ['.....test text......']),
     ('clear "test text" 20 "." l_justify', ['test text...........']),
     ('clear "test text" 20 "." r_justify', ['...........test text']),
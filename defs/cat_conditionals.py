@@ -1,6 +1,7 @@
 # conditionals
 
 from cat.namespace import *
+import operator
 ns = NameSpace()
 
 @define(ns, 'eq,==')
@@ -21,8 +22,7 @@ def eq( cat ) :
     tags:
         conditional,comparison,equality
     """
-    a, b = cat.stack.pop_2()
-    cat.stack.push( a == b )
+    cat.stack.apply_2( operator.eq )
 
 @define(ns, 'neq,!=')
 def neq( cat ) :
@@ -42,8 +42,7 @@ def neq( cat ) :
     tags:
         conditional,comparison,inequality
     """
-    a, b = cat.stack.pop_2()
-    cat.stack.push( a != b )
+    cat.stack.apply_2( operator.ne )
 
 @define(ns, 'gt,>')
 def gt( cat ) :
@@ -64,8 +63,7 @@ def gt( cat ) :
     tags:
         conditional,comparison,greater_than
     """
-    a, b = cat.stack.pop_2()
-    cat.stack.push( b > a )
+    cat.stack.apply_2( operator.gt )
 
 @define(ns, 'lt,<')
 def lt( cat ) :
@@ -86,8 +84,7 @@ def lt( cat ) :
     tags:
         conditional,comparison,less_than
     """
-    a, b = cat.stack.pop_2()
-    cat.stack.push( b < a )
+    cat.stack.apply_2( operator.lt )
 
 @define(ns, 'gteq,>=')
 def gteq( cat ) :
@@ -109,8 +106,7 @@ def gteq( cat ) :
     tags:
         conditional,comparison,less_than,equals
     """
-    a, b = cat.stack.pop_2()
-    cat.stack.push( b >= a )
+    cat.stack.apply_2( operator.ge )
 
 @define(ns, 'lteq,<=')
 def lteq( cat ) :
@@ -132,8 +128,7 @@ def lteq( cat ) :
     tags:
         conditional,comparison,less_than,equals
     """
-    a, b = cat.stack.pop_2()
-    cat.stack.push( b <= a )
+    cat.stack.apply_2( operator.le )
 
 @define(ns, 'true')
 def true( cat ) :
@@ -1,6 +1,7 @@
 # level1 definitions (control, iteration)
 
 from cat.namespace import *
+from cat import native
 import re
 ns = NameSpace()
 
@@ -113,6 +114,21 @@ def foreach( cat ) :
     '''
     f, a = cat.stack.pop_2()
     
+    # a single built-in word is applied natively (see cat/native.py): a function of
+    # one argument pushes its results, one of two folds the list into the value below it
+    done, results = native.map( cat, f, a )
+    
+    if done :
+        cat.stack.push( results, multi=True )
+        return
+    
+    if cat.stack.length() > 0 :
+        done, result = native.fold( cat, f, cat.stack.peek(), a )
+        
+        if done :
+            cat.stack[-1] = result
+            return
+    
     for x in a :
         cat.stack.push( x )
         cat.eval( f )
@@ -19,6 +19,7 @@
 #         colored('Hello, World!', 'green')
 
 from cat.namespace import *
+from cat.plist import PList
 ns = NameSpace()
 
 @define(ns, 'write')
@@ -61,7 +62,7 @@ def write( cat ) :
         obj   = cat.stack.pop()
         color = None
     
-    if isinstance(obj, (list, tuple)) :
+    if isinstance(obj, (list, tuple, PList)) :
         cat.output( cat.ns._formatList(obj, 4), color, comma=True )
     
     elif isinstance(obj, dict) :
@@ -120,7 +121,7 @@ def writeln( cat ) :
         obj   = cat.stack.pop()
         color = None
     
-    if isinstance(obj, (list, tuple)) :
+    if isinstance(obj, (list, tuple, PList)) :
         cat.output( cat.ns._formatList( obj, 4 ), color )
     
     elif isinstance(obj, dict) :
@@ -384,7 +385,7 @@ def listToFile( cat ) :
     '''
     fd, lst = cat.stack.pop_2()
     
-    if not isinstance(lst, (list,tuple)) :
+    if not isinstance(lst, (list, tuple, PList)) :
         lst = [lst]
     
     fd.writelines( lst )
@@ -410,7 +411,7 @@ def recordsToFile( cat ) :
     '''
     fd, lst = cat.stack.pop_2()
     
-    if not isinstance(lst, (list, tuple)) :
+    if not isinstance(lst, (list, tuple, PList)) :
         lst = [lst]
     
     lst    = [str(x) for x in lst]
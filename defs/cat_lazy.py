@@ -0,0 +1,156 @@
+# lazy sequences (see cat/lazy.py)
+
+from cat.namespace import *
+from cat import lazy
+
+ns = NameSpace()
+
+def _applier( cat, func ) :
+    '''Returns a Python function evaluating a Cat function of one argument'''
+    def apply( x ) :
+        cat.stack.push( x )
+        cat.eval( func )
+        return cat.stack.pop()
+
+    return apply
+
+def _quoted( func ) :
+    '''Returns a Cat function as it was written, for display'''
+    if isinstance(func, (list, tuple)) :
+        return "[%s]" % " ".join( _quoted(item) if isinstance(item, (list, tuple)) else str(item) for item in func )
+
+    return str( func )
+
+@define(ns, 'lazy_range')
+def lazy_range( cat ) :
+    '''
+    lazy_range : (int:n -> lazy:seq)
+
+    desc:
+        Pushes a lazy sequence of the integers 0, 1, ... n-1. Its elements are
+        only produced as it is consumed (e.g. by fold, foreach or len)
+        n: the ending barrier of the sequence
+        seq: the lazy sequence
+
+        Example: 5 lazy_range => lazy(range(5))
+                 5 lazy_range force => [0, 1, 2, 3, 4]
+                 1000000 lazy_range [dup *] lmap [even] lfilter 0 [+] fold => 166666166667000000
+    tags:
+        lazy,range,lists,numeric_sequence
+    '''
+    cat.stack.push( lazy.lazyRange(int(cat.stack.pop())) )
+
+@define(ns, 'lmap')
+def lmap( cat ) :
+    '''
+    lmap : (list|lazy:base function:transform -> lazy:new)
+
+    desc:
+        Like map, but the new sequence is lazy: each element is transformed
+        only when it is consumed
+        base: the source list or lazy sequence
+        transform: the function transforming each element
+        new: the lazy sequence of transformed elements
+
+        Example: 4 lazy_range [dup *] lmap force => [0, 1, 4, 9]
+    tags:
+        lazy,lists,map,function
+    '''
+    func, elements = cat.stack.pop_2()
+    cat.stack.push( lazy.lazyMap(elements, _applier(cat, func), _quoted(func)) )
+
+@define(ns, 'lfilter')
+def lfilter( cat ) :
+    '''
+    lfilter : (list|lazy:base function:test -> lazy:new)
+
+    desc:
+        Like filter, but the new sequence is lazy: each element is tested
+        only when it is consumed
+        base: the source list or lazy sequence
+        test: a function returning true for the elements to keep
+        new: the lazy sequence of elements passing the test
+
+        Example: 10 lazy_range [even] lfilter force => [0, 2, 4, 6, 8]
+    tags:
+        lazy,lists,functions,filter
+    '''
+    func, elements = cat.stack.pop_2()
+    cat.stack.push( lazy.lazyFilter(elements, _applier(cat, func), _quoted(func)) )
+
+@define(ns, 'ltake,take')
+def ltake( cat ) :
+    '''
+    ltake : (list|lazy:base int:n -> lazy:first)
+    take  : (list|lazy:base int:n -> lazy:first)
+
+    desc:
+        Pushes a lazy sequence of the first n elements of a list or lazy sequence.
+        Only those elements of base are produced.
+        base: the source list or lazy sequence
+        n: the number of elements to take
+        first: the lazy sequence of (at most) n elements
+
+        Example: 1000000 lazy_range [dup *] lmap 3 take force => [0, 1, 4]
+    tags:
+        lazy,lists,slice
+    '''
+    n, elements = cat.stack.pop_2()
+    cat.stack.push( lazy.take(elements, int(n)) )
+
+@define(ns, 'ldrop')
+def ldrop( cat ) :
+    '''
+    ldrop : (list|lazy:base int:n -> lazy:rest)
+
+    desc:
+        Pushes a lazy sequence of the elements of a list or lazy sequence after
+        the first n. (The 'drop' word removes stack items.)
+        base: the source list or lazy sequence
+        n: the number of elements to skip
+        rest: the lazy sequence of the remaining elements
+
+        Example: 5 lazy_range 3 ldrop force => [3, 4]
+    tags:
+        lazy,lists,slice
+    '''
+    n, elements = cat.stack.pop_2()
+    cat.stack.push( lazy.drop(elements, int(n)) )
+
+@define(ns, 'force')
+def force( cat ) :
+    '''
+    force : (list|lazy:seq -> list:elements)
+
+    desc:
+        Computes all of the elements of a lazy sequence and pushes them as a list.
+        A list is left as it is.
+        seq: the lazy sequence
+        elements: the list of its elements
+
+        Example: 3 lazy_range force => [0, 1, 2]
+    tags:
+        lazy,lists,conversion
+    '''
+    seq = cat.stack.pop()
+    cat.stack.push( seq.force() if isinstance(seq, lazy.LazySeq) else seq )
+
+@define(ns, 'is_lazy')
+def is_lazy( cat ) :
+    '''
+    is_lazy : (any:obj -> any:obj bool:TF)
+
+    desc:
+        Returns True if the object on top of the stack is a lazy sequence
+        Does not consume the argument.
+        obj: the object to test
+        TF: True if obj is a lazy sequence; False otherwise
+
+        Example: 3 lazy_range is_lazy => lazy(range(3)) True
+    tags:
+        lazy,types
+    '''
+    cat.stack.push( isinstance(cat.stack.peek(), lazy.LazySeq) )
+
+def _returnNS() :
+    return ns
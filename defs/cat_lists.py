@@ -1,6 +1,13 @@
 # lists
 
 from cat.namespace import *
+from cat.parser import parse_literal
+from cat.vector import Vector
+from cat.plist import PList, plist
+from cat import native
+from itertools import chain, imap
+import heapq
+import operator
 
 ns = NameSpace()
 
@@ -20,7 +27,7 @@ def _sort( cat ) :
     '''
     obj = cat.stack.pop()
     
-    if isinstance(obj, (list, tuple)) :
+    if isinstance(obj, (list, tuple, PList)) :
         cat.stack.push( sorted(obj) )
         
     elif isinstance(obj, basestring) :
@@ -31,6 +38,97 @@ def _sort( cat ) :
     else :
         cat.stack.push( obj )
 
+def _sequence( obj, word ) :
+    if not isinstance(obj, (list, tuple, PList)) :
+        raise ValueError, "%s: Expect a list (not %r)" % (word, obj)
+    
+    return obj
+
+@define(ns, 'sort_by')
+def sort_by( cat ) :
+    '''
+    sort_by : (list:src function:key -> list:src_sorted)
+    
+    desc:
+        Sorts a list by the values of a key function, evaluated once for each
+        member (decorate-sort-undecorate). The sort is stable: members with equal
+        keys keep their order.
+        src: the list to sort
+        key: a function computing the sort key of a member
+        src_sorted: the list sorted by ascending key
+        
+        Example: [3 -1 -2] list [abs] sort_by => [-1, -2, 3]
+                 [[2 'a] list [1 'b] list [2 'c] list] list [head] sort_by =>
+                    [[1, 'b], [2, 'a], [2, 'c]]
+    tags:
+        sort,list,key
+    '''
+    func, obj = cat.stack.pop_2()
+    cat.stack.push( sorted(_sequence(obj, 'sort_by'), key=native.applier(cat, func)) )
+
+def _count( n, word ) :
+    if not isinstance(n, (int, long)) or n < 0 :
+        raise ValueError, "%s: Expect a count of 0 or more (not %r)" % (word, n)
+    
+    return n
+
+@define(ns, 'top_k')
+def top_k( cat ) :
+    '''
+    top_k : (list:src int:k -> list:largest)
+    
+    desc:
+        Returns the k largest members of a list, largest first. Uses a heap of
+        k members, so takes O(n log k) time rather than sorting the whole list.
+        src: the list
+        k: the number of members to return
+        largest: the (at most) k largest members in descending order
+        
+        Example: [5 1 4 2 3] list 2 top_k => [5, 4]
+    tags:
+        sort,list,heap,maximum
+    '''
+    k, obj = cat.stack.pop_2()
+    cat.stack.push( heapq.nlargest(_count(k, 'top_k'), _sequence(obj, 'top_k')) )
+
+@define(ns, 'bottom_k')
+def bottom_k( cat ) :
+    '''
+    bottom_k : (list:src int:k -> list:smallest)
+    
+    desc:
+        Returns the k smallest members of a list, smallest first. Uses a heap of
+        k members, so takes O(n log k) time rather than sorting the whole list.
+        src: the list
+        k: the number of members to return
+        smallest: the (at most) k smallest members in ascending order
+        
+        Example: [5 1 4 2 3] list 2 bottom_k => [1, 2]
+    tags:
+        sort,list,heap,minimum
+    '''
+    k, obj = cat.stack.pop_2()
+    cat.stack.push( heapq.nsmallest(_count(k, 'bottom_k'), _sequence(obj, 'bottom_k')) )
+
+@define(ns, 'merge_sorted')
+def merge_sorted( cat ) :
+    '''
+    merge_sorted : (list:left list:right -> list:merged)
+    
+    desc:
+        Merges two sorted lists into one sorted list in a single pass. The merge
+        is stable: of equal members, those of left come first.
+        left: a list in ascending order
+        right: a list in ascending order
+        merged: the members of both lists in ascending order
+        
+        Example: [1 3 5] list [2 3 4] list merge_sorted => [1, 2, 3, 3, 4, 5]
+    tags:
+        sort,list,merge
+    '''
+    right, left = cat.stack.pop_2()
+    cat.stack.push( list(heapq.merge(_sequence(left, 'merge_sorted'), _sequence(right, 'merge_sorted'))) )
+
 @define(ns, 'zip')
 def _zip( cat ) :
     '''
@@ -98,9 +196,9 @@ def _enum( cat ) :
         raise ValueError, "enum: Starting value must be an integer"
     
     if isinstance(lst, basestring) :
-        lst = eval( lst )
+        lst = parse_literal( lst )
     
-    if not isinstance( lst, (list, tuple) ) :
+    if not isinstance( lst, (list, tuple, PList) ) :
         raise ValueError, "enum: The list must be an iterable or convertable to one"
     
     cat.stack.push( [ [x,y] for x,y in enumerate(lst, start)] )
@@ -124,9 +222,9 @@ def _all( cat ) :
     iter = cat.stack.pop()
     
     if isinstance(iter, basestring) :
-        iter = eval( iter )
+        iter = parse_literal( iter )
     
-    if isinstance(iter, (list, tuple)) :
+    if isinstance(iter, (list, tuple, PList)) :
         cat.stack.push( all(iter) )
     
     else :
@@ -151,9 +249,9 @@ def _any( cat ) :
     iter = cat.stack.pop()
     
     if isinstance(iter, basestring) :
-        iter = eval( iter )
+        iter = parse_literal( iter )
     
-    if isinstance(iter, (list, tuple)) :
+    if isinstance(iter, (list, tuple, PList)) :
         cat.stack.push( any(iter) )
     
     else :
@@ -351,10 +449,13 @@ def rest( cat ) :
         Example: [1 2 3] list rest    => [2, 3]
                  ['a 'b 'c] list tail => ['b, 'c]
                  'abc rest            => 'bc
+        
+        The rest of a list shares its members with the list (see cat/plist.py)
     tags:
         lists,rest,remainder
     '''
-    cat.stack.push( cat.stack.pop()[1:] )
+    obj = cat.stack.pop()
+    cat.stack.push( plist(obj)[1:] if isinstance(obj, (list, tuple)) else obj[1:] )
 
 @define(ns, 'rev')
 def rev( cat ) :
@@ -377,9 +478,11 @@ def rev( cat ) :
     if isinstance(val, basestring) :
         cat.stack.push( val[::-1] )
     
+    elif isinstance(val, PList) :
+        cat.stack.push( val.reversed() )
+    
     else :
-        val.reverse()
-        cat.stack.push( val )
+        cat.stack.push( list(reversed(val)) )
 
 @define(ns, 'cons')
 def cons( cat ) :
@@ -387,25 +490,29 @@ def cons( cat ) :
     cons : (list:base any:item -> list:new)
     
     desc:
-        Appends an item to the right end of a list
+        Appends an item to the right end of a list. The base list is not
+        changed: the new list shares its members (see cat/plist.py), so that
+        repeated cons's take constant time
         base: the list to which to append an item
         item: item to append to the list
         new: list extended with item as its new last member
         
         Example: [1 2 3] list 4 cons => [1, 2, 3, 4]
                  1 2 cons            => [1, 2]
+                 [1 2] list to_vector 3 cons => [1, 2, 3]
     tags:
         lists,cons,concatenate
     '''
-    t   = cat.stack.pop()
-    lst = cat.stack.peek()
+    t, lst = cat.stack.pop_2()
     
-    if isinstance(lst, (list, tuple)) :
-        lst.append( t )
+    if isinstance(lst, (list, tuple, PList)) :
+        cat.stack.push( plist(lst).cons(t) )
+    
+    elif isinstance(lst, Vector) :
+        cat.stack.push( PList(lst.tolist()).cons(t) )
     
     else :
-        lst = cat.stack.pop()
-        cat.stack.push( [lst, t] )
+        cat.stack.push( PList([lst, t]) )
 
 @define(ns, 'uncons')
 def uncons( cat ) :
@@ -413,7 +520,8 @@ def uncons( cat ) :
     uncons : (list:base -> list:smaller any:item)
     
     desc:
-        Returns the right end of the list, and the rest of a list
+        Returns the right end of the list, and the rest of a list. The base
+        list is not changed: the smaller list shares its members
         base: the list whose rightmost member is to be removed
         smaller: the list without its former last member
         item: former last member of the list
@@ -424,8 +532,11 @@ def uncons( cat ) :
     '''
     x = cat.stack.pop()
     
-    if isinstance(x, (list, tuple)) :
-        y = x.pop()
+    if isinstance(x, Vector) :
+        x = x.tolist()
+    
+    if isinstance(x, (list, tuple, PList)) :
+        x, y = plist(x).uncons()
         cat.stack.push( x )
         cat.stack.push( y )
     
@@ -450,13 +561,13 @@ def concat( cat ) :
     '''
     r, l = cat.stack.pop_2()
     
-    if not isinstance(r, (list, tuple)) :
+    if not isinstance(r, (list, tuple, PList)) :
         r = [ r ]
     
-    if not isinstance(l, (list, tuple)) :
+    if not isinstance(l, (list, tuple, PList)) :
         l = [ l ]
     
-    cat.stack.push( l + r )
+    cat.stack.push( plist(l).extend(r) )
 
 @define(ns, 'get_at')
 def get_at( cat ) :
@@ -495,6 +606,10 @@ def set_at( cat ) :
     '''
     ix, val = cat.stack.pop_2()
     lst     = cat.stack.peek()
+    
+    if isinstance(lst, PList) :
+        cat.stack[-1] = lst = lst.tolist()
+    
     lst[int(ix)] = val
 
 @define(ns, 'swap_at')
@@ -517,6 +632,10 @@ def swap_at( cat ) :
     n     = int( cat.stack.pop() )
     obj   = cat.stack.pop()
     lst   = cat.stack.peek()
+    
+    if isinstance(lst, PList) :
+        cat.stack[-1] = lst = lst.tolist()
+    
     x     = lst[n]
     lst[n] = obj
     cat.stack.push( x )
@@ -543,9 +662,12 @@ def split_list( cat ) :
     offset, lst = cat.stack.pop_2()
     n           = int( offset )
     
+    if isinstance(lst, (list, tuple)) :
+        lst = plist( lst )
+    
     if n >= len(lst) :
         cat.stack.push( lst )
-        cat.stack.push( [] )
+        cat.stack.push( PList() )
     
     else :
         cat.stack.push( lst[:n] )
@@ -613,9 +735,20 @@ def slice_list( cat ) :
         return
     
     elif pat.count(":") < 3 :
-        strLst = str( lst )
-        l      = eval( strLst + pat )
-        cat.stack.push( l )
+        bounds = pat.strip().strip( "[]" ).split( ":" )
+        
+        try :
+            bounds = [ int(x) if x.strip() else None for x in bounds ]
+        
+        except ValueError :
+            cat.stack.push( lst )
+            raise ValueError, "slice: bad syntax in '%s' " % pat
+        
+        if len(bounds) == 1 :
+            cat.stack.push( lst[bounds[0]] )
+        
+        else :
+            cat.stack.push( lst[slice(*bounds)] )
     
     else :
         cat.stack.push( lst )
@@ -677,7 +810,7 @@ def explode( cat ) :
     '''
     obj = cat.stack.pop()
     
-    if isinstance( obj, (basestring, list, tuple) ) :
+    if isinstance( obj, (basestring, list, tuple, PList) ) :
         for elt in obj :
             cat.stack.push( elt )
     
@@ -724,7 +857,7 @@ def list_to_hash( cat ) :
     '''
     top = cat.stack.pop()
     
-    if isinstance(top, (list, tuple)) :
+    if isinstance(top, (list, tuple, PList)) :
         cat.stack.push( dict(top) )
     
     else :
@@ -756,12 +889,12 @@ def pyList( cat ) :
     '''
     lst = cat.stack.pop()
     
-    if isinstance(lst, (list, tuple)) :
+    if isinstance(lst, (list, tuple, PList)) :
         lst = list( lst )
     
     elif isinstance(lst, basestring) :
         if lst[0] in "[(" :
-            lst = list( eval(lst) )
+            lst = list( parse_literal(lst) )
         
         elif lst.count(",") > 0 :
             lst = [x for x in lst.split(",")]
@@ -792,12 +925,12 @@ def as_list( cat ) :
     '''
     obj = cat.stack.pop()
     
-    if isinstance(obj, (list, tuple)) :
+    if isinstance(obj, (list, tuple, PList, set, frozenset)) :
         cat.stack.push( list(obj) )
     
     elif isinstance(obj, basestring) :
         if obj[0] in '[(' :
-            cat.stack.push( list(eval(obj)) )
+            cat.stack.push( list(parse_literal(obj)) )
     
     else :
         cat.stack.push( [obj] )
@@ -994,6 +1127,113 @@ def hash_contains( cat ) :
     dict = cat.stack.peek()
     cat.stack.push( key in dict )
 
+def _pairs( lst, word ) :
+    '''Yields the (key, value) of each [value key] pair of a list'''
+    for item in lst :
+        if not isinstance(item, (list, tuple, PList)) or len(item) != 2 :
+            raise ValueError, "%s: Expect a list of [value key] pairs (not %r)" % (word, item)
+        
+        yield item[1], item[0]
+
+def _index( key ) :
+    # a list key is indexed as a tuple of its members
+    return tuple( key ) if isinstance(key, (list, PList)) else key
+
+def _groups( keyed ) :
+    '''Groups the values of (key, value) pairs by key in one pass. Returns the list of
+    [list:<values>, key] pairs, with the keys in the order they first appear and the
+    values of each key in their original order'''
+    index  = { }
+    groups = [ ]
+    
+    for key, value in keyed :
+        ix    = _index( key )
+        group = index.get( ix )
+        
+        if group is None :
+            group = index[ix] = [ [], key ]
+            groups.append( group )
+        
+        group[0].append( value )
+    
+    return groups
+
+@define(ns, 'hash_join')
+def hash_join( cat ) :
+    '''
+    hash_join : (list:left list:right -> list:joined)
+    
+    desc:
+        Joins two lists of [value key] pairs (see 'pair') on their keys: the values
+        of each key, from both lists, are collected in a list. Uses a hash table, so
+        takes one pass over the lists. An empty right list gives the self join of left.
+        left: a list of [value key] pairs
+        right: a list of [value key] pairs
+        joined: a list of [values key] pairs, one for each key, in the order the keys
+                first appear (in left, then right), with the values in their order
+        
+        Example: [1 'a pair 2 'b pair] list [3 'a pair 4 'b pair] list hash_join =>
+                    [[[1, 3], 'a], [[2, 4], 'b]]
+    tags:
+        lists,hash,join,group
+    '''
+    right, left = cat.stack.pop_2()
+    cat.stack.push( _groups(_pairs(chain(left, right), 'hash_join')) )
+
+@define(ns, 'group_by')
+def group_by( cat ) :
+    '''
+    group_by : (list:items function:key -> list:groups)
+    
+    desc:
+        Groups the items of a list by the value of a key function, in one pass
+        items: the list to group
+        key: a function computing the key of an item
+        groups: a list of [items key] pairs, one for each key, in the order the keys
+                first appear, with the items in their order
+        
+        Example: 6 range [3 mod] group_by => [[[0, 3], 0], [[1, 4], 1], [[2, 5], 2]]
+    tags:
+        lists,hash,group
+    '''
+    func, items = cat.stack.pop_2()
+    key         = native.applier( cat, func )
+    cat.stack.push( _groups((key(x), x) for x in items) )
+
+@define(ns, 'count_by')
+def count_by( cat ) :
+    '''
+    count_by : (list:items function:key -> list:counts)
+    
+    desc:
+        Counts the items of a list for each value of a key function, in one pass
+        items: the list whose items are counted
+        key: a function computing the key of an item
+        counts: a list of [count key] pairs, one for each key, in the order the keys
+                first appear
+        
+        Example: [1 2 3 4 5] list [even] count_by => [[3, False], [2, True]]
+    tags:
+        lists,hash,group,count
+    '''
+    func, items = cat.stack.pop_2()
+    key         = native.applier( cat, func )
+    index       = { }
+    counts      = [ ]
+    
+    for x in items :
+        k     = key( x )
+        ix    = _index( k )
+        count = index.get( ix )
+        
+        if count is None :
+            count = index[ix] = [ 0, k ]
+            counts.append( count )
+        
+        count[0] += 1
+    
+    cat.stack.push( counts )
+
 @define(ns, 'map')
 def map( cat ):
     '''
@@ -1012,14 +1252,18 @@ def map( cat ):
     '''
     func, elements = cat.stack.pop_2()
     
-    # Evaluate the function with each of the elements.
-    results  = []
+    # A single built-in word (e.g. [inc]) is applied natively (see cat/native.py)
+    done, results = native.map( cat, func, elements )
     
-    # Push the value onto the stack and evaluate the function.
-    for element in elements :
-        cat.stack.push( element )
-        cat.eval( func )
-        results.append( cat.stack.pop() )
+    if not done :
+        # Evaluate the function with each of the elements.
+        results  = []
+        
+        # Push the value onto the stack and evaluate the function.
+        for element in elements :
+            cat.stack.push( element )
+            cat.eval( func )
+            results.append( cat.stack.pop() )
     
     cat.stack.push( results )
 
@@ -1047,8 +1291,8 @@ def map_selection( cat ) :
     indices        = cat.stack.pop_list()
     func, elements = cat.stack.pop_2()
     
-    # Make a list of selected indices
-    indices = [ int(x) for x in indices ]
+    # Make a set of selected indices (each element is tested)
+    indices = set( int(x) for x in indices )
     
     # Evaluate the function with each of the selected elements.
     results  = []
@@ -1085,14 +1329,17 @@ def filter( cat ) :
         lists,functions,filter
     '''
     func, elements  = cat.stack.pop_2()
-    results         = []
+    done, results   = native.filter( cat, func, elements )
     
-    for element in elements :
-        cat.stack.push( element )
-        cat.eval( func )
+    if not done :
+        results = []
         
-        if cat.stack.pop() :
-            results.append( element )
+        for element in elements :
+            cat.stack.push( element )
+            cat.eval( func )
+            
+            if cat.stack.pop() :
+                results.append( element )
     
     cat.stack.push( results )
 
@@ -1125,6 +1372,13 @@ def fold( cat ) :
     '''
     f, init, a = cat.stack.pop_n( 3 )
     
+    # e.g. [+] is a sum (see cat/native.py)
+    done, result = native.fold( cat, f, init, a )
+    
+    if done :
+        cat.stack.push( result )
+        return
+    
     for x in a :
         cat.stack.push( init )
         cat.stack.push( x )
@@ -1133,6 +1387,46 @@ def fold( cat ) :
     
     cat.stack.push( init )
 
+@define(ns, 'run_fused')
+def run_fused( cat ) :
+    '''
+    run_fused : (list:base pipeline:chain -> any:result)
+    
+    desc:
+        Runs a fused chain of map and filter stages (and a final fold) over a list
+        in one pass. The chains are made when user words are defined: a body such as
+        [f] map [p] filter 0 [g] fold becomes a pipeline followed by run_fused
+        (see fusion_report and the 'optimize' section of catlang.cfg).
+        base: the source list
+        chain: the pipeline
+        result: the list (or the value of the fold) the chain produces
+        
+        Example: define sum_even_squares { [dup *] map [even] filter 0 [+] fold }
+                 [1 2 3 4] list sum_even_squares => 20
+    tags:
+        custom,lists,map,filter,fold,optimization
+    '''
+    cat.stack.pop().run( cat )
+
+@define(ns, 'fusion_report')
+def fusion_report( cat ) :
+    '''
+    fusion_report : (-- -> --)
+    
+    desc:
+        Lists the user words whose map, filter and fold chains were fused into
+        single loops, with the chains
+        
+        Example: define sum_even_squares { [dup *] map [even] filter 0 [+] fold }
+                 fusion_report =>
+                    user:sum_even_squares: [dup *] map [even] filter 0 [+] fold
+    tags:
+        custom,lists,optimization,debugging
+    '''
+    fusions = cat.ns.fusions()
+    lines   = [ "%s: %s" % (key, chain) for key in sorted(fusions) for chain in fusions[key] ]
+    cat.output( "\n".join(lines) if lines else "No chains have been fused", cat.ns.info_colour )
+
 @define(ns, 'list')
 def _list( cat ) :
     '''
@@ -1149,10 +1443,13 @@ def _list( cat ) :
         lists,generator
     '''
     func = cat.stack.pop()
+    mark = cat.stack.mark()
     
-    with cat.new_stack() :
+    try :
         cat.eval( func )
-        newlst = cat.stack.to_list()
+    
+    finally :
+        newlst = cat.stack.release( mark )
 
     cat.stack.push( newlst )
 
@@ -1198,13 +1495,13 @@ def dotProduct( cat ) :
         list,vector,product,dot_product,dot
     '''
     l1, l2 = cat.stack.pop_2()
-    n      = min( len(l1), len(l2) )
-    sum    = 0.0
     
-    for i in range(n) :
-        sum += l1[i] * l2[i]
+    if isinstance(l1, Vector) or isinstance(l2, Vector) :
+        vec, other = (l1, l2) if isinstance(l1, Vector) else (l2, l1)
+        cat.stack.push( float(vec.dot(other)) )
+        return
     
-    cat.stack.push( sum )
+    cat.stack.push( sum(imap(operator.mul, l1, l2), 0.0) )
 
 @define(ns, 'powers')
 def powers( cat ) :
@@ -1255,6 +1552,10 @@ def poly( cat ):
     '''
     x, a = cat.stack.pop_2()
     
+    if isinstance(a, Vector) :
+        cat.stack.push( a.poly(x) )
+        return
+    
     n = len( a ) - 1
     p = a[n]
     
@@ -1270,7 +1571,8 @@ def in_list( cat ) :
     
     desc:
         Searches a list for a value. Returns true or false on top of the stack.
-        haystack: the list to be searched
+        A set (see to_set) is searched in constant time.
+        haystack: the list (or set) to be searched
         needle: the item to be found in the 'haystack'
         TorF: true is pushed onto the stack if the needle is found in the haystack
               false is pushed onto the stack if the needle is not found in the haystack
@@ -1281,8 +1583,120 @@ def in_list( cat ) :
         list,search,find,contains
     '''
     needle, haystack = cat.stack.pop_2()
+    
+    if isinstance(haystack, (set, frozenset)) :
+        needle = _index( needle )
+    
     cat.stack.push( needle in haystack )
 
+def _set( obj, word ) :
+    '''Returns a set (or a list, tuple or string) as a frozenset'''
+    if isinstance(obj, frozenset) :
+        return obj
+    
+    if not isinstance(obj, (list, tuple, PList, set, basestring)) :
+        raise ValueError, "%s: Expect a set or a list (not %r)" % (word, obj)
+    
+    return frozenset( _index(x) for x in obj )
+
+@define(ns, 'to_set')
+def to_set( cat ) :
+    '''
+    to_set : (list:items -> set:members)
+    
+    desc:
+        Converts a list (or a string) to a set: an unordered collection of distinct
+        members that is searched in constant time (see in_list and set_contains).
+        A list member becomes a tuple. Sets are never changed by the set words,
+        which return new sets; as_list converts a set back to a list.
+        items: the list to convert
+        members: the set of the distinct items
+        
+        Example: [3 1 3 2] list to_set => frozenset([1, 2, 3])
+    tags:
+        lists,set,conversion
+    '''
+    cat.stack.push( _set(cat.stack.pop(), 'to_set') )
+
+@define(ns, 'set_union')
+def set_union( cat ) :
+    '''
+    set_union : (set|list:a set|list:b -> set:union)
+    
+    desc:
+        Returns the set of the members of either argument
+        a: a set (or a list)
+        b: a set (or a list)
+        union: the members of a or b
+        
+        Example: [1 2] list [2 3] list set_union => frozenset([1, 2, 3])
+    tags:
+        lists,set,union
+    '''
+    b, a = cat.stack.pop_2()
+    cat.stack.push( _set(a, 'set_union') | _set(b, 'set_union') )
+
+@define(ns, 'set_intersect')
+def set_intersect( cat ) :
+    '''
+    set_intersect : (set|list:a set|list:b -> set:common)
+    
+    desc:
+        Returns the set of the members of both arguments
+        a: a set (or a list)
+        b: a set (or a list)
+        common: the members of both a and b
+        
+        Example: [1 2] list [2 3] list set_intersect => frozenset([2])
+    tags:
+        lists,set,intersection
+    '''
+    b, a = cat.stack.pop_2()
+    cat.stack.push( _set(a, 'set_intersect') & _set(b, 'set_intersect') )
+
+@define(ns, 'set_diff')
+def set_diff( cat ) :
+    '''
+    set_diff : (set|list:a set|list:b -> set:rest)
+    
+    desc:
+        Returns the set of the members of the first argument that are not members
+        of the second
+        a: a set (or a list)
+        b: a set (or a list)
+        rest: the members of a not in b
+        
+        Example: [1 2] list [2 3] list set_diff => frozenset([1])
+    tags:
+        lists,set,difference
+    '''
+    b, a = cat.stack.pop_2()
+    cat.stack.push( _set(a, 'set_diff') - _set(b, 'set_diff') )
+
+@define(ns, 'set_contains')
+def set_contains( cat ) :
+    '''
+    set_contains : (set:members any:item -> set:members bool:TF)
+    
+    desc:
+        Returns True if a set has an item as a member; otherwise, False.
+        The set is not consumed.
+        members: a set
+        item: the item to look for
+        TF: True if item is a member of the set; False otherwise
+        
+        Example: [1 2] list to_set 2 set_contains => frozenset([1, 2]) True
+    tags:
+        lists,set,member,contains,test
+    '''
+    item    = cat.stack.pop()
+    members = cat.stack.peek()
+    
+    if not isinstance(members, (set, frozenset)) :
+        raise ValueError, "set_contains: Expect a set below the item (see to_set)"
+    
+    cat.stack.push( _index(item) in members )
+
 @define(ns, 'format_list')
 def dumpList( cat ) :
     '''
@@ -1319,7 +1733,7 @@ def dumpList( cat ) :
         return txt
     
     def formatList( theList, indent, lvl ) :
-        if not isinstance(theList, (list, tuple)) :
+        if not isinstance(theList, (list, tuple, PList)) :
                     theList = [ theList ]
         
         txt = ""
@@ -1331,7 +1745,7 @@ def dumpList( cat ) :
             for key in d.keys() :
                 item = d[key]
                 
-                if isinstance(item, (list, tuple)) :
+                if isinstance(item, (list, tuple, PList)) :
                     indent += 1
                     txt    += key + " = " + formatList( item, indent )
                     indent -= 1
@@ -1344,7 +1758,7 @@ def dumpList( cat ) :
         
         else :
             for item in theList :
-                if isinstance(item, (list, tuple)) :
+                if isinstance(item, (list, tuple, PList)) :
                     indent += 1
                     txt    += formatList( item, indent )
                     indent -= 1
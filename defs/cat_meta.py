@@ -2,12 +2,13 @@
 
 from cat.namespace import *
 import sys,os,re
-from fnmatch import fnmatch
 from cat_tagExpr import TagExpr
+from cat.startup import profiler
+from cat.search import literalPrefix
+from cat.parser import parse_literal
+from cat.plist import PList
 
 ns      = NameSpace()
-mapTags = { }
-letters = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_")
 
 @define(ns, 'doc')
 def show_doc( cat ) :
@@ -32,19 +33,19 @@ def show_doc( cat ) :
             raise ValueError, "doc: No namespace called '%s'" % ns
         
         else :
-            defined, obj, _ = cat.ns.getWord( name, ns )
+            defined, doc = cat.ns.getDoc( name, ns )
             
             if defined :
-                cat.output( obj[1], cat.ns.info_colour )
+                cat.output( doc, cat.ns.info_colour )
                 return
             
             else :
                 raise ValueError, "doc: No documentation for '%s' in '%s'" % (name, ns)
     
-    defined, obj, _ = cat.ns.getWord( name )
+    defined, doc = cat.ns.getDoc( name )
     
     if defined :
-        cat.output( obj[1], cat.ns.info_colour )
+        cat.output( doc, cat.ns.info_colour )
     
     else :
         cat.output( "doc: No documentation for " + name, cat.ns.info_colour )
@@ -82,7 +83,7 @@ def dumpdef( cat ) :
             cat.output( "Function %s is a primitive" % atom, cat.ns.info_colour )
         
         else :
-            cat.output( "%s: %s" % (atom, func[0]), cat.ns.info_colour )
+            cat.output( "%s: %s" % (atom, func.definition()), cat.ns.info_colour )
     
     else :
         cat.output( "Function %s is undefined" % atom, cat.ns.config.get('display', 'error') )
@@ -285,24 +286,30 @@ def find_words( cat ) :
     '''
     i_c = cat.ns.info_colour
     foundSome = False
-    regex     = re.compile( cat.stack.pop() )
-    words     = cat.ns.builtinWords()
-    selected  = [ x for x in words if regex.match(x) ]
-    selected.sort()
+    pattern   = cat.stack.pop()
+    regex     = re.compile( pattern )
+    builtins  = [ ]
+    inNS      = { }
+    
+    # only the names that start with the regex's literal prefix can match
+    for name, key in cat.ns.textIndex().namesStartingWith( literalPrefix(pattern) ) :
+        if regex.match( name ) :
+            if key == name :
+                builtins.append( name )
+            
+            else :
+                inNS.setdefault( key[:-len(name) - 1], [] ).append( name )
     
-    if len(selected) > 0 :
+    if len(builtins) > 0 :
         cat.output( "Matching standard (built-in) words:", i_c )
-        cat.output( cat.ns._formatList(selected), i_c )
+        cat.output( cat.ns._formatList(builtins), i_c )
         foundSome = True
     
-    wordList = cat.ns.allDefinedWords()
-    
-    for words in wordList :
-        selected = [ x for x in words[1:] if regex.match(x) ]
+    for nspc in cat.ns.listAllNS() :
+        selected = inNS.get( nspc, [ ] )
         
         if len(selected) > 0 :
-            cat.output( "\nMatching words defined in namespace '%s':" % words[0], i_c )
-            selected.sort()
+            cat.output( "\nMatching words defined in namespace '%s':" % nspc, i_c )
             cat.output( cat.ns._formatList(selected), i_c )
             foundSome = True
     
@@ -311,113 +318,6 @@ def find_words( cat ) :
     
     cat.output( "" )
 
-# support functions to create the global tag->word mappings
-def _tagMap( cat ) :
-    '''Creates the global tag to words mapping'''
-    global mapTags
-    
-    # build the tag-mapping directory if necessary
-    mapTags  = { 'universe' : set() }
-    findTags = re.compile( r'tags:\s*(\S+)' )
-    
-    # first the built-in words
-    words = cat.ns.builtinWords()
-    
-    for word in words :
-        wordRef = cat.ns.getWord( word, ns='std' )  # returns (<TF>,(<function>, <documentation>))
-        doc     = wordRef[1][1]             # get the documentation
-        tags    = findTags.search( doc )    # get the list of tags
-        
-        # check to see if tags exist
-        if tags :
-            tags = tags.group( 1 ).split( "," )     # split up the list of tags
-            
-            # process each tag
-            for tag in tags:
-                tag = tag.lower()
-                
-                # tag is either already in dict or needs to be inserted
-                if tag not in mapTags:
-                    mapTags[tag] = set( [word] )  # new tag entry
-                
-                else :
-                    mapTags[tag].add( word )    # existing tag entry
-                
-                mapTags['universe'].add( word ) # the universe is all tags
-    
-    # now the namespace words
-    wordsInNS = cat.ns.allDefinedWords()
-    
-    for item in wordsInNS :
-        if len(item) == 1 : # check for no definitions in the namespace
-            continue
-        
-        nspc = item[0]  # get the namespace name
-        
-        # this code follows the same logic as for built-in words
-        for word in item[1:] :
-            wordRef = cat.ns.getWord( word, ns=nspc )
-            doc     = wordRef[1][1]
-            tags    = findTags.search( doc )
-            
-            if tags :
-                tags = tags.group( 1 ).split( "," )
-                word = nspc + ":" + word    # attach a namespace label to the word
-                
-                for tag in tags:
-                    tag = tag.lower()
-                    
-                    if tag not in mapTags:
-                        mapTags[tag] = set( [word] )
-                    
-                    else :
-                        mapTags[tag].add( word )
-                    
-                    mapTags['universe'].add( word )
-
-def _globAnalysis( text, dict_ ) :    
-    text1   = text.replace("(", " ").replace(")", " ")
-    text2   = text1
-    globs   = { }
-    
-    while True :
-        text2 = text1
-        text1 = text1.replace("  ", " ")
-        
-        if len(text1) == len(text2) :
-            break
-    
-    items = text1.strip().split( " " )
-    
-    for glob in items :
-        if len(set(glob) - letters) > 0 :
-            tags = []
-            
-            for key in dict_ :
-                if fnmatch(key, glob) :
-                    tags.append( key )
-            
-            globs[glob] = tags
-    
-    for glob in globs :
-        alternatives = globs[glob]
-        n            = len( alternatives )
-        
-        if n > 0 :
-            alternatives = reduce( lambda y,x: y + [x] if x not in y else y, alternatives, [] )   # remove duplicates
-            clause       = " or ".join( alternatives )
-            
-            if n > 1 :
-                text = text.replace( glob, "(" + clause + ")" )
-            
-            else :
-                text = text.replace( glob, clause )
-        
-        else :
-            raise ValueError, "tag_search: no tags match '%s'" % glob
-    
-    return text
-
 @define(ns, 'tag_search')
 def tag_search( cat ) :
     '''
@@ -438,24 +338,52 @@ def tag_search( cat ) :
     tags:
         tags,search,words
     '''
-    _tagMap( cat )
+    index = cat.ns.tagIndex()
     
     # Parse the tag expression and evaluate it
     i_c   = cat.ns.info_colour
-    texpr = TagExpr( mapTags )
+    texpr = TagExpr( index )
     expr  = cat.stack.pop()
-    expr2 = _globAnalysis( expr, mapTags )
-    words = texpr.parse( expr2 ) # returns a set (that might be empty), or None
+    words = texpr.parse( expr ) # returns a bitset of word ids (that might be 0), or None
     
-    if not words or not list(words) :
+    if not words :
         cat.output( "No words matching '%s'" % expr, i_c )
     
     else :
-        words = list( words )
+        words = index.words( words )
         words.sort()
         cat.output( "Words matching tag expression '%s':" % expr, i_c )
         cat.output( cat.ns._formatList(words, across=3), i_c )
 
+@define(ns, 'search_docs')
+def search_docs( cat ) :
+    '''
+    search_docs : (string:query -> --)
+    
+    desc:
+        Displays the words whose names, tags or descriptions contain all of the terms
+        of a query, best matches first. A match in a word's name counts for more than
+        one in its tags, which counts for more than one in its description.
+        A term ending in '*' matches anything starting with the rest of the term.
+        The selected words have the form: <namespace name>:<word name>
+        query: the search terms (case is ignored)
+        
+        Example: "sort list" search_docs
+                 "hash* key" search_docs
+    tags:
+        search,words,documentation,help
+    '''
+    query = cat.stack.pop()
+    i_c   = cat.ns.info_colour
+    found = cat.ns.textIndex().search( query )
+    
+    if not found :
+        cat.output( "No words matching '%s'" % query, i_c )
+    
+    else :
+        cat.output( "Words matching '%s' (best first):" % query, i_c )
+        cat.output( cat.ns._formatList([key for key, score in found], across=3), i_c )
+
 @define(ns, 'show_tags')
 def show_tags( cat ) :
     '''
@@ -468,14 +396,13 @@ def show_tags( cat ) :
     tags:
         display,tags,console
     '''
-    _tagMap( cat )
-    
-    tags = mapTags.keys()
+    index = cat.ns.tagIndex()
+    tags  = index.tags()
     tags.sort()
     tagInfo = []
     
     for tag in tags :
-        count = len( mapTags[tag] )
+        count = index.count( tag )
         tagInfo.append( "%s/%d" % (tag, count) )
     
     cat.output( cat.ns._formatList(tagInfo), cat.ns.info_colour )
@@ -719,8 +646,8 @@ def _help( cat ) :
                 help( func )
             
             else :
-                cat.output( func[1], i_c )   # documentation
-                cat.output( str(func[0]), i_c )   # definition
+                cat.output( cat.ns.getDoc(name, ns)[1], i_c )   # documentation
+                cat.output( str(func.definition()), i_c )   # definition
             
             return
         
@@ -738,8 +665,8 @@ def _help( cat ) :
             print colored( '\tbuilt-in', i_c )
     
         else :
-            cat.output( fcn[1], i_c )
-            cat.output( str(fcn[0]), i_c )
+            cat.output( cat.ns.getDoc(name, obj[2])[1], i_c )
+            cat.output( str(fcn.definition()), i_c )
         
         return
         
@@ -802,7 +729,6 @@ def fetch( cat, wrd=None ) :
     '''
     from glob import iglob
     
-    parseDeps = re.compile( r'.*deps:\s*(\S+)', re.DOTALL )
     define    = re.compile( r'^\s*define\s+(\S+)(\s*\{|\s)' )
     paths     = cat.ns.config.get( 'paths', 'catdefs' ).split( "," )
     
@@ -837,22 +763,14 @@ def fetch( cat, wrd=None ) :
         return False
     
     def process_dependencies( word, nspc ) :
-        doc = cat.ns.getWord(word, nspc)
+        defined, doc = cat.ns.getDocRecord( word, nspc )
         
-        if not doc :
+        if not defined or not doc.deps :
             return 
         
-        mo = parseDeps.match( doc[1][1] )
-        
-        if mo :
-            deps = mo.group(1).split( "," )
-            
-            for i in range( len(deps) ) :
-                deps[i] = nspc + ":" + deps[i]
-            
-            deps = ",".join( deps )
-            cat.stack.push( deps )
-            cat.ns.exeqt( 'fetch' )
+        deps = ",".join( nspc + ":" + dep for dep in doc.deps )
+        cat.stack.push( deps )
+        cat.ns.exeqt( 'fetch' )
         
     def search_file( fileName, word, tgtNS ) :
         fd         = open( fileName, 'r' )
@@ -1062,61 +980,64 @@ def load( cat, force=False, nmsp='' ) :
         if not os.access(fileName, os.F_OK) :
             raise Exception, "load: no file called '%s'" % fileName
         
-        fd     = open( fileName, 'r' )
-        buffer = ""
-        lineNo = 0
-        inDef  = False
-        
-        for line in fd :
-            lineNo += 1
-            temp    = stripComments( line )
-            
-            if not temp :
-                continue
+        with profiler.phase( 'load:' + fileName ) :
+            fd     = open( fileName, 'r' )
+            buffer = ""
+            lineNo = 0
+            inDef  = False
             
-            if not inDef :
-                if not temp.startswith( "define" ) :
-                    cat.eval( temp.strip() )
-                    
-                    # the evaluation of temp may have changed the user's initial namespace
-                    # if nmsp arg is '' then there is no predefined namespace
-                    if not nmsp :
-                        tgtNS = cat.ns.getUserNS()
-                    
-                    continue
+            for line in fd :
+                lineNo += 1
+                temp    = stripComments( line )
                 
-                else :
-                    inDef = True
-            
-            # must be in a definition (this hack permits 1-line definitions)
-            if inDef :
-                # consolidate lines of a definition into a single string
-                buffer += temp
-                temp    = temp.strip()
+                if not temp :
+                    continue
                 
-                # end of function definition?
-                if not temp.endswith( "}}" ) and temp.endswith( "}" ) : 
-                    # end of definition: parse the string
-                    ix    = buffer.rfind( "{" )
-                    front = buffer[:ix]
-                    repl  = buffer[ix:].replace("\n", " ")
-                    buffer = front + repl
-                    defn   = cat.parser.parse_definition( buffer )
-                    cat.ns.addWord( defn.name, list(cat.parser.gobble(defn.definition)),
-                                    "  %s %s\n%s" % (defn.name, defn.effect, defn.description), tgtNS )
-                    deps.append( defn.dependencies )
-                    buffer = ""
-                    inDef  = False
+                if not inDef :
+                    if not temp.startswith( "define" ) :
+                        cat.eval( temp.strip() )
+                        
+                        # the evaluation of temp may have changed the user's initial namespace
+                        # if nmsp arg is '' then there is no predefined namespace
+                        if not nmsp :
+                            tgtNS = cat.ns.getUserNS()
+                        
+                        continue
+                    
+                    else :
+                        inDef = True
                 
-                else :
-                    continue    # examine the next line
-        
-        cat.ns.addFile( fileName, tgtNS )
-        fd.close()
+                # must be in a definition (this hack permits 1-line definitions)
+                if inDef :
+                    # consolidate lines of a definition into a single string
+                    buffer += temp
+                    temp    = temp.strip()
+                    
+                    # end of function definition?
+                    if not temp.endswith( "}}" ) and temp.endswith( "}" ) : 
+                        # end of definition: parse the string
+                        ix    = buffer.rfind( "{" )
+                        front = buffer[:ix]
+                        repl  = buffer[ix:].replace("\n", " ")
+                        buffer = front + repl
+                        defn   = cat.parser.parse_definition( buffer )
+                        cat.ns.addWord( defn.name, cat.parser.gobble(defn.definition),
+                                        "  %s %s\n%s" % (defn.name, defn.effect, defn.description), tgtNS,
+                                        defn.effect )
+                        deps.append( defn.dependencies )
+                        buffer = ""
+                        inDef  = False
+                    
+                    else :
+                        continue    # examine the next line
+            
+            cat.ns.addFile( fileName, tgtNS )
+            fd.close()
         
         # process any dependencies
         depList = flatten( deps )
-        depList = reduce( lambda y,x: y + [x] if x not in y else y, depList, [] )   # remove duplicates
+        seen    = set()
+        depList = [ x for x in depList if not (x in seen or seen.add(x)) ]   # remove duplicates
         
         for dep in depList :
             # check to see if the dependency is in the target namespace
@@ -1128,7 +1049,7 @@ def load( cat, force=False, nmsp='' ) :
             
             if res[0] :
                 # OK fetch it
-                cat.ns.addWord( dep, res[1][0], res[1][1], tgtNS )
+                cat.ns.addWord( dep, res[1].body, res[1].doc, tgtNS, res[1].effect )
             
             else :
                 fetch( cat, [dep] )
@@ -1232,10 +1153,10 @@ def catInstance( cat ) :
         raise ValueError, "instance: The instance name must be a string"
     
     if isinstance(args, basestring) and args.startswith("[") :
-        args = eval( args )
+        args = parse_literal( args )
     
     # make single argument into a tuple
-    if not isinstance(args, (list, tuple)) :
+    if not isinstance(args, (list, tuple, PList)) :
         args = (args,)
     
     # use eval() to get an instance
@@ -1420,11 +1341,13 @@ def config_set( cat ) :
     
     desc:
         Makes an entry in the configuration dict based on the section and key at [0]
-        and the associated value at [-1]
+        and the associated value at [-1]. Entries in the 'stack' section (the
+        depth limit and the tracking of statistics) take effect at once.
         value: the value string
         section_and_key: a string of the form <section name>:<key name>
         
         Example: 'TimeStack> 'prompt:default config_set
+                 100 'stack:depth_limit config_set
     tags:
         meta,config,configuration,set,option,key,value
     '''
@@ -1435,6 +1358,9 @@ def config_set( cat ) :
     
     value = str( cat.stack.pop() )
     cat.ns.config.set( sect, key, value )
+    
+    if sect == 'stack' :
+        cat.configure_stack()
 
 @define(ns, 'config_save')
 def config_save( cat ) :
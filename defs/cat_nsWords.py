@@ -98,7 +98,7 @@ def copyNS( cat ) :
     desc:
         copy the src namespace to a new dest
         src: the name of an existing (source) namespace
-        dest: the name of an existing (target) namespace
+        dest: the name of the new (target) namespace
     tags:
         namespace,copy,ns
     '''
@@ -234,7 +234,7 @@ def loadNS( cat ) :
     if not cat.ns.isNS(nsName) :
         cat.ns.createNS(nsName)
     
-    load = cat.ns.getWord('load')[1][0]
+    load = cat.ns.getWord('load')[1].body
     load( cat, True, nsName )
     cat.ns.targetNS = ''
 
@@ -301,8 +301,7 @@ def showLinkedNS( cat ) :
         namespace,link,display,ns,ls
     '''
     cat.output( "Linked namespaces:", cat.ns.info_colour )
-    links = cat.ns.getLinks()
-    links.sort()
+    links = sorted( cat.ns.getLinks() )
     cat.output( cat.ns._formatList(links), cat.ns.info_colour )
 
 @define(ns, 'purge_ns')
@@ -0,0 +1,157 @@
+# parallel map, filter and fold (see cat/parallel.py)
+
+from cat.namespace import *
+from cat import parallel
+
+ns = NameSpace()
+
+def _settings( cat, n ) :
+    '''Returns the number of workers and the chunk size for a list of n items
+    (the 'parallel' section of the configuration; 0 means automatic)
+    '''
+    config  = cat.ns.config
+    workers = config.getint( 'parallel', 'workers' ) if config.has_option( 'parallel', 'workers' ) else 0
+    size    = config.getint( 'parallel', 'chunk_size' ) if config.has_option( 'parallel', 'chunk_size' ) else 0
+    workers = workers or parallel.cpuCount()
+
+    # by default four chunks per worker, so that a slow chunk does not hold up the others
+    return workers, size or max( 1, -(-n // (workers * 4)) )
+
+def _setting( cat, option, word ) :
+    n = cat.stack.pop()
+
+    if not isinstance(n, (int, long)) or n < 0 :
+        raise ValueError, "%s: expected a count of 0 or more" % word
+
+    if not cat.ns.config.has_section( 'parallel' ) :
+        cat.ns.config.add_section( 'parallel' )
+
+    cat.ns.config.set( 'parallel', option, str(n) )
+
+@define(ns, 'pmap')
+def pmap( cat ) :
+    '''
+    pmap : (list:base function:transform -> list:new)
+
+    desc:
+        Like map, but the list is split into chunks that are transformed in parallel
+        by worker processes. The function must not depend on the stack below its
+        argument, nor change variables (its changes are made in the workers).
+        Worth it when the function does a lot of work per element.
+        base: the source list
+        transform: the transformation function
+        new: the transformed elements, in the order of base
+
+        Example: define fib { dup 2 lt [] [dup dec fib swap 2 - fib +] if }
+                 [20 21 22 23] list [fib] pmap => [6765, 10946, 17711, 28657]
+    tags:
+        custom,lists,map,parallel
+    '''
+    func, elements = cat.stack.pop_2()
+    elements       = list( elements )
+    workers, size  = _settings( cat, len(elements) )
+    results        = [ ]
+
+    for chunk in parallel.run( cat, 'map', func, elements, workers, size ) if elements else [ ] :
+        results.extend( chunk )
+
+    cat.stack.push( results )
+
+@define(ns, 'pfilter')
+def pfilter( cat ) :
+    '''
+    pfilter : (list:base function:test -> list:new)
+
+    desc:
+        Like filter, but the list is split into chunks that are tested in parallel
+        by worker processes (see pmap)
+        base: the source list
+        test: a function returning true for the elements to keep
+        new: the elements passing the test, in the order of base
+
+        Example: 10 range [3 mod 0 eq] pfilter => [0, 3, 6, 9]
+    tags:
+        custom,lists,filter,parallel
+    '''
+    func, elements = cat.stack.pop_2()
+    elements       = list( elements )
+    workers, size  = _settings( cat, len(elements) )
+    results        = [ ]
+
+    for chunk in parallel.run( cat, 'filter', func, elements, workers, size ) if elements else [ ] :
+        results.extend( chunk )
+
+    cat.stack.push( results )
+
+@define(ns, 'pfold')
+def pfold( cat ) :
+    '''
+    pfold : (list:base any:init function:combine -> any:result)
+
+    desc:
+        Like fold for an associative function (e.g. add, mul, max): each chunk of the
+        list is combined in parallel by a worker process (see pmap) and the results of
+        the chunks are combined pairwise, as a tree. The initial value is combined
+        with the result once, on the left.
+        base: the list to be reduced
+        init: the initial value
+        combine: an associative function of two arguments
+        result: the result of the reduction
+
+        Example: 100 range 0 [+] pfold => 4950
+    tags:
+        custom,lists,reduce,fold,parallel
+    '''
+    func, init, elements = cat.stack.pop_n( 3 )
+    elements             = list( elements )
+    workers, size        = _settings( cat, len(elements) )
+    partial              = parallel.run( cat, 'fold', func, elements, workers, size ) if elements else [ ]
+
+    def combine( a, b ) :
+        cat.stack.push( a )
+        cat.stack.push( b )
+        cat.eval( func )
+        return cat.stack.pop()
+
+    while len(partial) > 1 :
+        pairs   = [ combine(partial[ix], partial[ix + 1]) for ix in xrange(0, len(partial) - 1, 2) ]
+        partial = pairs + partial[len(pairs) * 2:]
+
+    cat.stack.push( combine(init, partial[0]) if partial else init )
+
+@define(ns, 'parallel_workers')
+def parallel_workers( cat ) :
+    '''
+    parallel_workers : (int:n -> --)
+
+    desc:
+        Sets the number of worker processes used by pmap, pfilter and pfold
+        (0: one per processor). The workers are started on first use and kept
+        for later calls until the number changes.
+        n: the number of workers
+
+        Example: 4 parallel_workers
+    tags:
+        custom,parallel,configuration
+    '''
+    _setting( cat, 'workers', 'parallel_workers' )
+
+@define(ns, 'parallel_chunk_size')
+def parallel_chunk_size( cat ) :
+    '''
+    parallel_chunk_size : (int:n -> --)
+
+    desc:
+        Sets the number of list elements in each chunk given to a worker by pmap,
+        pfilter and pfold (0: automatic, about four chunks per worker). A list of
+        a single chunk is processed without the workers.
+        n: the chunk size
+
+        Example: 1000 parallel_chunk_size
+    tags:
+        custom,parallel,configuration
+    '''
+    _setting( cat, 'chunk_size', 'parallel_chunk_size' )
+
+def _returnNS() :
+    return ns
@@ -1,6 +1,7 @@
 # cat.stack manipulations
 
 from cat.namespace import *
+from cat.shuffle import compile as compileShuffle, definition as shuffleDefinition
 ns = NameSpace()
 
 @define(ns, 'clear')
@@ -431,6 +432,94 @@ def pop_n_from_aux( cat ) :
     n = cat.stack.pop()
     cat.stack.push( cat.stack.pop_aux(n), multi=True )
 
+@define(ns, 'stack_stats')
+def stack_stats( cat ) :
+    '''
+    stack_stats : (-- -> dict:stats)
+    
+    desc:
+        Pushes a dictionary of stack usage statistics onto the stack:
+            depth, aux_depth: the current depths of the stack and the auxiliary stack
+            limit: the depth limit of either stack (0: none; see 'depth_limit' in catlang.cfg)
+            tracking: True if the statistics below are being kept (see track_stack)
+            max_depth, max_aux_depth: the greatest depths reached
+            pushes: the number of items pushed
+            bytes, peak_bytes: the approximate size of the items on the stacks,
+                now and at their largest (sampled with sys.getsizeof)
+        stats: the statistics
+        
+        Example: true track_stack 1 2 stack_stats => 1 2 {'depth': 2, 'max_depth': 2, ...}
+    tags:
+        custom,stack,statistics,memory,debugging
+    '''
+    cat.stack.push( cat.stack.stats() )
+
+@define(ns, 'track_stack')
+def track_stack( cat ) :
+    '''
+    track_stack : (bool:on -> --)
+    
+    desc:
+        Turns the tracking of stack usage statistics (see stack_stats) on or off.
+        Turning it on again starts the statistics afresh.
+        on: true to track the statistics; false to stop
+        
+        Example: true track_stack
+    tags:
+        custom,stack,statistics,debugging
+    '''
+    on    = cat.stack.pop()
+    stats = cat.stack.stats()
+    cat.stack.configure( stats['limit'], on )
+    
+    if on :
+        cat.stack.reset_stats()
+
+@define(ns, 'shuffle')
+def shuffle( cat ) :
+    '''
+    shuffle : (A string:spec -> B)
+    
+    desc:
+        Rearranges the top items of the stack as described by a permutation spec:
+        the names of the items taken, '--' and the names of the items left (top
+        of the stack last). The names are single letters written together or
+        names separated by spaces. The stack is rewritten in one step, without
+        the swap, dip, dup and pop evals of the equivalent Cat definition.
+        A: the stack, with at least as many items as the spec takes
+        spec: the permutation spec (e.g. "abc -- cab" or "x y -- y x x")
+        B: the stack with the items taken replaced by the items left
+        
+        Example: 1 2 3 "abc -- cab" shuffle => 3 1 2
+                 1 2 "ab -- abba" shuffle => 1 2 2 1
+                 1 2 3 "abc -- a" shuffle => 1
+    tags:
+        custom,stack,shuffle
+    '''
+    n, order = compileShuffle( cat.stack.pop() )
+    cat.stack.shuffle( n, order )
+
+@define(ns, 'define_shuffle')
+def define_shuffle( cat ) :
+    '''
+    define_shuffle : (string:name string:spec -> --)
+    
+    desc:
+        Defines a shuffle word from a permutation spec (see shuffle) in the
+        current user namespace. The word runs the shuffle natively.
+        name: the name of the new word
+        spec: the permutation spec
+        
+        Example: 'cab "abc -- cab" define_shuffle 1 2 3 cab => 3 1 2
+    tags:
+        custom,stack,shuffle,define
+    '''
+    spec, name = cat.stack.pop_2()
+    defn       = cat.parser.parse_definition( shuffleDefinition(name, spec) )
+    cat.ns.addWord( defn.name, cat.parser.gobble(defn.definition),
+                    "  %s %s\n    desc:\n        Shuffle: %s\n    tags:\n        shuffle\n" % (defn.name, defn.effect, spec),
+                    effect=defn.effect )
+
 def _returnNS() :
     return ns
 
@@ -1,6 +1,7 @@
 # string manipulation
 
 from cat.namespace import *
+from cat.plist import PList
 ns = NameSpace()
 
 @define(ns, 'str_cat')
@@ -87,7 +88,7 @@ def join( cat ) :
     if not isinstance(conn, basestring) :
         conn = str( conn )
     
-    if not isinstance(lst, (list, tuple)) :
+    if not isinstance(lst, (list, tuple, PList)) :
         lst = [lst]
     
     lst = [ str(x) for x in lst ]
@@ -189,7 +190,7 @@ def format( cat ) :
     '''
     fmt, vals = cat.stack.pop_2()
     
-    if not isinstance(vals, (list,tuple)) :
+    if not isinstance(vals, (list, tuple, PList)) :
         vals = [vals]
     
     if not isinstance(fmt, basestring) :
@@ -255,7 +256,7 @@ def index_of( cat ) :
     '''
     tst,tgt  = cat.stack.pop_2()
     
-    if isinstance(tgt, (list, tuple)) :
+    if isinstance(tgt, (list, tuple, PList)) :
         try :
             cat.stack.push( tgt.index(tst) )
         
@@ -287,9 +288,9 @@ def rindex_of( cat ) :
     '''
     tst, tgt = cat.stack.pop_2()
     
-    if isinstance(tgt, (tuple, list)) :
-        n = len(tgt)
-        tgt.reverse()
+    if isinstance(tgt, (tuple, list, PList)) :
+        n   = len(tgt)
+        tgt = tgt[::-1]
         
         try :
             ix = tgt.index(tst)
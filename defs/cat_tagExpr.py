@@ -1,4 +1,43 @@
-# parse a logical expression that uses tags/Sets as data
+# parse a logical expression that uses tags/bitsets as data
+
+# characters of a plain tag name; any other character makes a tag name a glob
+letters = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_")
+
+reserved = ('and', 'or', 'not', '(', ')', '<END>')
+
+
+# builders for the compiled expression: each returns a function of a TagIndex
+def _tag( name ) :
+    return lambda index: index.bits( name )
+
+def _glob( glob ) :
+    def _bits( index ) :
+        tags = index.expand( glob )
+        
+        if not tags :
+            raise ValueError, "tag_search: no tags match '%s'" % glob
+        
+        bits = 0
+        
+        for tag in tags :
+            bits |= index.bits( tag )
+        
+        return bits
+    
+    return _bits
+
+def _none( index ) :
+    return 0
+
+def _and( lhs, rhs ) :
+    return lambda index: lhs(index) & rhs(index)
+
+def _or( lhs, rhs ) :
+    return lambda index: lhs(index) | rhs(index)
+
+def _not( arg ) :
+    return lambda index: index.bits('universe') & ~arg(index)
+
 
 class TagExpr( object ) :
     '''Parses a logical expression using tags
@@ -7,17 +46,40 @@ class TagExpr( object ) :
     <term> ::= <factor> <factor_tail>
     <factor_tail> ::= 'and' <factor> <factor_tail> | {}
     <factor> ::= '(' <expr> ')' | 'not' <factor> | <id>
-    <id> ::= a key in the tags dictionary
+    <id> ::= a tag name or a tag name glob (e.g. cond*)
     Note: 'and', 'or', 'not' are reserved words
-    The tags dictionary: <tag name> : Set(<words having the tag name>)
+    An expression is compiled (once) into bitwise operations on the tag bitsets
+    of a TagIndex (see cat/tags.py) and the result is a bitset of word ids.
     '''
-    def __init__(self, mapTags ) :
-            self._mapTags = mapTags
+    _compiled = { }    # expression text -> compiled expression (or None)
+    
+    def __init__(self, index ) :
+            self._index = index
         
     def parse( self, text ) :
+        '''Evaluates a tag expression
+        :rtype: a bitset of word ids (an int), or None if the expression is malformed
+        '''
+        if text not in TagExpr._compiled :
+            if len(TagExpr._compiled) > 256 :
+                TagExpr._compiled.clear()
+            
+            TagExpr._compiled[text] = self.compile( text )
+        
+        func = TagExpr._compiled[text]
+        
+        if func is None :
+            return None
+        
+        return func( self._index )
+    
+    def compile( self, text ) :
+        '''Compiles a tag expression into a function of a TagIndex returning a bitset
+        (None if the expression is malformed)
+        '''
         self._tokens = text.replace("(", " ( ").replace(")", " ) ").split()
         self._tokens.reverse()
-        self._inputToken     = self._tokens.pop()
+        self._inputToken     = self._tokens.pop() if self._tokens else '<END>'
         self._operands       = [ ]
         self._lastInputToken = ''
         
@@ -29,18 +91,9 @@ class TagExpr( object ) :
     
     def _isTag( self, what ) :
         '''The pseudotoken '<id>' indicates that the inputToken should
-        be an identifier. This method is a very simple test for that condition.
-        Note: all identifiers must be keys in the _mapTags dictionary.
+        be an identifier: anything that is not a reserved word or a parenthesis.
         '''
-        if what == '<id>' :
-            if self._inputToken in self._mapTags :
-                return True
-            
-            else :
-                return False
-        
-        else :
-            return False
+        return what == '<id>' and self._inputToken not in reserved
     
     def _nextToken( self ) :
         '''Advances to the next input token'''
@@ -92,15 +145,20 @@ class TagExpr( object ) :
         
         elif self._match( 'not' ) :
             self._factor()
-            arg = self._operands.pop()
-            self._operands.append( self._mapTags['universe'] - arg )
+            self._operands.append( _not(self._operands.pop()) )
         
         else :
             if self._match( '<id>' ) :
-                self._operands.append( self._mapTags[self._lastInputToken] )
+                name = self._lastInputToken
+                
+                if set(name) - letters :
+                    self._operands.append( _glob(name) )
+                
+                else :
+                    self._operands.append( _tag(name) )
             
             else :
-                self._operands.append( set() )
+                self._operands.append( _none )
                 self._nextToken()
     
     def _factor_tail( self ) :
@@ -111,13 +169,13 @@ class TagExpr( object ) :
             self._factor_tail()
     
     def _andOp( self ) :
-        '''Perform set intersection'''
+        '''Compile bitset intersection'''
         rhs = self._operands.pop()
         lhs = self._operands.pop()
-        self._operands.append( lhs & rhs )
+        self._operands.append( _and(lhs, rhs) )
     
     def _orOp( self ) :
-        '''Perform set union'''
+        '''Compile bitset union'''
         rhs = self._operands.pop()
         lhs = self._operands.pop()
-        self._operands.append( lhs | rhs )
+        self._operands.append( _or(lhs, rhs) )
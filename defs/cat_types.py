@@ -1,8 +1,13 @@
 # types
 
 from cat.namespace import *
+from cat.plist import PList
 ns = NameSpace()
 
+def _type( obj ) :
+    # a persistent list (see cat/plist.py) is a list to Cat programs
+    return list if isinstance(obj, PList) else type( obj )
+
 @define(ns, 'typename')
 def typename( cat ) :
     '''
@@ -18,7 +23,7 @@ def typename( cat ) :
     tags:
         types
     '''
-    cat.stack.push( type(cat.stack.pop()) )
+    cat.stack.push( _type(cat.stack.pop()) )
 
 @define(ns, 'typeof')
 def typeof( cat ) :
@@ -35,7 +40,7 @@ def typeof( cat ) :
     tags:
         types
     '''
-    cat.stack.push( type(cat.stack.peek()) )
+    cat.stack.push( _type(cat.stack.peek()) )
 
 @define(ns, 'int_type')
 def int_type( cat ) :
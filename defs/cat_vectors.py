@@ -0,0 +1,250 @@
+# typed numeric vectors (see cat/vector.py)
+
+from cat.namespace import *
+from cat.vector import Vector
+from itertools import imap
+import math
+import operator
+
+ns = NameSpace()
+
+@define(ns, 'to_vector')
+def to_vector( cat ) :
+    '''
+    to_vector : (list:numbers -> vector:vec)
+
+    desc:
+        Converts a list of numbers to a vector. A vector holds its numbers unboxed
+        (machine integers, or doubles if any element is not an integer) and the
+        arithmetic words operate on all of its elements at once.
+        numbers: the list of numbers to convert
+        vec: the vector
+
+        Example: [1 2 3] list to_vector => vector([1, 2, 3])
+                 [1 2 3] list to_vector 2 * => vector([2, 4, 6])
+                 [1 2 3] list to_vector dup + => vector([2, 4, 6])
+    tags:
+        vectors,lists,conversion
+    '''
+    if not isinstance(cat.stack.peek(), Vector) :
+        cat.stack.push( Vector(cat.stack.pop_list()) )
+
+@define(ns, 'from_vector')
+def from_vector( cat ) :
+    '''
+    from_vector : (vector:vec -> list:numbers)
+
+    desc:
+        Converts a vector to a list of numbers
+        vec: the vector to convert
+        numbers: the list of its elements
+
+        Example: [1 2 3] list to_vector from_vector => [1, 2, 3]
+    tags:
+        vectors,lists,conversion
+    '''
+    obj = cat.stack.pop()
+    cat.stack.push( obj.tolist() if isinstance(obj, Vector) else list(obj) )
+
+@define(ns, 'is_vector')
+def is_vector( cat ) :
+    '''
+    is_vector : (any:obj -> any:obj bool:TF)
+
+    desc:
+        Returns True if the object on top of the stack is a vector
+        Does not consume the argument.
+        obj: the object to test
+        TF: True if obj is a vector; False otherwise
+
+        Example: [1 2] list to_vector is_vector => vector([1, 2]) True
+    tags:
+        vectors,types
+    '''
+    cat.stack.push( isinstance(cat.stack.peek(), Vector) )
+
+@define(ns, 'vec_sum')
+def vec_sum( cat ) :
+    '''
+    vec_sum : (list|vector:vec -> nbr:sum)
+
+    desc:
+        Computes the sum of the elements of a vector (or list) in one pass
+        vec: the vector or list of numbers
+        sum: the sum of the elements
+
+        Example: [0 1 2] list vec_sum => 3
+                 [0 1 2] list to_vector vec_sum => 3
+    tags:
+        level1,vectors
+    '''
+    obj = cat.stack.pop()
+    cat.stack.push( obj.sum() if isinstance(obj, Vector) else sum(obj, 0) )
+
+def _elementwise( cat, op, word ) :
+    '''Applies op to the elements of the two vectors (or lists) on top of the stack.
+    The result is a vector if either argument is one, otherwise a list.
+    '''
+    rhs, lhs = cat.stack.pop_2()
+
+    if isinstance(lhs, Vector) or isinstance(rhs, Vector) :
+        cat.stack.push( op(lhs, rhs) )
+        return
+
+    if len(lhs) != len(rhs) :
+        raise ValueError, "%s: vectors must be of the same length" % word
+
+    cat.stack.push( map(op, lhs, rhs) )
+
+def _scalar( cat, op ) :
+    '''Applies op to each element of the vector (or list) below the number on top of the stack'''
+    k, vec = cat.stack.pop_2()
+
+    if isinstance(vec, Vector) :
+        cat.stack.push( op(vec, k) )
+
+    else :
+        cat.stack.push( [op(x, k) for x in vec] )
+
+@define(ns, 'vec_scale')
+def vec_scale( cat ) :
+    '''
+    vec_scale : (list|vector:vec nbr:k -> list|vector:scaled)
+
+    desc:
+        Multiplies all items in a vector (or list) by a scalar value
+        vec: the vector or list of numbers
+        k: the scalar
+        scaled: the products (a vector if vec is one, otherwise a list)
+
+        Example: [0 1 2] list 2 vec_scale => [0, 2, 4]
+                 [0 1 2] list to_vector 2 vec_scale => vector([0, 2, 4])
+    tags:
+        level1,vectors
+    '''
+    _scalar( cat, operator.mul )
+
+@define(ns, 'vec_slide')
+def vec_slide( cat ) :
+    '''
+    vec_slide : (list|vector:vec nbr:k -> list|vector:slid)
+
+    desc:
+        Adds a value to all items in a vector (or list)
+        vec: the vector or list of numbers
+        k: the value to add
+        slid: the sums (a vector if vec is one, otherwise a list)
+
+        Example: [0 1 2] list 2 vec_slide => [2, 3, 4]
+    tags:
+        level1,vectors
+    '''
+    _scalar( cat, operator.add )
+
+@define(ns, 'vec_add')
+def vec_add( cat ) :
+    '''
+    vec_add : (list|vector:lhs list|vector:rhs -> list|vector:sums)
+
+    desc:
+        Element-wise addition of two vectors (or lists) of the same length
+        sums: a vector if either argument is one, otherwise a list
+
+        Example: [1 2 3] list [4 5 6] list vec_add => [5, 7, 9]
+    tags:
+        level1,vectors
+    '''
+    _elementwise( cat, operator.add, 'vec_add' )
+
+@define(ns, 'vec_sub')
+def vec_sub( cat ) :
+    '''
+    vec_sub : (list|vector:lhs list|vector:rhs -> list|vector:differences)
+
+    desc:
+        Element-wise subtraction of two vectors (or lists) of the same length
+        differences: a vector if either argument is one, otherwise a list
+
+        Example: [4 5 6] list [1 2 3] list vec_sub => [3, 3, 3]
+    tags:
+        level1,vectors
+    '''
+    _elementwise( cat, operator.sub, 'vec_sub' )
+
+@define(ns, 'vec_mul')
+def vec_mul( cat ) :
+    '''
+    vec_mul : (list|vector:lhs list|vector:rhs -> list|vector:products)
+
+    desc:
+        Element-wise multiplication of two vectors (or lists) of the same length
+        products: a vector if either argument is one, otherwise a list
+
+        Example: [1 2 3] list [4 5 6] list vec_mul => [4, 10, 18]
+    tags:
+        level1,vectors
+    '''
+    _elementwise( cat, operator.mul, 'vec_mul' )
+
+@define(ns, 'vec_div')
+def vec_div( cat ) :
+    '''
+    vec_div : (list|vector:lhs list|vector:rhs -> list|vector:quotients)
+
+    desc:
+        Element-wise division of two vectors (or lists) of the same length
+        quotients: a vector if either argument is one, otherwise a list
+
+        Example: [4.0 5 6] list [1 2 3] list vec_div => [4.0, 2.5, 2]
+    tags:
+        level1,vectors
+    '''
+    _elementwise( cat, operator.div, 'vec_div' )
+
+def _dot( lhs, rhs ) :
+    '''Returns the dot product of two vectors (or lists) up to the shorter length.
+    Lists of integers stay Python integers, so the result is exact.'''
+    if isinstance(lhs, Vector) :
+        return lhs.dot( rhs )
+
+    if isinstance(rhs, Vector) :
+        return rhs.dot( lhs )
+
+    return sum( imap(operator.mul, lhs, rhs), 0 )
+
+@define(ns, 'vec_dot_prod')
+def vec_dot_prod( cat ) :
+    '''
+    vec_dot_prod : (list|vector:lhs list|vector:rhs -> nbr:dprod)
+
+    desc:
+        Computes the dot product of two vectors (or lists)
+        If they are of unequal length, the length of the shorter one is used
+        dprod: the dot product (an integer if both hold integers)
+
+        Example: [1 2 3] list [4 5 6] list vec_dot_prod => 32
+    tags:
+        level1,vectors,dot_product
+    '''
+    rhs, lhs = cat.stack.pop_2()
+    cat.stack.push( _dot(lhs, rhs) )
+
+@define(ns, 'vec_norm')
+def vec_norm( cat ) :
+    '''
+    vec_norm : (list|vector:vec -> float:norm)
+
+    desc:
+        Computes the (Euclidean) norm of a vector (or list)
+        vec: the vector or list of numbers
+        norm: the square root of the sum of the squares of the elements
+
+        Example: [3 4] list vec_norm => 5.0
+    tags:
+        level1,vectors
+    '''
+    vec = cat.stack.pop()
+    cat.stack.push( math.sqrt(_dot(vec, vec)) )
+
+def _returnNS() :
+    return ns
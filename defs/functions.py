@@ -15,6 +15,7 @@
 import sys
 
 from cat.namespace import define
+from cat.parser import parse_literal
 
 
 @define('+')
@@ -419,13 +420,13 @@ def pwr(stack):
     expt, base = stack.pop_2()
 
     if isinstance(base, basestring):
-        base = eval(base)
+        base = parse_literal(base)
 
     if not isinstance(base, (int, long, float)):
         raise ValueError("pwr: The base must be a number")
 
     if isinstance(expt, basestring):
-        expt = eval(expt)
+        expt = parse_literal(expt)
 
     if not isinstance(expt, (int, long, float)):
         raise ValueError("expt: The exponent must be a number")
@@ -469,7 +470,7 @@ def _abs(stack):
     nbr = stack.pop()
 
     if isinstance(nbr, basestring):
-        nbr = eval(nbr)
+        nbr = parse_literal(nbr)
 
     if isinstance(nbr, (int, long, float)):
         stack.push(abs(nbr))
@@ -555,7 +556,7 @@ def _enum(stack):
         raise ValueError("enum: Starting value must be an integer")
 
     if isinstance(lst, str):
-        lst = eval(lst)
+        lst = parse_literal(lst)
 
     if not isinstance(lst, (list, tuple)):
         raise ValueError("enum: The list must be an iterable or convertable to one")